@@ -2,6 +2,7 @@ import os
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from pm25.schema import csv_dtypes
 
 # 获取当前脚本所在目录
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,11 +20,11 @@ file_path_dic = {
 
 #导入五个城市的PM2.5数据
 try:
-    df_bj = pd.read_csv(file_path_dic["Beijing"])
-    df_sh = pd.read_csv(file_path_dic["Shanghai"])
-    df_cd = pd.read_csv(file_path_dic["Chengdu"])
-    df_gz = pd.read_csv(file_path_dic["Guangzhou"])
-    df_sy = pd.read_csv(file_path_dic["Shenyang"])
+    df_bj = pd.read_csv(file_path_dic["Beijing"], dtype=csv_dtypes(file_path_dic["Beijing"]))
+    df_sh = pd.read_csv(file_path_dic["Shanghai"], dtype=csv_dtypes(file_path_dic["Shanghai"]))
+    df_cd = pd.read_csv(file_path_dic["Chengdu"], dtype=csv_dtypes(file_path_dic["Chengdu"]))
+    df_gz = pd.read_csv(file_path_dic["Guangzhou"], dtype=csv_dtypes(file_path_dic["Guangzhou"]))
+    df_sy = pd.read_csv(file_path_dic["Shenyang"], dtype=csv_dtypes(file_path_dic["Shenyang"]))
 except FileNotFoundError:
     print(f"错误：找不到文件")
 
@@ -0,0 +1,8 @@
+"""
+PM2.5五城市分析的公共模块（数据加载、缓存、聚合、绘图等），供各分析脚本复用
+命令行入口：python -m pm25 {daily,monthly,levels,compare,rolling,episodes,diurnal,rose,report} [--cities ...] [--start ...] [--end ...]
+"""
+from .archive import load
+from .cache import load_city_data, read_city_frame, read_city_range
+
+__all__ = ["load", "load_city_data", "read_city_frame", "read_city_range"]
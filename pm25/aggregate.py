@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+
+from .classify import SEASON_NAMES, season_codes
+from .profiling import stage
+
+# ----------------------
+# 多分辨率聚合：小时 → 日 → 月 → 季 → 年
+# ----------------------
+# 只对小时数据做一次向量化分段归约（sum/count/min/max），
+# 更粗的粒度全部由上一级的部分和推导，不再对原始数据重复groupby。
+LEVELS = ("day", "month", "season", "year")
+STATS = ("sum", "count", "min", "max")
+
+
+def _segment_reduce(keys, sums, counts, mins, maxs):
+    """
+    按key分段归约（keys需已排序）
+    返回：(唯一key, sum, count, min, max)，每个二维数组形状为(分组数, 列数)
+    """
+    if len(keys) == 0:
+        return keys, sums, counts, mins, maxs
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    return (
+        keys[starts],
+        np.add.reduceat(sums, starts, axis=0),
+        np.add.reduceat(counts, starts, axis=0),
+        np.fmin.reduceat(mins, starts, axis=0),  # fmin/fmax忽略NaN，全NaN分组仍为NaN
+        np.fmax.reduceat(maxs, starts, axis=0),
+    )
+
+
+def _reduce_by_key(keys, sums, counts, mins, maxs):
+    """按任意顺序的key归约（必要时先稳定排序）"""
+    if len(keys) > 1 and np.any(keys[1:] < keys[:-1]):
+        order = np.argsort(keys, kind="stable")
+        keys, sums, counts, mins, maxs = keys[order], sums[order], counts[order], mins[order], maxs[order]
+    return _segment_reduce(keys, sums, counts, mins, maxs)
+
+
+def _is_day_grid(day_keys, hours_per_day=24):
+    """
+    判断是否为完整的规则网格：每天恰好hours_per_day行、按日期连续排列（天内小时顺序不影响日统计）
+    只做一次reshape比较，代价远小于排序与分段
+    """
+    if len(day_keys) == 0 or len(day_keys) % hours_per_day:
+        return False
+    grid = day_keys.reshape(-1, hours_per_day)
+    return bool((grid == grid[:, :1]).all() and (np.diff(grid[:, 0]) == 1).all())
+
+
+def _month_to_season(month_keys):
+    """月份key（1970-01起的月序号）→ 季节编码（0春 1夏 2秋 3冬）"""
+    return season_codes(month_keys % 12 + 1).astype("int64")
+
+
+def _level_index(level, keys):
+    """各粒度key数组 → 对应的pandas索引"""
+    if level == "day":
+        return pd.DatetimeIndex(keys.astype("datetime64[D]"), name="date")
+    if level == "month":
+        return pd.PeriodIndex.from_ordinals(keys, freq="M").rename("year_month")
+    if level == "season":
+        return pd.Index([SEASON_NAMES[k] for k in keys], name="season")
+    return pd.Index(keys + 1970, name="year")
+
+
+class MultiResolutionAggregate:
+    """
+    各观测点在日/月/季/年四个粒度上的sum/count/min/max
+    - parts[level]：(key, sum, count, min, max)，key为整数（日/月/年为1970起的序号，季节为编码）
+    - levels[level]：DataFrame，列为(统计量, 观测点)两级索引
+    - 日粒度索引为date，月粒度为year_month，季节为season（跨年合并），年粒度为year
+    """
+
+    def __init__(self, columns, parts):
+        self.columns = list(columns)
+        self.parts = parts
+        self._levels = None
+
+    @classmethod
+    def from_hourly(cls, df, columns, date_col="date"):
+        """
+        由小时数据构建（一次归约得到日粒度，再逐级推导）
+        数据为完整的逐小时网格（每天24行、日期连续）时直接reshape为(天数, 24)沿小时轴归约；
+        有缺行或乱序时回退为按日期排序后分段归约
+        """
+        with stage("aggregate", rows=len(df)):
+            day_keys = df[date_col].to_numpy().astype("datetime64[D]").astype("int64")
+            if _is_day_grid(day_keys):
+                grid = np.stack([df[col].to_numpy(dtype="float64") for col in columns]).reshape(len(columns), -1, 24)
+                return cls.from_hour_grid(columns, np.datetime64(int(day_keys[0]), "D"), grid)
+            values = df[columns].to_numpy(dtype="float64")
+            valid = ~np.isnan(values)
+            return cls._from_day_partials(columns, *_reduce_by_key(
+                day_keys, np.where(valid, values, 0.0), valid.astype("int64"), values, values
+            ))
+
+    @classmethod
+    def from_chunks(cls, chunks, columns, date_col="date"):
+        """
+        流式构建：逐块归约为日部分和后丢弃原始行，峰值内存只与块大小有关
+        块按时间顺序到达时，跨块的同一天在最后一次归约中合并
+        """
+        day_parts = []
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            values = chunk[columns].to_numpy(dtype="float64")
+            valid = ~np.isnan(values)
+            day_keys = chunk[date_col].to_numpy().astype("datetime64[D]").astype("int64")
+            day_parts.append(_reduce_by_key(
+                day_keys, np.where(valid, values, 0.0), valid.astype("int64"), values, values
+            ))
+        if not day_parts:
+            empty = np.empty((0, len(columns)))
+            return cls._from_day_partials(columns, np.empty(0, dtype="int64"), empty, empty.astype("int64"), empty, empty)
+        return cls._from_day_partials(columns, *_reduce_by_key(*(np.concatenate(arrs) for arrs in zip(*day_parts))))
+
+    @classmethod
+    def from_daily(cls, daily_df, columns=None):
+        """由日数据（索引为日期）构建，每天视为一个观测值，适用于China_Avg等派生日序列"""
+        if columns is None:
+            columns = list(daily_df.columns)
+        values = daily_df[columns].to_numpy(dtype="float64")
+        valid = ~np.isnan(values)
+        day_keys = daily_df.index.to_numpy().astype("datetime64[D]").astype("int64")
+        return cls._from_day_partials(columns, *_reduce_by_key(
+            day_keys, np.where(valid, values, 0.0), valid.astype("int64"), values, values
+        ))
+
+    @classmethod
+    def from_hour_grid(cls, columns, first_day, grid):
+        """
+        由逐小时稠密网格构建：grid形状为(列数, 天数, 24)，缺测为NaN，first_day为第一天（datetime64[D]）
+        每列的小时轴连续存放，按天的归约直接沿最后一维完成，不需要排序与分段
+        """
+        valid = ~np.isnan(grid)
+        day_keys = np.datetime64(first_day, "D").astype("int64") + np.arange(grid.shape[1])
+        return cls._from_day_partials(
+            columns, day_keys,
+            (np.where(valid, grid, 0).astype("float64", copy=False) @ np.ones(grid.shape[2])).T,  # 矩阵乘法求24小时之和
+            valid.sum(axis=2, dtype="int64").T,
+            np.fmin.reduce(grid, axis=2).astype("float64").T,
+            np.fmax.reduce(grid, axis=2).astype("float64").T,
+        )
+
+    @classmethod
+    def _from_day_partials(cls, columns, day_keys, sums, counts, mins, maxs):
+        day = (day_keys, sums, counts, mins, maxs)
+        # 日 → 月（日key有序，月key也有序）
+        month_of_day = day_keys.astype("datetime64[D]").astype("datetime64[M]").astype("int64")
+        month = _segment_reduce(month_of_day, sums, counts, mins, maxs)
+        # 月 → 年
+        year = _segment_reduce(month[0] // 12, *month[1:])
+        # 月 → 季节（跨年合并）
+        season = _reduce_by_key(_month_to_season(month[0]), *month[1:])
+        return cls(columns, {"day": day, "month": month, "season": season, "year": year})
+
+    def merge(self, other):
+        """
+        合并两份部分和（如历史结果 + 新追加的小时数据），各粒度按key重新归约
+        跨越边界的同一天/同一月会把sum/count相加、min/max取极值
+        """
+        if other.columns != self.columns:
+            raise ValueError(f"列不一致，无法合并：{self.columns} vs {other.columns}")
+        parts = {}
+        for level in LEVELS:
+            parts[level] = _reduce_by_key(*(
+                np.concatenate([a, b]) for a, b in zip(self.parts[level], other.parts[level])
+            ))
+        return MultiResolutionAggregate(self.columns, parts)
+
+    def save(self, path):
+        """保存为.npz（仅数组，不依赖pickle）"""
+        arrays = {}
+        for level in LEVELS:
+            for name, arr in zip(("key",) + STATS, self.parts[level]):
+                arrays[f"{level}_{name}"] = arr
+        np.savez(path, columns=np.array(self.columns), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            parts = {
+                level: tuple(data[f"{level}_{name}"] for name in ("key",) + STATS)
+                for level in LEVELS
+            }
+            return cls(data["columns"].tolist(), parts)
+
+    @property
+    def levels(self):
+        if self._levels is None:
+            self._levels = {}
+            for level in LEVELS:
+                keys, *stats = self.parts[level]
+                index = _level_index(level, keys)
+                self._levels[level] = pd.concat(
+                    [pd.DataFrame(arr, index=index, columns=self.columns) for arr in stats],
+                    axis=1, keys=STATS
+                )
+        return self._levels
+
+    def stats(self, level, stat):
+        """取某一粒度的单个统计量（行：时间key，列：观测点）"""
+        return self.levels[level][stat]
+
+    def mean(self, level, columns=None):
+        """某一粒度的平均值（无有效数据的分组为NaN）"""
+        frame = self.levels[level]
+        sums, counts = frame["sum"], frame["count"]
+        if columns is not None:
+            sums, counts = sums[columns], counts[columns]
+        means = sums / counts.where(counts > 0)
+        if level == "season":
+            means = means.reindex(list(SEASON_NAMES))  # 固定春夏秋冬顺序
+        return means
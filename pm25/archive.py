@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import shutil
+import pandas as pd
+
+from . import config
+from .cache import add_date_columns, read_city_frame, read_city_range, read_columns, write_columns
+from .schema import CATEGORY_COLUMNS, csv_dtypes
+
+# ----------------------
+# 分区归档：按 city=/year=/month= 目录存放小时数据，查询时只读取命中的分区
+# ----------------------
+# 目录结构：PM2.5data/archive/city=Beijing/year=2014/month=01/
+#   meta.json   行数、日期范围、当前数据子目录与列描述（与列式缓存相同的格式）
+#   v<时间戳>-<进程号>/<序号>.npy  每列一个文件；重写分区时写入新的子目录后替换meta.json
+ARCHIVE_VERSION = 1
+ARCHIVE_DIR = os.path.join(config.DATA_DIR, "archive")
+
+
+def _city_dir(archive_dir, city):
+    return os.path.join(archive_dir, f"city={city}")
+
+
+def _partition_dir(archive_dir, city, year, month):
+    return os.path.join(_city_dir(archive_dir, city), f"year={year}", f"month={month:02d}")
+
+
+def _key_value(name, key):
+    """解析"year=2014"形式的目录名，不匹配时返回None"""
+    prefix = f"{key}="
+    if not name.startswith(prefix) or not name[len(prefix):].isdigit():
+        return None
+    return int(name[len(prefix):])
+
+
+def has_city(city, archive_dir=ARCHIVE_DIR):
+    return os.path.isdir(_city_dir(archive_dir, city))
+
+
+def list_partitions(city, start=None, end=None, archive_dir=ARCHIVE_DIR):
+    """
+    列出与日期范围（含两端）有交集的分区，只按目录名裁剪，不读取数据
+    返回：按时间排序的[(年, 月, 分区目录)]
+    """
+    first = None if start is None else (pd.Timestamp(start).year, pd.Timestamp(start).month)
+    last = None if end is None else (pd.Timestamp(end).year, pd.Timestamp(end).month)
+    partitions = []
+    city_dir = _city_dir(archive_dir, city)
+    if not os.path.isdir(city_dir):
+        return partitions
+    for year_name in os.listdir(city_dir):
+        year = _key_value(year_name, "year")
+        if year is None:
+            continue
+        for month_name in os.listdir(os.path.join(city_dir, year_name)):
+            month = _key_value(month_name, "month")
+            if month is None:
+                continue
+            if (first is not None and (year, month) < first) or (last is not None and (year, month) > last):
+                continue
+            path = os.path.join(city_dir, year_name, month_name)
+            if os.path.exists(os.path.join(path, "meta.json")):
+                partitions.append((year, month, path))
+    return sorted(partitions)
+
+
+def archive_state(city, archive_dir=ARCHIVE_DIR):
+    """
+    城市归档的指纹：{"年-月": 分区数据版本}，任一分区被重写（append）或新增时改变
+    只读取各分区的meta.json，供由归档派生的缓存（逐小时存储、等级立方体）判断是否失效
+    """
+    state = {}
+    for year, month, path in list_partitions(city, archive_dir=archive_dir):
+        meta = _read_partition_meta(path)
+        # 旧版分区（列文件直接放在分区目录下）没有数据子目录名，用meta.json的修改时间代替
+        state[f"{year}-{month:02d}"] = meta.get("data") or os.stat(os.path.join(path, "meta.json")).st_mtime_ns
+    return state
+
+
+def _read_partition_meta(path):
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != ARCHIVE_VERSION:
+        raise ValueError(f"分区版本不兼容，请重新导入：{path}")
+    return meta
+
+
+def _write_partition(path, df):
+    """
+    写入单个分区：列文件先写入新的数据子目录，再用os.replace原子替换meta.json切换到新数据
+    替换前后分区始终存在（读者看到的要么是旧数据要么是新数据），最后删除旧数据子目录
+    """
+    data_dir = f"v{time.time_ns()}-{os.getpid()}"
+    columns = write_columns(os.path.join(path, data_dir), df)
+    for desc in columns:
+        for key in ("file", "mask_file"):
+            if key in desc:
+                desc[key] = f"{data_dir}/{desc[key]}"
+    meta = {
+        "version": ARCHIVE_VERSION,
+        "rows": len(df),
+        "min_date": str(df["date"].min().date()),
+        "max_date": str(df["date"].max().date()),
+        "data": data_dir,
+        "columns": columns,
+    }
+    meta_path = os.path.join(path, "meta.json")
+    tmp_path = meta_path + f".tmp{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, meta_path)
+    for name in os.listdir(path):
+        if name not in ("meta.json", data_dir) and not name.startswith("meta.json.tmp"):
+            old = os.path.join(path, name)
+            if os.path.isdir(old):
+                shutil.rmtree(old)
+            else:
+                os.remove(old)
+
+
+def _read_partition(path, columns=None):
+    meta = _read_partition_meta(path)
+    return read_columns(path, meta["columns"], usecols=columns)
+
+
+def _iter_months(df):
+    """按(年, 月)拆分小时数据"""
+    dates = df["date"]
+    for (year, month), part in df.groupby([dates.dt.year, dates.dt.month], sort=True):
+        yield int(year), int(month), part.reset_index(drop=True)
+
+
+def ingest_city(city, csv_path, archive_dir=ARCHIVE_DIR):
+    """把单个城市的原始CSV整体改写为按年/月分区的归档，返回写入的分区数"""
+    df = read_city_frame(csv_path)
+    n_partitions = 0
+    for year, month, part in _iter_months(df):
+        _write_partition(_partition_dir(archive_dir, city, year, month), part)
+        n_partitions += 1
+    print(f"🗄️ {city}已导入分区归档：{n_partitions}个月分区，{len(df)}行")
+    return n_partitions
+
+
+def append_rows(city, new_df, archive_dir=ARCHIVE_DIR):
+    """
+    追加新的小时数据（如新一个月）：只重写涉及到的月分区
+    与已有数据时间重复的行（同一日期与小时）以新数据为准
+    返回：重写的分区数
+    """
+    new_df = add_date_columns(new_df)
+    n_partitions = 0
+    for year, month, part in _iter_months(new_df):
+        path = _partition_dir(archive_dir, city, year, month)
+        if os.path.exists(os.path.join(path, "meta.json")):
+            old = _read_partition(path)
+            part = pd.concat([old, part[old.columns]], ignore_index=True)
+            part = part.drop_duplicates(subset=["date", "hour"], keep="last")
+            part = part.sort_values(["date", "hour"], kind="stable").reset_index(drop=True)
+            _restore_categories(part)
+        _write_partition(path, part)
+        n_partitions += 1
+    return n_partitions
+
+
+def append_csv(city, csv_path, archive_dir=ARCHIVE_DIR):
+    """从CSV文件（表头与原始数据相同）追加新的小时数据"""
+    n_partitions = append_rows(city, pd.read_csv(csv_path, dtype=csv_dtypes(csv_path)), archive_dir)
+    print(f"🗄️ {city}已追加：{os.path.basename(csv_path)}，重写{n_partitions}个月分区")
+    return n_partitions
+
+
+def _restore_categories(df):
+    # 各分区的分类取值可能不同，合并后会退化为object，这里统一转回分类类型
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+
+
+def load_partitions(city, start=None, end=None, columns=None, archive_dir=ARCHIVE_DIR):
+    """
+    从分区归档读取单个城市数据：只打开与日期范围有交集的月分区，只读取所需列
+    只有首尾两个月分区需要再按日期逐行筛选；返回格式与cache.read_city_range一致
+    """
+    usecols = None if columns is None else ["date"] + [col for col in columns if col != "date"]
+    start = None if start is None else pd.Timestamp(start).normalize()
+    end = None if end is None else pd.Timestamp(end).normalize()
+    parts = []
+    for year, month, path in list_partitions(city, start, end, archive_dir):
+        part = _read_partition(path, usecols)
+        if start is not None and (year, month) == (start.year, start.month):
+            part = part[part["date"] >= start]
+        if end is not None and (year, month) == (end.year, end.month):
+            part = part[part["date"] <= end]
+        parts.append(part)
+    if not parts:
+        # 范围内没有分区：返回列类型一致的空表
+        all_partitions = list_partitions(city, archive_dir=archive_dir)
+        if not all_partitions:
+            raise FileNotFoundError(f"分区归档中没有{city}的数据：{_city_dir(archive_dir, city)}")
+        path = all_partitions[0][2]
+        parts.append(read_columns(path, _read_partition_meta(path)["columns"], usecols=usecols, rows=slice(0, 0)))
+    df = pd.concat(parts, ignore_index=True)
+    _restore_categories(df)
+    return df if usecols is None else df[usecols]
+
+
+def read_city(city, start=None, end=None, columns=None, csv_path=None, archive_dir=ARCHIVE_DIR):
+    """已导入分区归档的城市从归档读取，否则从原始CSV的列式缓存读取（两者均按日期与列裁剪）"""
+    if has_city(city, archive_dir):
+        return load_partitions(city, start=start, end=end, columns=columns, archive_dir=archive_dir)
+    return read_city_range(csv_path or config.file_path_dic[city], start=start, end=end, columns=columns)
+
+
+def load(cities=None, start=None, end=None, columns=None, file_path_dic=None, archive_dir=ARCHIVE_DIR):
+    """
+    查询接口：按城市、日期范围与列加载数据，在读取时即完成裁剪
+    - cities：城市列表，None表示file_path_dic中的全部城市
+    - start/end：起止日期（含两端），如"2014-01-01"
+    - columns：需要的列（如["PM_Dongsi", "PM_US Post"]），None表示全部列；date列总会返回
+    已导入分区归档的城市只读取命中的月分区，其余城市从列式缓存按行组裁剪读取
+    返回：{城市: DataFrame}，数据缺失的城市会被跳过
+    """
+    file_path_dic = file_path_dic or config.file_path_dic
+    cities = list(file_path_dic) if cities is None else cities
+    city_dfs = {}
+    for city in cities:
+        try:
+            city_dfs[city] = read_city(city, start, end, columns, file_path_dic.get(city), archive_dir)
+        except FileNotFoundError:
+            print(f"❌ 未找到{city}数据文件，路径：{file_path_dic.get(city)}")
+    return city_dfs
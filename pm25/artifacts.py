@@ -0,0 +1,140 @@
+import os
+import json
+import inspect
+import hashlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .profiling import stage
+
+# ----------------------
+# 结果产物指纹：输入数据切片 + 绘图/导出参数未变化时跳过重新生成
+# ----------------------
+# result/manifest.json记录每个产物（相对result目录的路径）的指纹，以及最近一次生成它的运行是复用还是重建
+# 清单由PM2.5.py、PM2.5.2.py与python -m pm25各子命令共用：保存时保留本次未涉及的产物记录，只覆盖本次登记的条目
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def _update(h, obj):
+    """把对象内容写入哈希（DataFrame/Series按值与索引逐行哈希，容器递归处理）"""
+    if isinstance(obj, pd.DataFrame):
+        h.update(repr(("DataFrame", list(obj.columns), [str(t) for t in obj.dtypes], list(obj.index.names))).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Series):
+        h.update(repr(("Series", obj.name, str(obj.dtype), list(obj.index.names))).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(repr(("ndarray", str(obj.dtype), obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(b"dict")
+        for key in sorted(obj, key=repr):
+            h.update(repr(key).encode())
+            _update(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for item in obj:
+            _update(h, item)
+    elif callable(obj):
+        # 绘图函数：模块名+函数名+源码（改动绘图代码后自动失效）
+        h.update(f"{obj.__module__}.{obj.__qualname__}".encode())
+        try:
+            h.update(inspect.getsource(obj).encode())
+        except (OSError, TypeError):
+            pass
+    else:
+        h.update(repr(obj).encode())
+
+
+def fingerprint(*parts):
+    """计算若干输入（数据切片、参数dict、绘图函数等）的sha1指纹"""
+    h = hashlib.sha1()
+    for part in parts:
+        _update(h, part)
+    return h.hexdigest()
+
+
+class ArtifactManifest:
+    """
+    result目录下的产物清单
+    - is_fresh：上次运行记录的指纹一致且文件仍存在时可复用
+    - record：登记本次运行中产物的指纹与状态（reused/rebuilt）
+    - save：以上次的清单为基础覆盖本次登记的条目（其他脚本/子命令的产物记录不丢失）
+    清单对象可pickle，子进程登记的结果通过entries返回后由主进程update合并
+    """
+
+    def __init__(self, result_dir):
+        self.result_dir = result_dir
+        self.path = os.path.join(result_dir, MANIFEST_NAME)
+        self.previous = self._load()
+        self.entries = {}
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return dict(manifest.get("artifacts", {}))
+
+    def _key(self, path):
+        return os.path.relpath(path, self.result_dir).replace(os.sep, "/")
+
+    def is_fresh(self, path, fp):
+        entry = self.previous.get(self._key(path))
+        return entry is not None and entry.get("fingerprint") == fp and os.path.exists(path)
+
+    def record(self, path, fp, reused):
+        self.entries[self._key(path)] = {"fingerprint": fp, "status": "reused" if reused else "rebuilt"}
+
+    def update(self, entries):
+        self.entries.update(entries)
+
+    def counts(self):
+        """返回本次运行的(复用数, 重建数)"""
+        reused = sum(entry["status"] == "reused" for entry in self.entries.values())
+        return reused, len(self.entries) - reused
+
+    def save(self):
+        """原子写入manifest.json（reused/rebuilt为本次运行的计数）"""
+        reused, rebuilt = self.counts()
+        artifacts = {**self.previous, **self.entries}
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "updated": datetime.now().isoformat(timespec="seconds"),
+            "reused": reused,
+            "rebuilt": rebuilt,
+            "artifacts": dict(sorted(artifacts.items())),
+        }
+        os.makedirs(self.result_dir, exist_ok=True)
+        tmp_path = self.path + f".tmp{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+def write_csv(df, path, manifest=None, **to_csv_kwargs):
+    """
+    导出CSV：指纹（数据+导出参数）与清单一致时跳过写入
+    返回：True表示本次写入，False表示复用已有文件
+    """
+    if manifest is None:
+        _to_csv(df, path, to_csv_kwargs)
+        return True
+    fp = fingerprint(df, to_csv_kwargs)
+    if manifest.is_fresh(path, fp):
+        manifest.record(path, fp, reused=True)
+        return False
+    _to_csv(df, path, to_csv_kwargs)
+    manifest.record(path, fp, reused=False)
+    return True
+
+
+def _to_csv(df, path, to_csv_kwargs):
+    with stage("to_csv", detail=os.path.basename(path), rows=len(df)):
+        df.to_csv(path, **to_csv_kwargs)
@@ -0,0 +1,244 @@
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import contextlib
+import platform
+import statistics
+import subprocess
+import tempfile
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from . import config
+from .cache import parse_city_csv, read_city_frame
+from .classify import CHINA_DAILY, CHINA_HOURLY, classify_levels
+from .pipeline import calc_city_daily_avg, calc_station_monthly_avg, city_daily_avg_spec, station_monthly_diff_spec
+from .render import RENDER_PRESETS, render_figure
+from .synthetic import fit_profile, iter_synthetic_chunks, station_names, write_csv
+
+# ----------------------
+# 基准测试：python -m pm25.bench [--synthetic 50x10 500x20] [--compare 旧结果.json]
+# ----------------------
+# 对 加载(CSV解析/列式缓存) → 月度平均 → 每日平均 → 等级分类 → 绘图 各阶段分别计时，
+# 结果（含提交号与运行环境）保存为JSON，便于在不同提交之间对比性能回归
+BENCH_DIR = os.path.join(config.PROJECT_DIR, "bench")
+SYNTHETIC_DIR = os.path.join(config.DATA_DIR, ".synthetic")
+
+# name：数据集名称；file_path_dic / china_monitors：与pm25.config相同的结构
+BenchData = namedtuple("BenchData", ["name", "file_path_dic", "china_monitors"])
+
+
+def bundled_data():
+    """随仓库提供的五城市数据（跳过缺失的文件）"""
+    paths = {city: path for city, path in config.file_path_dic.items() if os.path.exists(path)}
+    return BenchData("bundled", paths, {city: config.city_china_monitors[city] for city in paths})
+
+
+def synthetic_data(n_stations, n_years, data_dir=SYNTHETIC_DIR, seed=0):
+    """
+    放大的合成数据集：n_stations个中国观测点 + 美国大使馆，2010年起n_years年逐小时数据
+    由pm25.synthetic按北京数据拟合的规律生成（缺测比例5%），文件已存在时直接复用
+    """
+    name = f"synthetic_{n_stations}x{n_years}"
+    path = os.path.join(data_dir, f"{name}.csv")
+    if not os.path.exists(path):
+        profile = fit_profile(config.file_path_dic["Beijing"], "Beijing")
+        n_rows = write_csv(path, iter_synthetic_chunks(profile, n_stations, n_years, seed=seed))
+        print(f"🧪 合成数据已生成：{path}（{n_stations}个观测点，{n_years}年，{n_rows}行）")
+    return BenchData(name, {name: path}, {name: station_names(n_stations)})
+
+
+# ----------------------
+# 各阶段：fn(data, inputs) → 处理的行数；inputs为预先准备好的中间结果（不计入耗时）
+# ----------------------
+def _stage_load_csv(data, inputs):
+    return sum(len(parse_city_csv(path)) for path in data.file_path_dic.values())
+
+
+def _stage_load_cache(data, inputs):
+    return sum(len(read_city_frame(path)) for path in data.file_path_dic.values())
+
+
+def _stage_monthly(data, inputs):
+    for city, df in inputs["frames"].items():
+        calc_station_monthly_avg(df, city, data.china_monitors[city])
+    return inputs["rows"]
+
+
+def _stage_daily(data, inputs):
+    for city, df in inputs["frames"].items():
+        calc_city_daily_avg(df, data.china_monitors[city], config.us_col)
+    return inputs["rows"]
+
+
+def _stage_classify(data, inputs):
+    # 逐小时（美国大使馆）与每日（中美双口径）浓度分级
+    for city, df in inputs["frames"].items():
+        classify_levels(df[config.us_col], CHINA_HOURLY)
+        daily_avg = inputs["daily"][city]
+        classify_levels(daily_avg["China_Avg"], CHINA_DAILY)
+        classify_levels(daily_avg["US_Avg"], CHINA_DAILY)
+    return inputs["rows"]
+
+
+def _stage_render(data, inputs):
+    n_figures = 0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for city in inputs["frames"]:
+            monthly_avg = inputs["monthly"][city]
+            for spec in (
+                station_monthly_diff_spec(city, monthly_avg, data.china_monitors[city], tmp_dir),
+                city_daily_avg_spec(city, inputs["daily"][city], tmp_dir),
+            ):
+                if render_figure(spec._replace(message=None), RENDER_PRESETS["preview"]):
+                    n_figures += 1
+    return n_figures
+
+
+STAGES = {
+    "load_csv": _stage_load_csv,
+    "load_cache": _stage_load_cache,
+    "monthly": _stage_monthly,
+    "daily": _stage_daily,
+    "classify": _stage_classify,
+    "render": _stage_render,
+}
+
+
+@contextlib.contextmanager
+def _quiet():
+    """屏蔽各阶段的进度输出，只保留计时结果"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _prepare(data):
+    """准备各计算阶段的输入（同时预热列式缓存）"""
+    frames = {city: read_city_frame(path) for city, path in data.file_path_dic.items()}
+    return {
+        "frames": frames,
+        "rows": sum(len(df) for df in frames.values()),
+        "monthly": {city: calc_station_monthly_avg(df, city, data.china_monitors[city]) for city, df in frames.items()},
+        "daily": {city: calc_city_daily_avg(df, data.china_monitors[city], config.us_col) for city, df in frames.items()},
+    }
+
+
+def _time_stage(fn, data, inputs, repeat):
+    times = []
+    with _quiet():
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            n = fn(data, inputs)
+            times.append(time.perf_counter() - start)
+    return n, times
+
+
+def run_benchmarks(datasets, stages=None, repeat=3):
+    """
+    依次对每个数据集执行所选阶段，每个阶段重复repeat次
+    返回：结果记录列表（dataset/stage/n/repeat/min/median/mean，时间单位为秒）
+    """
+    stages = list(STAGES) if stages is None else stages
+    results = []
+    for data in datasets:
+        with _quiet():
+            inputs = _prepare(data)
+        print(f"⏱️ {data.name}：{len(data.file_path_dic)}个文件，{inputs['rows']}行")
+        for stage in stages:
+            n, times = _time_stage(STAGES[stage], data, inputs, repeat)
+            record = {
+                "dataset": data.name, "stage": stage, "n": n, "repeat": repeat,
+                "min": min(times), "median": statistics.median(times), "mean": statistics.fmean(times),
+            }
+            results.append(record)
+            print(f"   {stage:<10} 中位数{record['median'] * 1000:9.1f}ms  最小{record['min'] * 1000:9.1f}ms  (n={n})")
+    return results
+
+
+def _git_commit():
+    """当前提交号（工作区有未提交修改时加"-dirty"），不在git仓库中时为None"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=config.PROJECT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=config.PROJECT_DIR, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+
+def environment():
+    return {
+        "commit": _git_commit(),
+        "timestamp": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": results}, f, ensure_ascii=False, indent=1)
+
+
+def compare_results(results, baseline_path):
+    """与旧结果对比中位数耗时，返回DataFrame（ratio>1表示变慢）"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    old = pd.DataFrame(baseline["results"]).set_index(["dataset", "stage"])["median"]
+    new = pd.DataFrame(results).set_index(["dataset", "stage"])["median"]
+    table = pd.concat([old.rename("baseline"), new.rename("current")], axis=1, join="inner")
+    table["ratio"] = table["current"] / table["baseline"]
+    print(f"\n📊 与基准对比（{baseline['environment'].get('commit')}）：")
+    print(table.to_string(float_format=lambda x: f"{x:.4f}"))
+    return table
+
+
+def _scale(text):
+    """"50x10" → (50个观测点, 10年)"""
+    try:
+        n_stations, n_years = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"格式应为 观测点数x年数，如50x10：{text}") from None
+    return n_stations, n_years
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pm25.bench", description="PM2.5分析各阶段基准测试")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES), help="要测试的阶段（默认全部）")
+    parser.add_argument("--synthetic", nargs="*", type=_scale, default=[], metavar="NxY",
+                        help="额外测试的合成数据规模（观测点数x年数，如50x10 500x20）")
+    parser.add_argument("--no-bundled", action="store_true", help="不测试随仓库提供的五城市数据")
+    parser.add_argument("--repeat", type=int, default=3, help="每个阶段的重复次数")
+    parser.add_argument("--output", help="结果JSON路径（默认bench/bench_<提交号>.json）")
+    parser.add_argument("--compare", help="与之对比的旧结果JSON")
+    args = parser.parse_args(argv)
+
+    datasets = [] if args.no_bundled else [bundled_data()]
+    datasets += [synthetic_data(n_stations, n_years) for n_stations, n_years in args.synthetic]
+    if not datasets:
+        print("❌ 没有要测试的数据集")
+        return 1
+    results = run_benchmarks(datasets, args.stages, args.repeat)
+    output = args.output or os.path.join(BENCH_DIR, f"bench_{_git_commit() or 'nogit'}.json")
+    save_results(results, output)
+    print(f"💾 基准结果已保存：{output}")
+    if args.compare:
+        compare_results(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
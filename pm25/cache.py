@@ -0,0 +1,290 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+from .profiling import stage
+from .schema import csv_dtypes, memory_report
+
+# ----------------------
+# 列式二进制缓存：每个城市CSV只解析一次，之后按列读取.npy
+# ----------------------
+# 缓存目录结构：<CSV所在目录>/.cache/<CSV文件名(无后缀)>/
+#   meta.json   源文件指纹（mtime/大小/sha1）+ 列名与列类型 + 按年划分的行组统计
+#   <序号>.npy  每列一个文件（列名含空格，故用序号命名）
+CACHE_VERSION = 4  # 2：按pm25.schema紧凑类型存储；3：meta增加行组统计（按日期范围裁剪读取）；4：气象列与season不再压缩
+CACHE_DIRNAME = ".cache"
+DATE_PART_COLUMNS = ["year", "month", "day", "hour"]
+
+
+def _cache_dir(csv_path):
+    folder, name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(folder, CACHE_DIRNAME, os.path.splitext(name)[0])
+
+
+def file_sha1(path, block_size=1 << 20):
+    """文件内容的sha1（按块读取），mtime变化时用于确认内容是否真的改变"""
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def _read_meta(cache_dir):
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != CACHE_VERSION:
+        return None
+    return meta
+
+
+def _write_meta(cache_dir, meta):
+    # 先写临时文件再替换，保证meta.json要么完整要么不存在
+    meta_path = os.path.join(cache_dir, "meta.json")
+    tmp_path = meta_path + f".tmp{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, meta_path)
+
+
+def source_state(csv_path):
+    """源文件指纹（mtime与大小），各缓存/存储（列式缓存、逐小时存储、等级立方体、特征矩阵）据此判断是否失效"""
+    st = os.stat(csv_path)
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def add_date_columns(df):
+    """补充date/year_month列并过滤无效日期，cbwd转为分类类型"""
+    # 合并年月日为日期格式（用于按天/按月分组）
+    df["date"] = pd.to_datetime(df[["year", "month", "day"]], errors="coerce")
+    # 提取“年月”（用于月度差异分析，格式：2010-01）
+    df["year_month"] = df["date"].dt.to_period("M")
+    # 过滤无效日期数据
+    df = df.dropna(subset=["date", "year_month"]).reset_index(drop=True)
+    if "cbwd" in df.columns:
+        df["cbwd"] = df["cbwd"].astype("category")
+    return df
+
+
+def parse_city_csv(csv_path):
+    """按紧凑类型解析原始CSV，补充date/year_month列"""
+    return add_date_columns(pd.read_csv(csv_path, dtype=csv_dtypes(csv_path)))
+
+
+def iter_city_chunks(csv_path, chunksize, usecols=None):
+    """
+    分块读取原始CSV（每块补充date/year_month列），峰值内存只与chunksize有关
+    usecols：需要的观测点/气象列，年月日时列会自动加入
+    """
+    if usecols is not None:
+        usecols = DATE_PART_COLUMNS + [col for col in usecols if col not in DATE_PART_COLUMNS]
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, usecols=usecols, dtype=csv_dtypes(csv_path)):
+        yield add_date_columns(chunk)
+
+
+def write_columns(cache_dir, df):
+    """把DataFrame按列写成.npy，返回列描述（写入meta.json）"""
+    os.makedirs(cache_dir, exist_ok=True)
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        desc = {"name": col, "file": f"{i}.npy"}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            desc["kind"] = "category"
+            desc["categories"] = [str(c) for c in series.cat.categories]
+            values = series.cat.codes.to_numpy()
+        elif isinstance(series.array, pd.arrays.IntegerArray):
+            # 可空整数：数值与缺失掩码分两个文件保存
+            desc["kind"] = "masked"
+            desc["mask_file"] = f"{i}.mask.npy"
+            values = series.to_numpy(dtype=series.dtype.numpy_dtype, na_value=0)
+            np.save(os.path.join(cache_dir, desc["mask_file"]), series.isna().to_numpy(), allow_pickle=False)
+        elif isinstance(series.dtype, pd.PeriodDtype):
+            desc["kind"] = "period"
+            desc["freq"] = series.array.freqstr
+            values = series.array.asi8
+        else:
+            desc["kind"] = "array"
+            values = series.to_numpy()
+        np.save(os.path.join(cache_dir, desc["file"]), values, allow_pickle=False)
+        columns.append(desc)
+    return columns
+
+
+def read_columns(cache_dir, columns, usecols=None, mmap_mode=None, rows=None):
+    """
+    按列描述读回DataFrame，usecols为None时读取全部列
+    rows：只读取的行（切片或行号数组），配合mmap_mode="r"时只有选中的行会被读入内存
+    """
+    data = {}
+    for desc in columns:
+        if usecols is not None and desc["name"] not in usecols:
+            continue
+        values = np.load(os.path.join(cache_dir, desc["file"]), mmap_mode=mmap_mode)
+        if rows is not None:
+            values = np.asarray(values[rows])
+        if desc["kind"] == "category":
+            values = pd.Categorical.from_codes(values, categories=desc["categories"])
+        elif desc["kind"] == "masked":
+            mask = np.load(os.path.join(cache_dir, desc["mask_file"]), mmap_mode=mmap_mode)
+            if rows is not None:
+                mask = mask[rows]
+            values = pd.arrays.IntegerArray(np.asarray(values), np.asarray(mask))
+        elif desc["kind"] == "period":
+            values = pd.PeriodIndex.from_ordinals(values, freq=desc["freq"]).array
+        data[desc["name"]] = values
+    return pd.DataFrame(data)
+
+
+def _row_groups(df):
+    """按年划分连续行组，记录每组的行区间与日期范围（供按日期裁剪时跳过整组）"""
+    dates = df["date"].to_numpy().astype("datetime64[D]")
+    if len(dates) == 0:
+        return [], True
+    years = dates.astype("datetime64[Y]").astype("int64") + 1970
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(years)) + 1))
+    stops = np.append(starts[1:], len(dates))
+    groups = [
+        {
+            "year": int(years[start]),
+            "start": int(start),
+            "stop": int(stop),
+            "min_date": str(dates[start:stop].min()),
+            "max_date": str(dates[start:stop].max()),
+        }
+        for start, stop in zip(starts, stops)
+    ]
+    return groups, bool(np.all(dates[1:] >= dates[:-1]))
+
+
+def _valid_meta(csv_path, cache_dir):
+    """返回仍然有效的缓存meta（mtime变化但内容未变时刷新指纹），无效时返回None"""
+    state = source_state(csv_path)
+    meta = _read_meta(cache_dir)
+    if meta is None:
+        return None
+    source = meta["source"]
+    if source["mtime_ns"] == state["mtime_ns"] and source["size"] == state["size"]:
+        return meta
+    if source["size"] == state["size"] and source["sha1"] == file_sha1(csv_path):
+        meta["source"].update(state)
+        _write_meta(cache_dir, meta)
+        return meta
+    return None
+
+
+def _rebuild_cache(csv_path, cache_dir):
+    """重新解析CSV并重建缓存，返回(DataFrame, meta)"""
+    state = source_state(csv_path)
+    df = parse_city_csv(csv_path)
+    # 先删除旧meta，避免列文件写到一半时被当作有效缓存
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    columns = write_columns(cache_dir, df)
+    state["sha1"] = file_sha1(csv_path)
+    row_groups, date_sorted = _row_groups(df)
+    meta = {"version": CACHE_VERSION, "source": state, "columns": columns,
+            "row_groups": row_groups, "date_sorted": date_sorted}
+    _write_meta(cache_dir, meta)
+    return df, meta
+
+
+def read_city_frame(csv_path, use_cache=True):
+    """
+    读取单个城市数据（优先使用列式缓存）
+    - 源文件mtime与大小未变：直接读缓存
+    - mtime变化但sha1未变（如被touch/复制）：刷新指纹后读缓存
+    - 内容变化或缓存缺失：重新解析CSV并重建缓存
+    """
+    with stage("load", detail=os.path.basename(csv_path)) as rec:
+        if not use_cache:
+            df = parse_city_csv(csv_path)
+        else:
+            cache_dir = _cache_dir(csv_path)
+            meta = _valid_meta(csv_path, cache_dir)
+            df = read_columns(cache_dir, meta["columns"]) if meta is not None else _rebuild_cache(csv_path, cache_dir)[0]
+        rec["rows"] = len(df)
+    return df
+
+
+def _date_rows(cache_dir, meta, start, end):
+    """
+    按日期范围（含两端，datetime64[D]或None）确定需要读取的行
+    先用行组的日期范围跳过整组，日期有序时再在date列（内存映射）上二分查找边界
+    返回：切片或行号数组
+    """
+    groups = [
+        g for g in meta["row_groups"]
+        if (start is None or np.datetime64(g["max_date"]) >= start)
+        and (end is None or np.datetime64(g["min_date"]) <= end)
+    ]
+    if not groups:
+        return slice(0, 0)
+    desc = next(d for d in meta["columns"] if d["name"] == "date")
+    dates = np.load(os.path.join(cache_dir, desc["file"]), mmap_mode="r")
+    if meta["date_sorted"]:
+        # 日期有序时命中的行组是连续的，在其中二分查找起止边界
+        lo, hi = groups[0]["start"], groups[-1]["stop"]
+        window = dates[lo:hi]
+        first = np.searchsorted(window, start.astype(dates.dtype), side="left") if start is not None else 0
+        last = np.searchsorted(window, end.astype(dates.dtype), side="right") if end is not None else len(window)
+        return slice(lo + int(first), lo + int(max(first, last)))
+    # 日期无序：只在命中的行组内逐行比较
+    rows = np.concatenate([np.arange(g["start"], g["stop"]) for g in groups])
+    day = np.asarray(dates[rows]).astype("datetime64[D]")
+    keep = np.ones(len(rows), dtype=bool)
+    if start is not None:
+        keep &= day >= start
+    if end is not None:
+        keep &= day <= end
+    return rows[keep]
+
+
+def read_city_range(csv_path, start=None, end=None, columns=None):
+    """
+    按日期范围与列读取单个城市数据（谓词下推：未选中的行与列不会被读入内存）
+    - start/end：起止日期（含两端），None表示不限
+    - columns：需要的观测点/气象等列，None表示全部列；date列总会返回
+    """
+    cache_dir = _cache_dir(csv_path)
+    meta = _valid_meta(csv_path, cache_dir)
+    if meta is None:
+        meta = _rebuild_cache(csv_path, cache_dir)[1]
+    start = None if start is None else np.datetime64(pd.Timestamp(start).date(), "D")
+    end = None if end is None else np.datetime64(pd.Timestamp(end).date(), "D")
+    rows = None if start is None and end is None else _date_rows(cache_dir, meta, start, end)
+    usecols = None
+    if columns is not None:
+        usecols = ["date"] + [col for col in columns if col != "date"]
+        missing = set(usecols) - {desc["name"] for desc in meta["columns"]}
+        if missing:
+            raise KeyError(f"数据中不存在的列：{sorted(missing)}")
+    df = read_columns(cache_dir, meta["columns"], usecols=usecols, mmap_mode="r", rows=rows)
+    return df if usecols is None else df[usecols]
+
+
+def load_city_data(file_path_dic, use_cache=True, report_memory=False):
+    """
+    批量加载五城市数据，添加日期与年月列（首次解析后走列式缓存）
+    report_memory=True时打印各城市紧凑类型相对默认类型节省的内存
+    """
+    city_dfs = {}
+    for city, path in file_path_dic.items():
+        try:
+            df = read_city_frame(path, use_cache=use_cache)
+            city_dfs[city] = df
+            print(f"✅ {city}数据加载完成：时间范围{df['date'].min().date()}~{df['date'].max().date()}，有效行数{len(df)}")
+        except FileNotFoundError:
+            print(f"❌ 未找到{city}数据文件，路径：{path}")
+        except Exception as e:
+            print(f"⚠️ {city}数据加载异常：{str(e)}")
+    if report_memory and city_dfs:
+        print("💾 各城市内存占用（紧凑类型 vs 默认类型）：")
+        print(memory_report(city_dfs).to_string(index=False))
+    return city_dfs
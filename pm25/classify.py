@@ -0,0 +1,87 @@
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+from .profiling import stage
+
+# ----------------------
+# 污染等级与季节的向量化分类（searchsorted代替逐元素apply）
+# ----------------------
+# edges为各等级浓度上限（μg/m³，右闭区间：上一级上限 < 值 <= 本级上限），
+# 最后一个等级无上限，因此 len(labels) == len(edges) + 1
+BreakpointTable = namedtuple("BreakpointTable", ["name", "edges", "labels"])
+
+# 中国《环境空气质量标准》(GB 3095-2012) / HJ 633-2012 PM2.5 24小时平均分级
+CHINA_DAILY = BreakpointTable(
+    "GB3095-2012 24小时",
+    (35, 75, 115, 150, 250),
+    ("优", "良", "轻度污染", "中度污染", "重度污染", "严重污染"),
+)
+# 五级口径（150以上统称重度污染），与已有的等级分布结果保持一致
+CHINA_DAILY_5 = BreakpointTable(
+    "GB3095-2012 24小时（五级）",
+    (35, 75, 115, 150),
+    ("优", "良", "轻度污染", "中度污染", "重度污染"),
+)
+# HJ 633-2012中PM2.5没有单独的1小时分级，实时报沿用24小时浓度限值
+CHINA_HOURLY = CHINA_DAILY._replace(name="GB3095-2012 1小时（沿用24小时限值）")
+
+# 美国EPA AQI PM2.5分级（2012版断点，与2010-2015年数据同期）
+US_EPA_DAILY = BreakpointTable(
+    "US EPA AQI 24小时",
+    (12.0, 35.4, 55.4, 150.4, 250.4),
+    ("良好", "中等", "对敏感人群不健康", "不健康", "非常不健康", "危险"),
+)
+# 美国实时AQI（NowCast）同样使用24小时断点
+US_EPA_HOURLY = US_EPA_DAILY._replace(name="US EPA AQI NowCast（沿用24小时断点）")
+
+BREAKPOINT_TABLES = {
+    ("china", "daily"): CHINA_DAILY,
+    ("china", "hourly"): CHINA_HOURLY,
+    ("us", "daily"): US_EPA_DAILY,
+    ("us", "hourly"): US_EPA_HOURLY,
+}
+
+SEASON_NAMES = ("春季", "夏季", "秋季", "冬季")  # 3-5月春，6-8月夏，9-11月秋，12-2月冬
+
+
+def get_breakpoints(standard="china", resolution="daily"):
+    """按标准（china/us）与时间分辨率（daily/hourly）取分级表"""
+    try:
+        return BREAKPOINT_TABLES[(standard, resolution)]
+    except KeyError:
+        raise ValueError(f"未知的分级标准：{standard}/{resolution}") from None
+
+
+def level_codes(values, table=CHINA_DAILY):
+    """浓度数组 → 等级编码（0为最轻一级，NaN为-1）"""
+    values = np.asarray(values, dtype="float64")
+    codes = np.searchsorted(np.asarray(table.edges, dtype="float64"), values, side="left").astype("int8")
+    codes[np.isnan(values)] = -1
+    return codes
+
+
+def classify_levels(values, table=CHINA_DAILY):
+    """
+    浓度 → 污染等级（有序分类类型，NaN保持缺失）
+    输入为Series时返回同索引的Series，否则返回Categorical
+    """
+    with stage("classify", detail=table.name, rows=len(values)):
+        levels = pd.Categorical.from_codes(level_codes(values, table), categories=list(table.labels), ordered=True)
+    if isinstance(values, pd.Series):
+        return pd.Series(levels, index=values.index, name=values.name)
+    return levels
+
+
+def season_codes(months):
+    """月份(1-12) → 季节编码（0春 1夏 2秋 3冬）"""
+    months = np.asarray(months, dtype="int64")
+    return ((months - 3) % 12 // 3).astype("int8")
+
+
+def classify_seasons(months):
+    """月份 → 季节（分类类型，按春夏秋冬排序）"""
+    seasons = pd.Categorical.from_codes(season_codes(months), categories=list(SEASON_NAMES), ordered=True)
+    if isinstance(months, pd.Series):
+        return pd.Series(seasons, index=months.index, name="season")
+    return seasons
@@ -0,0 +1,347 @@
+import os
+import argparse
+import pandas as pd
+
+from . import config
+from .aggregate import MultiResolutionAggregate
+from .archive import ARCHIVE_DIR, append_csv, has_city, ingest_city, read_city
+from .artifacts import ArtifactManifest, write_csv
+from .dataset import get_dataset
+from .diurnal import DiurnalProfile
+from .episodes import city_daily_episodes, station_episodes
+from .executor import default_workers
+from .figures import (
+    draw_china_boxplot, draw_level_heatmap, draw_pollution_rose, draw_seasonal_bar, draw_us_china_scatter, draw_yearly_trend,
+)
+from .metrics import CompareSums, us_china_compare_table
+from .pipeline import (
+    calc_city_stats, calc_level_consistency, calc_level_crosstab, calc_level_distribution,
+    city_daily_avg_spec, city_stack_spec, level_distribution_spec, station_monthly_diff_spec,
+)
+from .profiling import PROFILE_ENV, finish_run, start_run
+from .render import RENDER_PRESETS, figure_spec, render_figures
+from .rolling import HOURLY_WINDOWS, RollingWindow, city_daily_rolling
+from .rose import DIRECTION_ANGLES, WIND_DIRECTIONS, WIND_SPEED_LABELS, PollutionRose
+
+# ----------------------
+# 命令行入口：python -m pm25 <子命令> [--cities ...] [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+# ----------------------
+# 各子命令共用同一个进程内数据集（每个城市只加载一次），图表统一排队后批量渲染
+TIGHT = {"bbox_inches": "tight"}
+COMPARE_DECIMALS = {"相关系数": 3, "平均绝对误差(μg/m³)": 2, "平均相对误差(%)": 2, "平均偏差(μg/m³)": 2, "均方根误差(μg/m³)": 2, "等级一致率(%)": 2}
+
+
+def _available_cities(ds, cities):
+    """跳过缺失数据（既无分区归档也无原始CSV）的城市，数据在各分析中按日期范围与所需列按需读取"""
+    available = []
+    for city in cities:
+        if not has_city(city, ds.archive_dir) and not os.path.exists(ds.file_path_dic[city]):
+            print(f"❌ 未找到{city}数据文件，路径：{ds.file_path_dic[city]}")
+            continue
+        available.append(city)
+    return available
+
+
+def _range_label(start, end):
+    if start is None and end is None:
+        return "全部时间"
+    return f"{start or '起始'}~{end or '结束'}"
+
+
+def cmd_daily(ds, cities, start, end, result_dir, manifest):
+    """每日平均（中美双口径）CSV与折线图，五城市年度趋势与季节对比图"""
+    specs = []
+    city_yearly, city_seasonal = {}, {}
+    for city in cities:
+        daily_avg = ds.daily_avg(city, start, end)
+        print(f"📈 {city}每日平均计算完成：有效天数{len(daily_avg)}，中国口径均值{daily_avg['China_Avg'].mean():.2f}μg/m³")
+        daily_avg_export = daily_avg.reset_index()
+        daily_avg_export["date"] = daily_avg_export["date"].dt.date  # 简化日期格式（仅保留年月日）
+        write_csv(
+            daily_avg_export, os.path.join(result_dir, f"{city}_每日PM2.5平均值.csv"), manifest,
+            index=False, columns=["date", "China_Avg", "US_Avg", "year"]
+        )
+        specs.append(city_daily_avg_spec(city, daily_avg, result_dir))
+        # 年度与季节平均由每日数据的多粒度聚合读取
+        daily_agg = MultiResolutionAggregate.from_daily(daily_avg, ["China_Avg"])
+        city_yearly[city] = daily_agg.mean("year")["China_Avg"]
+        city_seasonal[city] = daily_agg.mean("season")["China_Avg"]
+
+    specs.append(figure_spec(
+        draw_yearly_trend, os.path.join(result_dir, "五城市PM2.5年度趋势.png"),
+        message="📊 五城市PM2.5年度趋势图已保存", savefig_kwargs=TIGHT, city_yearly=city_yearly
+    ))
+    specs.append(figure_spec(
+        draw_seasonal_bar, os.path.join(result_dir, "五城市PM2.5季节对比.png"),
+        message="📊 五城市PM2.5季节对比图已保存", savefig_kwargs=TIGHT, city_seasonal=city_seasonal
+    ))
+    return specs
+
+
+def cmd_monthly(ds, cities, start, end, result_dir, manifest):
+    """各观测点月度平均CSV与对比折线图"""
+    specs = []
+    for city in cities:
+        monthly_avg = ds.monthly_avg(city, start, end)
+        if monthly_avg is None:
+            continue
+        write_csv(monthly_avg, os.path.join(result_dir, f"{city}_各观测点月度PM2.5数据.csv"), manifest, index=False)
+        specs.append(station_monthly_diff_spec(city, monthly_avg, ds.china_monitors[city], result_dir))
+    return specs
+
+
+def cmd_levels(ds, cities, start, end, result_dir, manifest):
+    """中美污染等级一致性、等级分布（单城市与五城汇总）及等级交叉热力图"""
+    specs = []
+    consistency_summary, china_dist_rows, us_dist_rows = [], [], []
+    for city in cities:
+        daily_avg = ds.daily_avg(city, start, end)
+        consistency = calc_level_consistency(city, daily_avg)
+        if consistency is not None:
+            consistency_summary.append(consistency)
+        china_row, us_row = calc_level_distribution(city, daily_avg, result_dir, manifest)
+        china_dist_rows.append(china_row)
+        us_dist_rows.append(us_row)
+        specs.append(level_distribution_spec(city, china_row, us_row, result_dir))
+        if consistency is not None:
+            specs.append(figure_spec(
+                draw_level_heatmap, os.path.join(result_dir, f"{city}中美等级交叉热力图.png"),
+                message=f"📊 {city}中美等级交叉热力图已保存", savefig_kwargs=TIGHT,
+                city=city, crosstab=calc_level_crosstab(daily_avg)
+            ))
+
+    if consistency_summary:
+        consistency_path = os.path.join(result_dir, "中美污染等级一致性汇总.csv")
+        write_csv(pd.DataFrame(consistency_summary), consistency_path, manifest, index=False)
+        print(f"📋 中美等级一致性汇总表已保存：{consistency_path}")
+
+    china_summary_df = pd.DataFrame(china_dist_rows)
+    us_summary_df = pd.DataFrame(us_dist_rows)
+    china_summary_path = os.path.join(result_dir, "五城市污染等级分布_中国口径.csv")
+    us_summary_path = os.path.join(result_dir, "五城市污染等级分布_美国口径.csv")
+    write_csv(china_summary_df, china_summary_path, manifest, index=False)
+    write_csv(us_summary_df, us_summary_path, manifest, index=False)
+    print(f"🗂️ 五城市等级分布汇总表已保存：{china_summary_path} / {us_summary_path}")
+    specs.append(city_stack_spec(china_summary_df, "五城市污染等级分布（中国环保部口径）", "五城市污染等级分布_中国口径_堆叠.png", result_dir))
+    specs.append(city_stack_spec(us_summary_df, "五城市污染等级分布（美国大使馆口径）", "五城市污染等级分布_美国口径_堆叠.png", result_dir))
+    return specs
+
+
+def cmd_compare(ds, cities, start, end, result_dir, manifest):
+    """中美监测结果对比：日均与超标率、相关性与误差、箱线图与散点图"""
+    specs = []
+    city_daily = {city: ds.daily_avg(city, start, end) for city in cities}
+
+    # 按“中国口径日均”排序（污染从重到轻）
+    city_stats_df = pd.DataFrame([calc_city_stats(city, daily) for city, daily in city_daily.items()])
+    city_stats_df = city_stats_df.sort_values("中国口径日均PM2.5(μg/m³)", ascending=False)
+    compare_df = pd.DataFrame(us_china_compare_table(city_daily))
+    print("\n五城市PM2.5统计对比表（中国vs美国）：")
+    print(city_stats_df)
+    print("\n中美监测结果对比表：")
+    print(compare_df)
+    write_csv(city_stats_df, os.path.join(result_dir, "五城市PM2.5统计对比.csv"), manifest, index=False)
+    write_csv(compare_df, os.path.join(result_dir, "中美监测结果对比.csv"), manifest, index=False)
+
+    # 逐年/逐月/滚动30天窗口的对比指标（跟踪观测点校准漂移），一次前缀和计算
+    sums = CompareSums.from_daily(city_daily)
+    for label, table in (
+        ("逐年", sums.by_period("year")), ("逐月", sums.by_period("month")), ("滚动30天", sums.rolling(30)),
+    ):
+        table = table.round(COMPARE_DECIMALS)
+        table["起始日期"], table["结束日期"] = table["起始日期"].dt.date, table["结束日期"].dt.date
+        write_csv(table, os.path.join(result_dir, f"中美监测指标_{label}.csv"), manifest, index=False)
+    print(f"📋 中美监测指标（逐年/逐月/滚动30天）已保存：{result_dir}")
+
+    specs.append(figure_spec(
+        draw_china_boxplot, os.path.join(result_dir, "五城市PM2.5箱线图.png"),
+        message="📊 五城市PM2.5箱线图已保存", savefig_kwargs=TIGHT,
+        cities=city_stats_df["城市"].tolist(),
+        china_data=[city_daily[city]["China_Avg"].dropna() for city in city_stats_df["城市"]]
+    ))
+    for city, daily in city_daily.items():
+        valid_df = daily.dropna(subset=["China_Avg", "US_Avg"])
+        if len(valid_df) == 0:
+            continue
+        specs.append(figure_spec(
+            draw_us_china_scatter, os.path.join(result_dir, f"{city}中美监测散点图.png"),
+            message=f"📊 {city}中美监测散点图已保存", savefig_kwargs=TIGHT,
+            city=city, valid_df=valid_df[["China_Avg", "US_Avg"]]
+        ))
+    return specs
+
+
+def cmd_rolling(ds, cities, start, end, result_dir, manifest):
+    """滚动24小时/7天/30天均值、最大值与超标次数：城市每日序列全程导出，各观测点只计算截至最后一小时的窗口（预警用）"""
+    latest_rows = []
+    for city in cities:
+        daily_rolling = city_daily_rolling(ds.daily_avg(city, start, end))
+        daily_rolling.index = daily_rolling.index.date
+        write_csv(daily_rolling, os.path.join(result_dir, f"{city}_每日PM2.5滚动统计.csv"), manifest, index_label="date")
+
+        store = ds.hourly(city)
+        index = store.time_index(start, end)
+        if len(index) == 0:
+            continue
+        for station in ds.stations(city):
+            values = store.window(station, start, end)
+            row = {"城市": city, "观测点": station, "时间": index[-1]}
+            for name, size in HOURLY_WINDOWS.items():
+                stat = RollingWindow.from_history(values, size).stat  # 只需最后size个小时
+                row.update({f"{name}_mean": round(stat.mean, 2), f"{name}_max": stat.max, f"{name}_exceed": stat.exceed})
+            latest_rows.append(row)
+
+    if latest_rows:
+        latest_path = os.path.join(result_dir, "各观测点最新滚动统计.csv")
+        write_csv(pd.DataFrame(latest_rows), latest_path, manifest, index=False)
+        print(f"🚨 各观测点最新滚动统计已保存：{latest_path}")
+    return []
+
+
+def cmd_episodes(ds, cities, start, end, result_dir, manifest):
+    """污染过程（连续超过75/115/150/250μg/m³的时段）：各观测点逐小时、城市中美口径逐日"""
+    for city in cities:
+        daily_episodes = city_daily_episodes(ds.daily_avg(city, start, end))
+        for col in ("start", "end"):
+            daily_episodes[col] = daily_episodes[col].dt.date
+        write_csv(daily_episodes, os.path.join(result_dir, f"{city}_污染过程_逐日.csv"), manifest, index=False)
+        longest = daily_episodes[(daily_episodes["series"] == "China_Avg") & (daily_episodes["threshold"] == 75)]
+        if len(longest):
+            row = longest.loc[longest["duration"].idxmax()]
+            print(f"🌫️ {city}最长污染过程（中国口径>75μg/m³）：{row['start']}~{row['end']}，{row['duration']}天，峰值{row['peak']:.1f}μg/m³")
+
+        store = ds.hourly(city)
+        hourly_episodes = station_episodes(store, ds.stations(city), start, end)
+        write_csv(hourly_episodes, os.path.join(result_dir, f"{city}_污染过程_逐小时.csv"), manifest, index=False)
+    return []
+
+
+def cmd_diurnal(ds, cities, start, end, result_dir, manifest):
+    """各观测点（含美国大使馆）按季节 × 星期 × 小时的日变化廓线：均值、P50/P90/P95、超标率"""
+    for city in cities:
+        profile = DiurnalProfile.from_store(ds.hourly(city), ds.stations(city), start, end)
+        table = profile.table().round(2)
+        write_csv(table, os.path.join(result_dir, f"{city}_日变化廓线.csv"), manifest, index=False)
+        hourly_mean = profile.table(by="hour").groupby("小时")["均值"].mean()
+        print(f"🕒 {city}日变化廓线完成：小时均值最高{hourly_mean.idxmax()}时（{hourly_mean.max():.1f}μg/m³），最低{hourly_mean.idxmin()}时（{hourly_mean.min():.1f}μg/m³）")
+    return []
+
+
+def cmd_rose(ds, cities, start, end, result_dir, manifest):
+    """污染玫瑰：各观测点按风向 × 风速等级 × 季节的均值、超标率与污染负荷占比，并绘制美国大使馆观测点的玫瑰图"""
+    specs = []
+    directions = [d for d in WIND_DIRECTIONS if d in DIRECTION_ANGLES]
+    calm = WIND_DIRECTIONS.index("cv")
+    for city in cities:
+        stations = ds.stations(city)
+        df = read_city(city, start, end, ["month", "cbwd", "Iws"] + stations, csv_path=ds.file_path_dic[city], archive_dir=ds.archive_dir)
+        rose = PollutionRose.from_hourly(df, stations)
+        write_csv(rose.table().round(2), os.path.join(result_dir, f"{city}_污染玫瑰.csv"), manifest, index=False)
+
+        share = rose.load_share(ds.us_col)
+        by_direction = share.sum(axis=1)
+        print(f"🧭 {city}污染玫瑰完成：美国大使馆负荷占比最高的风向为{WIND_DIRECTIONS[by_direction.argmax()]}（{by_direction.max():.1f}%）")
+        specs.append(figure_spec(
+            draw_pollution_rose, os.path.join(result_dir, f"{city}污染玫瑰.png"),
+            message=f"📊 {city}污染玫瑰图已保存", savefig_kwargs=TIGHT,
+            city=city, station=ds.us_col, directions=directions,
+            angles=[DIRECTION_ANGLES[d] for d in directions], speed_labels=list(WIND_SPEED_LABELS),
+            share=share[[WIND_DIRECTIONS.index(d) for d in directions]], calm_share=float(by_direction[calm]),
+        ))
+    return specs
+
+
+COMMANDS = {
+    "daily": cmd_daily,
+    "monthly": cmd_monthly,
+    "levels": cmd_levels,
+    "compare": cmd_compare,
+    "rolling": cmd_rolling,
+    "episodes": cmd_episodes,
+    "diurnal": cmd_diurnal,
+    "rose": cmd_rose,
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m pm25", description="PM2.5五城市分析")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    helps = {
+        "daily": "每日平均（中美双口径）、年度趋势与季节对比",
+        "monthly": "各观测点月度平均对比",
+        "levels": "中美污染等级一致性与等级分布",
+        "compare": "中美监测结果对比（超标率、相关性、误差）",
+        "rolling": "滚动24小时/7天/30天均值、最大值与超标次数",
+        "episodes": "污染过程：连续超过75/115/150/250μg/m³的时段（起止、持续时长、峰值、累积暴露）",
+        "diurnal": "日变化廓线：各观测点按季节 × 星期 × 小时的均值、百分位数与超标率",
+        "rose": "污染玫瑰：各观测点按风向 × 风速等级 × 季节的浓度、超标率与污染负荷占比",
+        "report": "依次执行以上全部分析（数据只加载一次）",
+    }
+    for name, help_text in helps.items():
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("--cities", nargs="+", choices=config.CITIES, default=config.CITIES, help="城市（默认全部）")
+        sub.add_argument("--start", help="起始日期（含），如2014-01-01")
+        sub.add_argument("--end", help="结束日期（含），如2015-12-31")
+        sub.add_argument("--result-dir", default=config.result_dir, help="结果保存目录")
+        sub.add_argument("--preset", choices=list(RENDER_PRESETS), help="渲染预设（默认按环境变量PM25_RENDER_PRESET）")
+        sub.add_argument("--workers", type=int, default=None, help="图表渲染进程数（默认按环境变量PM25_WORKERS）")
+        sub.add_argument("--profile", metavar="DIR", help="记录各阶段耗时/CPU/峰值内存并保存到该目录（同环境变量PM25_PROFILE）")
+
+    # 分区归档维护
+    sub = subparsers.add_parser("ingest", help="把原始CSV改写为city=/year=/month=分区归档")
+    sub.add_argument("--cities", nargs="+", choices=config.CITIES, default=config.CITIES, help="城市（默认全部）")
+    sub.add_argument("--archive-dir", default=ARCHIVE_DIR, help="归档目录")
+    sub = subparsers.add_parser("append", help="把新的小时数据CSV追加到分区归档（只重写涉及的月分区）")
+    sub.add_argument("city", choices=config.CITIES, help="城市")
+    sub.add_argument("csv", nargs="+", help="新数据CSV（表头与原始数据相同）")
+    sub.add_argument("--archive-dir", default=ARCHIVE_DIR, help="归档目录")
+    return parser
+
+
+def cmd_ingest(args):
+    for city in args.cities:
+        path = config.file_path_dic[city]
+        if not os.path.exists(path):
+            print(f"❌ 未找到{city}数据文件，路径：{path}")
+            continue
+        ingest_city(city, path, args.archive_dir)
+    return 0
+
+
+def cmd_append(args):
+    for path in args.csv:
+        append_csv(args.city, path, args.archive_dir)
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "ingest":
+        return cmd_ingest(args)
+    if args.command == "append":
+        return cmd_append(args)
+    if args.profile:
+        os.environ[PROFILE_ENV] = args.profile  # 经环境变量传给渲染子进程
+    start_run(args.command)
+    os.makedirs(args.result_dir, exist_ok=True)
+    ds = get_dataset()
+    cities = _available_cities(ds, args.cities)
+    if not cities:
+        print("❌ 无有效城市数据，程序终止")
+        finish_run()
+        return 1
+    print(f"📅 分析范围：{_range_label(args.start, args.end)}，城市：{'、'.join(cities)}")
+
+    manifest = ArtifactManifest(args.result_dir)
+    commands = list(COMMANDS) if args.command == "report" else [args.command]
+    specs = []
+    for name in commands:
+        specs.extend(COMMANDS[name](ds, cities, args.start, args.end, args.result_dir, manifest))
+    render_figures(specs, preset=args.preset, max_workers=args.workers or default_workers(), manifest=manifest)
+
+    reused, rebuilt = manifest.counts()
+    manifest.save()
+    print(f"🗃️ 产物清单已保存：{manifest.path}（复用{reused}个，重新生成{rebuilt}个）")
+    finish_run()
+    print("\n🎉 分析完成！结果文件已保存至：", os.path.abspath(args.result_dir))
+    return 0
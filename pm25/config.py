@@ -0,0 +1,27 @@
+import os
+
+# ----------------------
+# 公共配置：数据文件路径与监测点定义（各脚本与命令行共用）
+# ----------------------
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_DIR, "PM2.5data")
+
+# 五城市数据文件路径
+file_path_dic = {
+    "Beijing": os.path.join(DATA_DIR, "BeijingPM20100101_20151231.csv"),
+    "Shanghai": os.path.join(DATA_DIR, "ShanghaiPM20100101_20151231.csv"),
+    "Chengdu": os.path.join(DATA_DIR, "ChengduPM20100101_20151231.csv"),
+    "Guangzhou": os.path.join(DATA_DIR, "GuangzhouPM20100101_20151231.csv"),
+    "Shenyang": os.path.join(DATA_DIR, "ShenyangPM20100101_20151231.csv")
+}
+# 各城市中国环保部监测点
+city_china_monitors = {
+    "Beijing": ["PM_Dongsi", "PM_Dongsihuan", "PM_Nongzhanguan"],
+    "Shanghai": ["PM_Jingan", "PM_Xuhui"],
+    "Chengdu": ["PM_Caotangsi", "PM_Shahepu"],
+    "Guangzhou": ["PM_City Station", "PM_5th Middle School"],
+    "Shenyang": ["PM_Taiyuanjie", "PM_Xiaoheyan"]
+}
+us_col = "PM_US Post"  # 美国大使馆统一监测点
+result_dir = "result"  # 结果保存目录（相对当前工作目录）
+CITIES = list(file_path_dic)
@@ -0,0 +1,176 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from . import config
+from .archive import archive_state, has_city
+from .cache import source_state
+from .classify import CHINA_DAILY, level_codes
+from .pipeline import calc_city_avg_cn, calc_city_daily_avg_cn
+
+# ----------------------
+# 污染等级天数立方体：城市 × 序列 × 年 × 月 × 等级 → 天数
+# ----------------------
+# 序列为中国口径（China_Avg）、美国口径（US_Avg）、PM2.5.3口径（China_Avg_Hourly）与各观测点的日均值；
+# 构建时把五个维度的下标编码为一个整数key，一次np.bincount得到全部计数，
+# 之后“某城市某序列某时段各等级天数”之类的查询只对小数组切片求和，不再读取每日数据
+CUBE_VERSION = 2  # 2：增加China_Avg_Hourly序列，归档城市按归档指纹判断失效
+CUBE_DIR = os.path.join(config.DATA_DIR, ".cube")
+CUBE_DIMS = ("city", "series", "year", "month", "level")
+MONTHS = list(range(1, 13))
+HOURLY_SERIES = "China_Avg_Hourly"  # 全部国控点同时有观测的小时均值的日均（pipeline.calc_city_daily_avg_cn）
+
+
+def cube_path(table, cube_dir=CUBE_DIR):
+    """分级表对应的立方体文件（按等级上限命名，不同分级表各存一份）"""
+    return os.path.join(cube_dir, "level_cube_" + "-".join(f"{edge:g}" for edge in table.edges) + ".npz")
+
+
+class LevelCube:
+    """
+    等级天数立方体（counts形状为(城市, 序列, 年, 12, 等级)，int32）
+    - query(by=..., city=..., series=..., year=..., month=..., level=...)：按维度筛选后汇总
+    - save / load：保存为.npz（仅数组，不依赖pickle）
+    某城市没有的观测点序列计数为0
+    """
+
+    def __init__(self, cities, series, years, table, counts, sources=None):
+        self.cities = list(cities)
+        self.series = list(series)
+        self.years = list(years)
+        self.table = table
+        self.counts = counts
+        self.sources = sources or {}
+        self._coords = {
+            "city": self.cities, "series": self.series, "year": self.years,
+            "month": MONTHS, "level": list(table.labels),
+        }
+        self._positions = {dim: {value: i for i, value in enumerate(values)} for dim, values in self._coords.items()}
+
+    @classmethod
+    def build(cls, city_daily, table=CHINA_DAILY, sources=None):
+        """
+        city_daily：{城市: 日均值DataFrame（日期索引，每列一个序列）}
+        各列按table分级后编码计数，缺测日不计入
+        """
+        series = []
+        for daily in city_daily.values():
+            series.extend(col for col in daily.columns if col not in series)
+        years = sorted({year for daily in city_daily.values() for year in daily.index.year.unique()})
+        years = list(range(years[0], years[-1] + 1)) if years else []
+        shape = (len(city_daily), len(series), len(years), 12, len(table.labels))
+
+        keys = []
+        for c, daily in enumerate(city_daily.values()):
+            year_idx = daily.index.year.to_numpy() - (years[0] if years else 0)
+            month_idx = daily.index.month.to_numpy() - 1
+            for col in daily.columns:
+                codes = level_codes(daily[col].to_numpy(dtype="float64"), table)
+                valid = codes >= 0
+                keys.append(np.ravel_multi_index(
+                    (np.full(valid.sum(), c), np.full(valid.sum(), series.index(col)),
+                     year_idx[valid], month_idx[valid], codes[valid]),
+                    shape,
+                ))
+        keys = np.concatenate(keys) if keys else np.array([], dtype="int64")
+        counts = np.bincount(keys, minlength=int(np.prod(shape))).astype("int32").reshape(shape)
+        return cls(list(city_daily), series, years, table, counts, sources)
+
+    def _indexer(self, dim, value):
+        """筛选值（单个值或列表，None表示全部）→ 该维度的下标数组"""
+        if value is None:
+            return np.arange(len(self._coords[dim]))
+        values = [value] if np.ndim(value) == 0 else list(value)
+        try:
+            return np.array([self._positions[dim][v] for v in values], dtype="int64")
+        except KeyError as e:
+            raise ValueError(f"立方体中没有{dim}={e.args[0]}（可选：{self._coords[dim]}）") from None
+
+    def query(self, by=(), **selection):
+        """
+        按维度筛选并汇总天数
+        selection：city/series/year/month/level = 单个值或列表（不指定为全部）
+        by：保留的维度（按给出的顺序），其余维度求和；
+        返回：by为空时为总天数(int)，一个维度时为Series，两个维度时为DataFrame（第一个维度为行），更多维度时为多级索引Series
+        例：cube.query(by=("year", "level"), city="Beijing", series="US_Avg", year=[2014, 2015])
+        """
+        by = (by,) if isinstance(by, str) else tuple(by)
+        unknown = (set(selection) | set(by)) - set(CUBE_DIMS)
+        if unknown:
+            raise ValueError(f"未知的维度：{sorted(unknown)}（可选：{list(CUBE_DIMS)}）")
+        indexers = [self._indexer(dim, selection.get(dim)) for dim in CUBE_DIMS]
+        sub = self.counts[np.ix_(*indexers)]
+        keep = [CUBE_DIMS.index(dim) for dim in by]
+        sub = sub.sum(axis=tuple(i for i in range(len(CUBE_DIMS)) if i not in keep), dtype="int64")
+        if not by:
+            return int(sub)
+        sub = np.transpose(sub, [sorted(keep).index(i) for i in keep])  # 求和后保留的轴按维度原顺序，调整为by的顺序
+        labels = [pd.Index([self._coords[dim][i] for i in indexers[CUBE_DIMS.index(dim)]], name=dim) for dim in by]
+        if len(by) == 1:
+            return pd.Series(sub, index=labels[0])
+        if len(by) == 2:
+            return pd.DataFrame(sub, index=labels[0], columns=labels[1])
+        return pd.Series(sub.ravel(), index=pd.MultiIndex.from_product(labels))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + f".tmp{os.getpid()}.npz"
+        np.savez(
+            tmp_path, version=CUBE_VERSION, counts=self.counts,
+            cities=np.array(self.cities), series=np.array(self.series), years=np.array(self.years, dtype="int64"),
+            table_name=np.array(self.table.name), edges=np.array(self.table.edges, dtype="float64"),
+            labels=np.array(self.table.labels), sources=np.array(json.dumps(self.sources)),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != CUBE_VERSION:
+                raise ValueError(f"等级立方体版本不一致：{path}")
+            table = CHINA_DAILY._make((str(data["table_name"]), tuple(data["edges"].tolist()), tuple(data["labels"].tolist())))
+            return cls(
+                data["cities"].tolist(), data["series"].tolist(), data["years"].tolist(), table,
+                data["counts"], json.loads(str(data["sources"])),
+            )
+
+
+def _city_source(dataset, city):
+    """城市数据的指纹：已导入分区归档的城市为归档指纹（数据从归档读取），否则为源CSV指纹；均无数据时为None"""
+    if has_city(city, dataset.archive_dir):
+        return {"archive": archive_state(city, dataset.archive_dir)}
+    csv_path = dataset.file_path_dic[city]
+    return {"csv": source_state(csv_path)} if os.path.exists(csv_path) else None
+
+
+def open_level_cube(dataset, table=CHINA_DAILY, path=None):
+    """
+    数据集（pm25.dataset.Dataset）全部城市的等级立方体：已保存且各城市数据与分级表均未变化时直接读取，否则重建并保存
+    数据是否变化与数据集的读取来源一致：已导入分区归档的城市看归档（追加分区后重建），其余城市看源CSV
+    序列为China_Avg、US_Avg、China_Avg_Hourly与各观测点日均值；缺失数据的城市跳过
+    """
+    path = path or cube_path(table)
+    sources = {city: _city_source(dataset, city) for city in dataset.file_path_dic}
+    sources = {city: source for city, source in sources.items() if source is not None}
+    if os.path.exists(path):
+        try:
+            cube = LevelCube.load(path)
+        except (ValueError, KeyError, OSError):
+            cube = None
+        same_table = cube is not None and cube.table.edges == tuple(map(float, table.edges)) and cube.table.labels == tuple(table.labels)
+        if same_table and cube.sources == sources:
+            return cube
+
+    city_daily = {}
+    for city in sources:
+        monitors = dataset.china_monitors[city]
+        agg = dataset.aggregate(city)
+        daily_avg = dataset.daily_avg(city)
+        hourly_avg = calc_city_daily_avg_cn(calc_city_avg_cn(dataset.select(city), monitors)).rename(HOURLY_SERIES)
+        station_daily = agg.mean("day", monitors + [dataset.us_col])
+        city_daily[city] = pd.concat([daily_avg[["China_Avg", "US_Avg"]], hourly_avg, station_daily], axis=1)
+    cube = LevelCube.build(city_daily, table, sources)
+    cube.save(path)
+    print(f"🧊 等级立方体已保存：{path}（{len(cube.cities)}个城市，{len(cube.series)}个序列，{cube.years[0] if cube.years else '-'}~{cube.years[-1] if cube.years else '-'}年）")
+    return cube
@@ -0,0 +1,127 @@
+import pandas as pd
+
+from . import config
+from .aggregate import MultiResolutionAggregate
+from .archive import ARCHIVE_DIR, has_city, read_city
+from .cache import read_city_frame
+from .classify import CHINA_DAILY
+from .cube import open_level_cube
+from .features import FeatureMatrix
+from .hourly import HourlyStore
+from .pipeline import calc_city_daily_avg_from_aggregate, calc_station_monthly_avg_from_aggregate
+from .profiling import stage
+
+# ----------------------
+# 进程内共享数据集：各城市小时数据只加载一次，多个分析复用
+# ----------------------
+
+
+def _day(value):
+    """起止日期统一为当天0点的Timestamp（None表示不限）"""
+    return None if value is None else pd.Timestamp(value).normalize()
+
+
+class Dataset:
+    """
+    五城市数据集
+    - frame(city)：全部列的小时数据（列式缓存读取，进程内只加载一次）
+    - select(city, start, end)：日期范围内的观测点列；未加载全量数据时在读取缓存时即裁剪行与列
+    - hourly(city)：逐小时内存映射存储（各观测点一条float32数组；已导入分区归档的城市由归档构建）
+    - features(city)：逐小时气象协变量特征矩阵（滞后、滚动均值、时间编码与目标列，float32，按日期切片）
+    - aggregate(city, start, end)：日期范围内的多粒度聚合，按(城市, 起止日期)缓存；
+      未导入分区归档且未加载全量数据时由逐小时存储直接计算
+    - daily_avg / monthly_avg：由聚合结果计算，每次返回新的DataFrame（调用方可自由添加列）
+    - level_cube(table)：全部城市的等级天数立方体（城市 × 序列 × 年 × 月 × 等级），持久化并在进程内复用
+    起止日期均包含当天
+    """
+
+    def __init__(self, file_path_dic=None, china_monitors=None, us_col=None, archive_dir=ARCHIVE_DIR):
+        self.file_path_dic = file_path_dic or config.file_path_dic
+        self.archive_dir = archive_dir
+        self.china_monitors = china_monitors or config.city_china_monitors
+        self.us_col = us_col or config.us_col
+        self._frames = {}
+        self._aggs = {}
+        self._stores = {}
+        self._features = {}
+        self._cubes = {}
+
+    def stations(self, city):
+        return self.china_monitors[city] + [self.us_col]
+
+    def frame(self, city):
+        """城市小时数据，文件缺失时抛出FileNotFoundError"""
+        if city not in self._frames:
+            df = read_city_frame(self.file_path_dic[city])
+            print(f"✅ {city}数据加载完成：时间范围{df['date'].min().date()}~{df['date'].max().date()}，有效行数{len(df)}")
+            self._frames[city] = df
+        return self._frames[city]
+
+    def select(self, city, start=None, end=None):
+        """按日期范围筛选小时数据（含date与观测点列）"""
+        start, end = _day(start), _day(end)
+        if city not in self._frames:
+            # 谓词下推：只读取范围内的行与所需的列（已导入分区归档时只打开命中的月分区）
+            return read_city(city, start, end, self.stations(city), csv_path=self.file_path_dic[city], archive_dir=self.archive_dir)
+        df = self.frame(city)
+        if start is None and end is None:
+            return df
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= df["date"] >= start
+        if end is not None:
+            mask &= df["date"] <= end
+        return df[mask]
+
+    def hourly(self, city):
+        """城市逐小时内存映射存储（已导入分区归档的城市由归档构建，否则由列式缓存构建；源数据变化时重建）"""
+        if city not in self._stores:
+            if has_city(city, self.archive_dir):
+                self._stores[city] = HourlyStore.open_archive(city, self.archive_dir)
+            else:
+                self._stores[city] = HourlyStore.open(self.file_path_dic[city])
+        return self._stores[city]
+
+    def features(self, city):
+        """城市逐小时特征矩阵（首次使用时构建并保存，源文件未变化时直接打开）"""
+        if city not in self._features:
+            self._features[city] = FeatureMatrix.open(self.file_path_dic[city], self.stations(city))
+        return self._features[city]
+
+    def aggregate(self, city, start=None, end=None):
+        key = (city, _day(start), _day(end))
+        if key not in self._aggs:
+            if city in self._frames or has_city(city, self.archive_dir):
+                agg = MultiResolutionAggregate.from_hourly(self.select(city, start, end), self.stations(city))
+            else:
+                # 逐小时存储：按整天切片后reshape为(天数, 24)直接归约，不解析日期也不分组
+                agg = self.hourly(city).aggregate(self.stations(city), *key[1:])
+            self._aggs[key] = agg
+        return self._aggs[key]
+
+    def daily_avg(self, city, start=None, end=None):
+        """每日平均（China_Avg/US_Avg/year）"""
+        with stage("daily_avg", city=city):
+            return calc_city_daily_avg_from_aggregate(self.aggregate(city, start, end), self.china_monitors[city], self.us_col)
+
+    def monthly_avg(self, city, start=None, end=None):
+        """各观测点月度平均（无有效观测点时为None）"""
+        with stage("monthly_avg", city=city):
+            return calc_station_monthly_avg_from_aggregate(self.aggregate(city, start, end), city, self.china_monitors[city])
+
+    def level_cube(self, table=CHINA_DAILY):
+        """全部城市（全时段）的等级天数立方体，各城市数据（分区归档或源文件）未变化时直接读取已保存的结果"""
+        if table.name not in self._cubes:
+            self._cubes[table.name] = open_level_cube(self, table)
+        return self._cubes[table.name]
+
+
+_dataset = None
+
+
+def get_dataset():
+    """当前进程共享的默认数据集（按pm25.config配置）"""
+    global _dataset
+    if _dataset is None:
+        _dataset = Dataset()
+    return _dataset
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+
+from .classify import SEASON_NAMES, season_codes
+from .rolling import EXCEED_THRESHOLD
+
+# ----------------------
+# 日变化廓线：小时(24) × 星期(7) × 季节(4) 各格子的均值、百分位数与超标率
+# ----------------------
+# 每个观测值编码为一个整数key（观测点, 季节, 星期, 小时[, 浓度分箱]），一次np.bincount得到
+# 各格子的和、超标次数与浓度直方图；结果只有计数与和，可跨数据块/文件直接相加（merge）
+# 百分位数由直方图求得（分箱宽度BIN_WIDTH，原始数据为整数μg/m³时与np.percentile(method="inverted_cdf")一致），
+# 超过MAX_VALUE的值计入最后一个分箱
+DIMS = ("season", "weekday", "hour")
+WEEKDAY_NAMES = ("周一", "周二", "周三", "周四", "周五", "周六", "周日")
+N_SEASONS, N_WEEKDAYS, N_HOURS = len(SEASON_NAMES), len(WEEKDAY_NAMES), 24
+N_CELLS = N_SEASONS * N_WEEKDAYS * N_HOURS
+BIN_WIDTH = 1.0
+MAX_VALUE = 1000.0
+PERCENTILES = (50, 90, 95)
+DIM_LABELS = {"season": list(SEASON_NAMES), "weekday": list(WEEKDAY_NAMES), "hour": list(range(N_HOURS))}
+DIM_COLUMNS = {"season": "季节", "weekday": "星期", "hour": "小时"}
+
+
+def _cells(day_numbers, hours):
+    """1970-01-01起的天数与小时 → 格子编号（季节, 星期, 小时）"""
+    days = np.asarray(day_numbers, dtype="int64")
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype("int64") % 12 + 1
+    weekdays = (days + 3) % 7  # 1970-01-01为周四，周一为0
+    return (season_codes(months).astype("int64") * N_WEEKDAYS + weekdays) * N_HOURS + np.asarray(hours, dtype="int64")
+
+
+class DiurnalProfile:
+    """
+    各观测点的日变化廓线部分结果
+    - sums / counts / exceed：(列数, 格子数)；hist：(列数, 格子数, 分箱数)
+    - from_hourly / from_chunks / from_store 构建，merge 合并，save / load 持久化（.npz）
+    - table(by)：按所选维度（默认季节 × 星期 × 小时）汇总后的均值、百分位数与超标率
+    """
+
+    def __init__(self, columns, sums, counts, exceed, hist, threshold=EXCEED_THRESHOLD, bin_width=BIN_WIDTH):
+        self.columns = list(columns)
+        self.sums = sums
+        self.counts = counts
+        self.exceed = exceed
+        self.hist = hist
+        self.threshold = threshold
+        self.bin_width = bin_width
+
+    @classmethod
+    def from_arrays(cls, columns, cells, values, threshold=EXCEED_THRESHOLD, bin_width=BIN_WIDTH):
+        """cells：各行的格子编号；values：(行数, 列数)的浓度（缺测为NaN）"""
+        n_cols, n_bins = len(columns), int(MAX_VALUE / bin_width) + 1
+        values = np.asarray(values, dtype="float64").reshape(len(cells), n_cols)
+        cells = np.asarray(cells, dtype="int64")
+        valid = ~np.isnan(values)
+        col_cells = (np.arange(n_cols) * N_CELLS + cells[:, None])[valid]  # (行, 列)展平
+        v = values[valid]
+        size = n_cols * N_CELLS
+        # 直方图逐列计数后写入int32数组：bincount的int64结果只有单列大小（格子数 × 分箱数），
+        # 不会按全部列一次分配再复制
+        hist = np.zeros((n_cols, N_CELLS, n_bins), dtype="int32")
+        for j in range(n_cols):
+            col_v = values[valid[:, j], j]
+            bins = np.minimum(np.maximum(col_v, 0) // bin_width, n_bins - 1).astype("int64")
+            hist[j] = np.bincount(cells[valid[:, j]] * n_bins + bins, minlength=N_CELLS * n_bins).reshape(N_CELLS, n_bins)
+        return cls(
+            columns,
+            np.bincount(col_cells, weights=v, minlength=size).reshape(n_cols, N_CELLS),
+            np.bincount(col_cells, minlength=size).reshape(n_cols, N_CELLS),
+            np.bincount(col_cells[v > threshold], minlength=size).reshape(n_cols, N_CELLS),
+            hist, threshold, bin_width,
+        )
+
+    @classmethod
+    def from_hourly(cls, df, columns, date_col="date", hour_col="hour", **kwargs):
+        """由小时数据（含日期与小时列）构建"""
+        day_numbers = df[date_col].to_numpy().astype("datetime64[D]").astype("int64")
+        return cls.from_arrays(columns, _cells(day_numbers, df[hour_col].to_numpy()), df[columns].to_numpy(dtype="float64"), **kwargs)
+
+    @classmethod
+    def from_chunks(cls, chunks, columns, **kwargs):
+        """流式构建：逐块计数后合并，峰值内存只与块大小有关"""
+        profile = None
+        for chunk in chunks:
+            part = cls.from_hourly(chunk, columns, **kwargs)
+            profile = part if profile is None else profile.merge(part)
+        return profile if profile is not None else cls.from_arrays(columns, np.empty(0, dtype="int64"), np.empty((0, len(columns))), **kwargs)
+
+    @classmethod
+    def from_store(cls, store, stations=None, start=None, end=None, **kwargs):
+        """由逐小时存储（pm25.hourly.HourlyStore）构建，稠密网格的小时下标直接换算为格子编号"""
+        stations = store.stations if stations is None else list(stations)
+        hours = store.time_index(start, end).to_numpy().astype("datetime64[h]").astype("int64")
+        values = np.stack([store.window(station, start, end) for station in stations], axis=1)
+        return cls.from_arrays(stations, _cells(hours // 24, hours % 24), values, **kwargs)
+
+    def merge(self, other):
+        """合并两份部分结果（列、阈值与分箱须一致）"""
+        if other.columns != self.columns:
+            raise ValueError(f"列不一致，无法合并：{self.columns} vs {other.columns}")
+        if (other.threshold, other.bin_width) != (self.threshold, self.bin_width):
+            raise ValueError("超标阈值或分箱宽度不一致，无法合并")
+        return DiurnalProfile(
+            self.columns, self.sums + other.sums, self.counts + other.counts, self.exceed + other.exceed,
+            self.hist + other.hist, self.threshold, self.bin_width,
+        )
+
+    def save(self, path):
+        """保存为.npz（仅数组，不依赖pickle）"""
+        np.savez(
+            path, columns=np.array(self.columns), sums=self.sums, counts=self.counts, exceed=self.exceed, hist=self.hist,
+            threshold=self.threshold, bin_width=self.bin_width,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["columns"].tolist(), data["sums"], data["counts"], data["exceed"], data["hist"],
+                float(data["threshold"]), float(data["bin_width"]),
+            )
+
+    def _percentiles(self, hist, counts):
+        """直方图(..., 分箱数) → 各百分位数(..., len(PERCENTILES))，取累计频数首次达到q%的分箱下限"""
+        cum = np.cumsum(hist, axis=-1)
+        result = np.full(counts.shape + (len(PERCENTILES),), np.nan)
+        for i, q in enumerate(PERCENTILES):
+            target = np.ceil(counts * q / 100).clip(min=1)
+            idx = (cum < target[..., None]).sum(axis=-1)
+            result[..., i] = np.where(counts > 0, idx * self.bin_width, np.nan)
+        return result
+
+    def table(self, by=DIMS):
+        """
+        按所选维度汇总（其余维度合并）的廓线表：每列（观测点）× 所选维度每个组合一行
+        列：观测点、所选维度、有效小时数、均值、P50/P90/P95、超标率(%)
+        """
+        by = (by,) if isinstance(by, str) else tuple(by)
+        if set(by) - set(DIMS):
+            raise ValueError(f"未知的维度：{sorted(set(by) - set(DIMS))}（可选：{list(DIMS)}）")
+        keep = [DIMS.index(dim) for dim in by]
+        drop = tuple(1 + i for i in range(len(DIMS)) if i not in keep)
+        shape = (len(self.columns), N_SEASONS, N_WEEKDAYS, N_HOURS)
+        order = [0] + [1 + sorted(keep).index(i) for i in keep]  # 求和后的轴按by给出的顺序排列
+        sums = self.sums.reshape(shape).sum(axis=drop).transpose(order)
+        counts = self.counts.reshape(shape).sum(axis=drop).transpose(order)
+        exceed = self.exceed.reshape(shape).sum(axis=drop).transpose(order)
+        hist = self.hist.reshape(shape + (-1,)).sum(axis=drop, dtype="int64").transpose(order + [len(order)])
+        percentiles = self._percentiles(hist, counts)
+
+        index = pd.MultiIndex.from_product(
+            [self.columns] + [DIM_LABELS[dim] for dim in by], names=["观测点"] + [DIM_COLUMNS[dim] for dim in by]
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frame = pd.DataFrame({
+                "有效小时数": counts.ravel(),
+                "均值": np.where(counts > 0, sums / counts, np.nan).ravel(),
+                **{f"P{q}": percentiles[..., i].ravel() for i, q in enumerate(PERCENTILES)},
+                "超标率(%)": np.where(counts > 0, exceed / counts * 100, np.nan).ravel(),
+            }, index=index)
+        return frame.reset_index()
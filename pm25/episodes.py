@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from .classify import CHINA_DAILY
+
+# ----------------------
+# 污染过程识别：浓度连续高于阈值的小时（天）段
+# ----------------------
+# (序列, 时间)矩阵展平后，取出高于最低阈值的位置与浓度，相邻位置不连续（或换行）处即为过程分界：
+# 用np.diff + np.flatnonzero做游程编码（run-length encoding）一次找出所有序列的全部过程，
+# 峰值与累积暴露用np.maximum.reduceat / np.add.reduceat按段归约，不逐条循环；
+# 阈值从低到高依次处理，每一级只在上一级的超标点中继续筛选（高阈值过程必在低阈值过程之内），数组逐级变小
+# 缺测（NaN）视为未超标，会中断过程
+EPISODE_THRESHOLDS = tuple(CHINA_DAILY.edges[1:])  # 75/115/150/250：轻度/中度/重度/严重污染的下限
+EPISODE_COLUMNS = ["series", "threshold", "start", "end", "duration", "peak", "mean", "exposure"]
+
+
+def detect_episodes(matrix, names, index, thresholds=EPISODE_THRESHOLDS, min_duration=1, step_hours=1):
+    """
+    matrix：(序列数, 时间点数)的等间隔浓度（缺测为NaN），names：各行序列名，index：时间点（DatetimeIndex）
+    thresholds：各阈值分别识别（浓度 > 阈值为超标），min_duration：最短持续时间点数
+    step_hours：相邻时间点间隔的小时数（逐小时为1，每日为24），用于累积暴露
+    返回：DataFrame（series/threshold/start/end/duration/peak/mean/exposure），按thresholds给出的顺序排列
+    - start/end：首个/最后一个超标时间点（含）；duration：持续时间点数
+    - peak / mean：过程内最大/平均浓度（μg/m³）；exposure：累积暴露（浓度 × 小时，μg/m³·h）
+    """
+    matrix = np.atleast_2d(np.asarray(matrix))
+    n_rows, n = matrix.shape
+    names = list(names)
+    frames = {}
+    pos, values = None, matrix.ravel()
+    for threshold in sorted(thresholds):
+        with np.errstate(invalid="ignore"):
+            keep = values > threshold
+        if pos is None:
+            pos = np.flatnonzero(keep)  # 最低阈值：直接取超标点在展平矩阵中的位置
+            values = values[pos]
+        else:
+            pos, values = pos[keep], values[keep]
+        # 游程起点：与前一个超标点不相邻，或恰好位于一行（一个序列）的开头
+        breaks = np.ones(len(pos), dtype=bool)
+        np.not_equal(pos[1:] - pos[:-1], 1, out=breaks[1:])
+        row_firsts = np.searchsorted(pos, np.arange(1, n_rows) * n)
+        row_firsts = row_firsts[row_firsts < len(pos)]
+        breaks[row_firsts[pos[row_firsts] % n == 0]] = True
+        starts = np.flatnonzero(breaks)
+        if len(starts):
+            ends = np.append(starts[1:], len(pos))
+            total = np.add.reduceat(values, starts, dtype="float64")
+            peak = np.maximum.reduceat(values, starts).astype("float64")
+        else:
+            ends, total, peak = starts, np.array([], dtype="float64"), np.array([], dtype="float64")
+        duration = ends - starts
+        long_enough = duration >= min_duration
+        first, last = pos[starts][long_enough], pos[ends - 1][long_enough]
+        duration, total = duration[long_enough], total[long_enough]
+        frames[threshold] = pd.DataFrame({
+            "series": pd.Categorical.from_codes(first // n, categories=names),
+            "threshold": np.full(len(first), threshold),
+            "start": index[first % n],
+            "end": index[last % n],
+            "duration": duration,
+            "peak": peak[long_enough],
+            "mean": total / np.maximum(duration, 1),
+            "exposure": total * step_hours,
+        })
+    if not frames:
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+    return pd.concat([frames[threshold] for threshold in thresholds], ignore_index=True)
+
+
+def station_episodes(store, stations=None, start=None, end=None, thresholds=EPISODE_THRESHOLDS, min_duration=1):
+    """逐小时存储（pm25.hourly.HourlyStore）中各观测点的逐小时污染过程（duration单位为小时）"""
+    stations = store.stations if stations is None else list(stations)
+    matrix = np.stack([store.window(station, start, end) for station in stations])
+    return detect_episodes(matrix, stations, store.time_index(start, end), thresholds, min_duration, step_hours=1)
+
+
+def city_daily_episodes(daily_avg, thresholds=EPISODE_THRESHOLDS, min_duration=1):
+    """
+    每日平均（calc_city_daily_avg的结果）China_Avg/US_Avg的逐日污染过程（duration单位为天）
+    先补齐为连续日历，缺测日中断过程
+    """
+    columns = ["China_Avg", "US_Avg"]
+    if len(daily_avg) == 0:
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+    days = pd.date_range(daily_avg.index.min(), daily_avg.index.max(), freq="D", name=daily_avg.index.name)
+    dense = daily_avg[columns].reindex(days)
+    return detect_episodes(dense.to_numpy(dtype="float64").T, columns, days, thresholds, min_duration, step_hours=24)
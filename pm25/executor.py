@@ -0,0 +1,34 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# ----------------------
+# 多进程按城市并行执行分析流程
+# ----------------------
+WORKERS_ENV = "PM25_WORKERS"  # 环境变量：并行进程数（未设置时使用CPU核数）
+
+
+def default_workers():
+    """读取并行进程数配置：环境变量PM25_WORKERS优先，否则为CPU核数"""
+    value = os.environ.get(WORKERS_ENV)
+    if value:
+        return max(1, int(value))
+    return os.cpu_count() or 1
+
+
+def run_per_city(worker, city_args, max_workers=None):
+    """
+    对每个城市在独立进程中执行worker(city, *args)
+    - city_args：{城市: 参数元组}，结果按该字典的城市顺序返回
+    - max_workers为1时在当前进程顺序执行（便于调试）
+    返回：{城市: worker返回值}
+    """
+    if max_workers is None:
+        max_workers = default_workers()
+    max_workers = min(max_workers, len(city_args)) or 1
+
+    if max_workers == 1:
+        return {city: worker(city, *args) for city, args in city_args.items()}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {city: pool.submit(worker, city, *args) for city, args in city_args.items()}
+        return {city: future.result() for city, future in futures.items()}
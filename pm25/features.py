@@ -0,0 +1,237 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .cache import file_sha1, read_city_frame, source_state
+from .classify import SEASON_NAMES, season_codes
+from .hourly import day_number
+from .profiling import stage
+from .rose import WIND_DIRECTIONS, direction_codes
+from .schema import WEATHER_COLUMNS
+
+# ----------------------
+# 气象协变量特征矩阵：每个城市一张逐小时对齐的float32设计矩阵（回归/预报建模用）
+# ----------------------
+# 行为首日0时到末日23时的稠密逐小时网格（与pm25.hourly.HourlyStore一致，没有记录的小时为NaN），列依次为：
+#   气象当前值        DEWP/HUMI/PRES/TEMP/Iws/precipitation/Iprec
+#   滞后值            <列>_lag<L>h：气象列与各观测点PM2.5在L小时前的值
+#   滚动均值          <列>_mean<W>h：向前W小时的均值（忽略缺测，窗口内全缺测为NaN）
+#   时间与风向编码     hour_sin/hour_cos、doy_sin/doy_cos、season_<季节>、cbwd_<风向>（独热，风向缺测为NaN）
+#   目标列            target_<观测点>_+<H>h：H小时后的PM2.5（H=0为当前值）
+# 特征只使用当前及以前的信息：PM2.5不含当前值（滞后从1小时起，滚动均值截至上一小时），避免目标泄漏
+# 滞后由sliding_window_view一次取出全部滞后列（不逐个shift），滚动均值由前缀和相减得到
+# 保存位置：<CSV所在目录>/.features/<CSV文件名(无后缀)>/matrix.npy + meta.json，按内存映射打开后按日期切片
+FEATURES_VERSION = 1
+FEATURES_DIRNAME = ".features"
+LAGS = (1, 2, 3, 6, 12, 24)
+ROLLING_WINDOWS = (6, 24, 72)
+HORIZONS = (0, 1, 24)
+
+
+def _features_dir(csv_path):
+    folder, name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(folder, FEATURES_DIRNAME, os.path.splitext(name)[0])
+
+
+def lag_matrix(values, lags):
+    """(时间, 列) → (时间, 列, 滞后数)，[t, j, k]为第j列在t - lags[k]时刻的值（序列开头不足时为NaN）"""
+    values = np.asarray(values)
+    max_lag = max(lags)
+    padded = np.full((len(values) + max_lag,) + values.shape[1:], np.nan, dtype=values.dtype)
+    padded[max_lag:] = values
+    windows = sliding_window_view(padded, max_lag + 1, axis=0)  # (时间, 列, max_lag+1)，最后一个元素为当前时刻
+    return windows[:len(values)][..., max_lag - np.asarray(lags)]
+
+
+def rolling_mean_matrix(values, size):
+    """(时间, 列)每列向前size个时刻（含当前）的均值，忽略NaN，窗口内全缺测为NaN"""
+    values = np.asarray(values, dtype="float64")
+    valid = ~np.isnan(values)
+    csums = np.zeros((2, len(values) + 1) + values.shape[1:])
+    np.cumsum(valid, axis=0, out=csums[0, 1:])
+    np.cumsum(np.where(valid, values, 0), axis=0, out=csums[1, 1:])
+    hi = np.arange(1, len(values) + 1)
+    count, total = csums[:, hi] - csums[:, np.maximum(hi - size, 0)]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def _time_encodings(hours):
+    """1970-01-01 00时起的小时数 → 小时/年内日序的正余弦编码与季节独热，返回(列名, (时间, 列)数组)"""
+    hour_of_day = hours % 24
+    days = (hours // 24).astype("datetime64[D]")
+    day_of_year = (days - days.astype("datetime64[Y]")).astype("int64")
+    months = days.astype("datetime64[M]").astype("int64") % 12 + 1
+    columns = ["hour_sin", "hour_cos", "doy_sin", "doy_cos"] + [f"season_{name}" for name in SEASON_NAMES]
+    hour_angle, doy_angle = 2 * np.pi * hour_of_day / 24, 2 * np.pi * day_of_year / 365.25
+    seasons = season_codes(months)[:, None] == np.arange(len(SEASON_NAMES))
+    return columns, np.column_stack([np.sin(hour_angle), np.cos(hour_angle), np.sin(doy_angle), np.cos(doy_angle), seasons])
+
+
+def build_feature_matrix(df, stations, lags=LAGS, windows=ROLLING_WINDOWS, horizons=HORIZONS):
+    """
+    城市小时数据（含date/hour、气象列、cbwd与观测点列）→ (首个小时下标, 特征列名, 目标列名, float32矩阵)
+    同一小时重复时以后一行为准；源数据中没有的气象列跳过
+    """
+    weather = [col for col in WEATHER_COLUMNS if col in df.columns]
+    hours = df["date"].to_numpy().astype("datetime64[D]").astype("int64") * 24 + df["hour"].to_numpy().astype("int64")
+    first_hour = int(hours.min()) // 24 * 24
+    n_hours = (int(hours.max()) // 24 + 1) * 24 - first_hour
+    pos = hours - first_hour
+
+    base = np.full((n_hours, len(weather) + len(stations)), np.nan, dtype="float32")
+    base[pos] = df[weather + stations].to_numpy(dtype="float32")
+    directions = np.full(n_hours, -1, dtype="int64")
+    directions[pos] = direction_codes(df["cbwd"])
+    pm_past = lag_matrix(base[:, len(weather):], (1,))[..., 0]  # PM2.5只用到上一小时为止的值
+
+    blocks, names = [base[:, :len(weather)]], list(weather)
+    lagged = lag_matrix(base, lags)
+    blocks.append(lagged.reshape(n_hours, -1))
+    names += [f"{col}_lag{lag}h" for col in weather + stations for lag in lags]
+    rolling_input = np.concatenate([base[:, :len(weather)], pm_past], axis=1)
+    for size in windows:
+        blocks.append(rolling_mean_matrix(rolling_input, size))
+        names += [f"{col}_mean{size}h" for col in weather + stations]
+    time_names, time_block = _time_encodings(np.arange(first_hour, first_hour + n_hours))
+    blocks.append(time_block)
+    names += time_names
+    one_hot = (directions[:, None] == np.arange(len(WIND_DIRECTIONS))).astype("float32")
+    one_hot[directions < 0] = np.nan
+    blocks.append(one_hot)
+    names += [f"cbwd_{d}" for d in WIND_DIRECTIONS]
+
+    targets = []
+    pm = base[:, len(weather):]
+    for h in horizons:
+        lead = np.full_like(pm, np.nan)
+        lead[:n_hours - h] = pm[h:]
+        blocks.append(lead)
+        targets += [f"target_{station}_+{h}h" for station in stations]
+
+    matrix = np.empty((n_hours, len(names) + len(targets)), dtype="float32")
+    col = 0
+    for block in blocks:
+        matrix[:, col:col + block.shape[1]] = block
+        col += block.shape[1]
+    return first_hour, names, targets, matrix
+
+
+class FeatureMatrix:
+    """
+    单个城市的逐小时特征矩阵（只读，按内存映射打开）
+    - open：源文件与特征参数均未变化时直接打开已保存的矩阵，否则重建
+    - window(start, end)：日期范围内的行（零拷贝视图）；frame：同范围的DataFrame（时间索引）
+    - xy(target, start, end, features)：特征矩阵X与目标向量y（默认去掉含缺测的行）
+    """
+
+    def __init__(self, store_dir, meta):
+        self.store_dir = store_dir
+        self.meta = meta
+        self.first_hour = meta["first_hour"]
+        self.n_hours = meta["n_hours"]
+        self.feature_columns = meta["feature_columns"]
+        self.target_columns = meta["target_columns"]
+        self.columns = self.feature_columns + self.target_columns
+        self._matrix = None
+
+    @classmethod
+    def open(cls, csv_path, stations=None, lags=LAGS, windows=ROLLING_WINDOWS, horizons=HORIZONS, store_dir=None):
+        store_dir = store_dir or _features_dir(csv_path)
+        meta_path = os.path.join(store_dir, "meta.json")
+        params = {"stations": stations, "lags": list(lags), "windows": list(windows), "horizons": list(horizons)}
+        state = source_state(csv_path)
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            source = meta.get("source", {})
+            if meta.get("version") == FEATURES_VERSION and meta.get("params") == params and source.get("size") == state["size"]:
+                if source.get("mtime_ns") == state["mtime_ns"] or source.get("sha1") == file_sha1(csv_path):
+                    return cls(store_dir, meta)
+        return cls.build(csv_path, stations, lags, windows, horizons, store_dir)
+
+    @classmethod
+    def build(cls, csv_path, stations=None, lags=LAGS, windows=ROLLING_WINDOWS, horizons=HORIZONS, store_dir=None):
+        """由城市小时数据构建并保存（stations为None时取全部PM_*列）"""
+        store_dir = store_dir or _features_dir(csv_path)
+        state = source_state(csv_path)
+        df = read_city_frame(csv_path)
+        params = {"stations": stations, "lags": list(lags), "windows": list(windows), "horizons": list(horizons)}
+        stations = [col for col in df.columns if col.startswith("PM_")] if stations is None else list(stations)
+        with stage("feature_matrix", rows=len(df)):
+            first_hour, feature_columns, target_columns, matrix = build_feature_matrix(df, stations, lags, windows, horizons)
+
+        os.makedirs(store_dir, exist_ok=True)
+        meta_path = os.path.join(store_dir, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)  # 先删除旧meta，避免矩阵写到一半时被当作有效结果
+        np.save(os.path.join(store_dir, "matrix.npy"), matrix, allow_pickle=False)
+        state["sha1"] = file_sha1(csv_path)
+        meta = {
+            "version": FEATURES_VERSION, "source": state, "params": params, "first_hour": first_hour, "n_hours": len(matrix),
+            "feature_columns": feature_columns, "target_columns": target_columns,
+        }
+        tmp_path = meta_path + f".tmp{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, meta_path)
+        print(f"🧮 特征矩阵已保存：{store_dir}（{matrix.shape[0]}小时 × {len(feature_columns)}个特征 + {len(target_columns)}个目标）")
+        return cls(store_dir, meta)
+
+    @property
+    def matrix(self):
+        """完整特征矩阵（内存映射，只读）"""
+        if self._matrix is None:
+            self._matrix = np.load(os.path.join(self.store_dir, "matrix.npy"), mmap_mode="r")
+        return self._matrix
+
+    def _hour_range(self, start=None, end=None):
+        """日期范围（含两端，按整天）→ 行下标区间[lo, hi)，超出范围时截断"""
+        lo = 0 if start is None else (day_number(start) * 24 - self.first_hour)
+        hi = self.n_hours if end is None else ((day_number(end) + 1) * 24 - self.first_hour)
+        lo = min(max(lo, 0), self.n_hours)
+        hi = min(max(hi, lo), self.n_hours)
+        return lo, hi
+
+    def time_index(self, start=None, end=None):
+        lo, hi = self._hour_range(start, end)
+        return pd.DatetimeIndex(np.arange(self.first_hour + lo, self.first_hour + hi).astype("datetime64[h]"), name="date")
+
+    def window(self, start=None, end=None, columns=None):
+        """日期范围内的行；指定columns时只取这些列（会复制）"""
+        lo, hi = self._hour_range(start, end)
+        if columns is None:
+            return self.matrix[lo:hi]
+        return self.matrix[lo:hi, [self.columns.index(col) for col in columns]]
+
+    def frame(self, start=None, end=None, columns=None):
+        return pd.DataFrame(
+            np.asarray(self.window(start, end, columns)), index=self.time_index(start, end),
+            columns=self.columns if columns is None else list(columns),
+        )
+
+    def xy(self, target, start=None, end=None, features=None, dropna=True):
+        """
+        target：目标列名（如"target_PM_US Post_+24h"），features：所用特征列（默认全部）
+        返回(X, y, 时间索引)；dropna时去掉所用特征或目标含缺测的行
+        """
+        if target not in self.target_columns:
+            raise ValueError(f"未知的目标列：{target}（可选：{self.target_columns}）")
+        features = self.feature_columns if features is None else list(features)
+        unknown = set(features) - set(self.feature_columns)
+        if unknown:
+            raise ValueError(f"未知的特征列：{sorted(unknown)}")
+        lo, hi = self._hour_range(start, end)
+        rows = self.matrix[lo:hi]
+        if features == self.feature_columns:
+            X = rows[:, :len(features)]
+        else:
+            X = rows[:, [self.columns.index(col) for col in features]]
+        y = rows[:, self.columns.index(target)]
+        index = self.time_index(start, end)
+        if dropna:
+            keep = ~np.isnan(X).any(axis=1) & ~np.isnan(y)
+            return X[keep], y[keep], index[keep]
+        return np.asarray(X), np.asarray(y), index
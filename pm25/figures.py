@@ -0,0 +1,388 @@
+import numpy as np
+import pandas as pd
+
+from .render import plt
+
+# 设置中文显示（子进程导入本模块时同样生效）
+plt.rcParams['font.sans-serif'] = ['SimHei']
+plt.rcParams['axes.unicode_minus'] = False
+plt.rcParams['figure.dpi'] = 100
+
+# ----------------------
+# 绘图函数：只负责画图并返回Figure，保存与dpi由pm25.render按预设统一处理
+# ----------------------
+SEASON_LABELS = ["春季", "夏季", "秋季", "冬季"]
+
+
+# ----------------------
+# 1. 单城市图表（PM2.5.2）
+# ----------------------
+def draw_station_monthly_diff(city_name, monthly_avg, china_monitors):
+    """单个城市各观测点的月度PM2.5对比折线图"""
+    if monthly_avg is None:
+        return None
+    # 筛选有效观测点（排除无数据的点）
+    valid_stations = [col for col in china_monitors if col in monthly_avg.columns]
+    if len(valid_stations) < 2:
+        print(f"⚠️ {city_name}有效观测点不足2个，无法绘制月度差异图")
+        return None
+
+    # 创建图表
+    fig = plt.figure(figsize=(14, 7))
+    # 定义颜色（区分不同观测点）
+    colors = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd"]
+    markers = ["o", "s", "^", "D", "v"]
+
+    # 绘制每个观测点的月度趋势
+    for i, station in enumerate(valid_stations):
+        # 过滤该观测点的NaN数据
+        plot_data = monthly_avg.dropna(subset=[station])
+        if len(plot_data) == 0:
+            continue
+        # 绘制折线
+        plt.plot(
+            plot_data["year_month_str"], plot_data[station],
+            label=station.replace("PM_", ""),  # 简化标签（去掉PM_前缀）
+            color=colors[i % len(colors)],
+            marker=markers[i % len(markers)],
+            markersize=4,
+            linewidth=2,
+            alpha=0.8
+        )
+
+    # 图表美化
+    plt.xlabel("年月", fontsize=12)
+    plt.ylabel("PM2.5浓度（μg/m³）", fontsize=12)
+    plt.title(f"{city_name}各观测点PM2.5月度平均值对比（2010-2015）", fontsize=14, pad=20)
+    plt.legend(loc="upper right", fontsize=10)
+    # 优化x轴标签（每6个月显示一个，避免重叠）
+    plt.xticks(
+        range(0, len(monthly_avg["year_month_str"]), 6),
+        monthly_avg["year_month_str"][::6],
+        rotation=45
+    )
+    plt.grid(axis="y", alpha=0.3, linestyle="--")
+    plt.tight_layout()
+    return fig
+
+def draw_city_daily_avg(city_name, daily_avg):
+    """单个城市的每日PM2.5折线图（中美双口径+按年区分）"""
+    if len(daily_avg) == 0:
+        print(f"⚠️ {city_name}无有效每日数据，无法绘制折线图")
+        return None
+
+    # 创建图表
+    fig = plt.figure(figsize=(16, 8))
+    # 按年份分组绘制（避免单条线过于密集）
+    years = sorted(daily_avg["year"].unique())
+    colors = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b"]
+
+    # 绘制中国口径每日平均（按年着色）
+    for i, year in enumerate(years):
+        year_data = daily_avg[daily_avg["year"] == year]
+        plt.plot(
+            year_data.index, year_data["China_Avg"],
+            label=f"中国环保部-{year}",
+            color=colors[i % len(colors)],
+            linewidth=1.5,
+            alpha=0.9
+        )
+
+    # 绘制美国口径每日平均（统一用黑色虚线，突出对比）
+    us_valid = daily_avg.dropna(subset=["US_Avg"])
+    if len(us_valid) > 0:
+        plt.plot(
+            us_valid.index, us_valid["US_Avg"],
+            label="美国驻华大使馆",
+            color="#000000",
+            linestyle="--",
+            linewidth=2,
+            alpha=0.8
+        )
+
+    # 添加超标线（中国PM2.5日均标准：75μg/m³）
+    plt.axhline(y=75, color="red", linestyle="-.", linewidth=1.5, label="超标线（75μg/m³）")
+
+    # 图表美化
+    plt.xlabel("日期", fontsize=12)
+    plt.ylabel("PM2.5浓度（μg/m³）", fontsize=12)
+    plt.title(f"{city_name}每日平均PM2.5浓度趋势（中美双口径对比）", fontsize=14, pad=20)
+    plt.legend(loc="upper left", fontsize=10, ncol=2)
+    # 优化x轴（按年显示刻度）
+    plt.xticks(
+        pd.date_range(start=daily_avg.index.min(), end=daily_avg.index.max(), freq="YS"),
+        [d.strftime("%Y") for d in pd.date_range(start=daily_avg.index.min(), end=daily_avg.index.max(), freq="YS")],
+        rotation=0
+    )
+    plt.grid(axis="y", alpha=0.3, linestyle="--")
+    plt.tight_layout()
+    return fig
+
+def draw_level_distribution(city_name, levels_order, china_perc, us_perc):
+    """单个城市中美等级分布对比柱状图"""
+    x = np.arange(len(levels_order))
+    width = 0.35
+    fig = plt.figure(figsize=(10, 6))
+    plt.bar(x - width/2, china_perc, width=width, label="中国环保部", color="#4E79A7")
+    plt.bar(x + width/2, us_perc, width=width, label="美国大使馆", color="#F28E2B")
+    plt.xticks(x, levels_order)
+    plt.ylabel("占比（%）")
+    plt.title(f"{city_name}污染等级分布（中美口径对比）")
+    plt.ylim(0, 100)
+    plt.legend()
+    plt.grid(axis="y", alpha=0.3, linestyle="--")
+    plt.tight_layout()
+    return fig
+
+def draw_city_stack(summary_df, levels_order, title):
+    """五城堆叠柱状图（按城市行，列为各等级占比）"""
+    cities = summary_df["城市"].tolist()
+    x = np.arange(len(cities))
+    fig = plt.figure(figsize=(12, 7))
+    bottom = np.zeros(len(cities))
+    colors = ["#8dd3c7", "#ffffb3", "#bebada", "#fb8072", "#80b1d3"]
+    for i, lvl in enumerate(levels_order):
+        vals = summary_df[f"{lvl}_占比(%)"].values
+        plt.bar(x, vals, bottom=bottom, label=lvl, color=colors[i % len(colors)])
+        bottom += vals
+    plt.xticks(x, cities)
+    plt.ylabel("占比（%）")
+    plt.title(title)
+    plt.ylim(0, 100)
+    plt.legend(title="等级")
+    plt.grid(axis="y", alpha=0.3, linestyle="--")
+    plt.tight_layout()
+    return fig
+
+
+# ----------------------
+# 2. 五城市对比图表（PM2.5.py）
+# ----------------------
+def draw_china_boxplot(cities, china_data):
+    """五城市中国口径日均PM2.5箱线图（展示分布与异常值）"""
+    fig = plt.figure(figsize=(12, 6))
+    # 绘制箱线图（城市标签单独设置，兼容新旧版本matplotlib的参数名）
+    box = plt.boxplot(china_data, patch_artist=True)
+    plt.xticks(np.arange(1, len(cities) + 1), cities)
+    # 美化：给箱体上色
+    colors = ["#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#FECA57"]
+    for patch, color in zip(box["boxes"], colors):
+        patch.set_facecolor(color)
+    # 添加标题与标签
+    plt.title("2010-2015年五城市PM2.5日均浓度分布（中国环保部口径）", fontsize=14)
+    plt.ylabel("PM2.5浓度（μg/m³）", fontsize=12)
+    plt.axhline(y=75, color="red", linestyle="--", label="超标线（75μg/m³）")  # 添加超标线
+    plt.legend()
+    plt.grid(axis="y", alpha=0.3)
+    return fig
+
+def draw_yearly_trend(city_yearly):
+    """五城市年度PM2.5趋势线"""
+    fig = plt.figure(figsize=(12, 6))
+    for city, yearly_data in city_yearly.items():
+        plt.plot(yearly_data.index, yearly_data.values, marker="o", label=city, linewidth=2)
+    # 添加标题与标签
+    plt.title("2010-2015年五城市PM2.5年度平均趋势（中国环保部口径）", fontsize=14)
+    plt.xlabel("年份", fontsize=12)
+    plt.ylabel("PM2.5浓度（μg/m³）", fontsize=12)
+    plt.axhline(y=75, color="red", linestyle="--", label="超标线（75μg/m³）")
+    plt.legend()
+    plt.grid(alpha=0.3)
+    return fig
+
+def draw_seasonal_bar(city_seasonal):
+    """五城市季节PM2.5柱状图"""
+    fig = plt.figure(figsize=(14, 8))
+    width = 0.15  # 柱子宽度
+    x = np.arange(4)  # 季节位置（春、夏、秋、冬）
+
+    # 绘制每个城市的四季柱状图
+    for i, city in enumerate(city_seasonal.keys()):
+        seasonal_data = city_seasonal[city]
+        plt.bar(x + i*width, seasonal_data.values, width=width, label=city)
+
+    # 添加标题与标签
+    plt.title("2010-2015年五城市PM2.5季节平均对比（中国环保部口径）", fontsize=14)
+    plt.xlabel("季节", fontsize=12)
+    plt.ylabel("PM2.5浓度（μg/m³）", fontsize=12)
+    plt.xticks(x + width*2, SEASON_LABELS)  # 调整x轴标签位置
+    plt.axhline(y=75, color="red", linestyle="--", label="超标线（75μg/m³）")
+    plt.legend()
+    plt.grid(axis="y", alpha=0.3)
+    return fig
+
+def draw_us_china_scatter(city, valid_df):
+    """单个城市中美监测日均值散点图"""
+    fig = plt.figure(figsize=(10, 8))
+    # 绘制散点图
+    plt.scatter(valid_df["US_Avg"], valid_df["China_Avg"], alpha=0.6, color="#45B7D1")
+    # 添加对角线（y=x，代表中美数值完全一致）
+    max_val = max(valid_df["US_Avg"].max(), valid_df["China_Avg"].max())
+    plt.plot([0, max_val], [0, max_val], "r--", label="中美完全一致线（y=x）")
+    # 添加相关系数标注
+    corr = valid_df["China_Avg"].corr(valid_df["US_Avg"])
+    plt.annotate(f"Pearson相关系数: {corr:.3f}", xy=(0.05, 0.95), xycoords="axes fraction", fontsize=12,
+                bbox=dict(boxstyle="round", facecolor="white", alpha=0.8))
+    # 添加标题与标签
+    plt.title(f"{city}中美PM2.5日均监测结果对比（2010-2015）", fontsize=14)
+    plt.xlabel("美国大使馆监测值（μg/m³）", fontsize=12)
+    plt.ylabel("中国环保部监测值（μg/m³）", fontsize=12)
+    plt.legend()
+    plt.grid(alpha=0.3)
+    return fig
+
+def draw_level_heatmap(city, crosstab):
+    """单个城市中美等级交叉热力图（crosstab已按等级顺序排列）"""
+    fig = plt.figure(figsize=(10, 8))
+    # 绘制热力图
+    im = plt.imshow(crosstab.values, cmap="YlOrRd")
+    # 添加数值标注
+    for i in range(len(crosstab.index)):
+        for j in range(len(crosstab.columns)):
+            plt.text(j, i, int(crosstab.iloc[i, j]), ha="center", va="center", color="black" if crosstab.iloc[i, j] < 50 else "white")
+    # 设置坐标轴
+    plt.xticks(np.arange(len(crosstab.columns)), crosstab.columns, rotation=45)
+    plt.yticks(np.arange(len(crosstab.index)), crosstab.index)
+    # 添加标题与色条
+    plt.title(f"{city}中美污染等级判定交叉表（2010-2015）", fontsize=14)
+    plt.xlabel("美国大使馆判定等级", fontsize=12)
+    plt.ylabel("中国环保部判定等级", fontsize=12)
+    cbar = plt.colorbar(im)
+    cbar.set_label("天数", fontsize=12)
+    plt.tight_layout()
+    return fig
+
+
+# ----------------------
+# 3. 污染级别天数与观测点月度均值（PM2.5.3）
+# ----------------------
+def draw_level_days_by_year(city_level_stats, pm_labels, years=(2014, 2015)):
+    """分年度子图：五城市各污染级别天数（条形图上方显示天数）"""
+    fig, axes = plt.subplots(len(years), 1, figsize=(8, 4.5 * len(years)))
+    axes = np.atleast_1d(axes)
+    bar_width = 0.1
+    x = np.arange(len(pm_labels))
+    offset = 1.5  # 天数标签与条形顶部的偏移量
+
+    for ax, year in zip(axes, years):
+        for i, city in enumerate(city_level_stats.keys()):
+            stats = city_level_stats[city]
+            y_year = stats.loc[year] if year in stats.index else [0]*len(pm_labels)
+            bars = ax.bar(x + i*bar_width, y_year, width=bar_width, label=city)
+            # 添加天数标签
+            for bar, day_count in zip(bars, y_year):
+                ax.text(
+                    bar.get_x() + bar.get_width()/2,
+                    bar.get_height() + offset,
+                    str(int(day_count)),
+                    ha='center', va='bottom', fontsize=9
+                )
+
+        ax.set_title(f"{year}年五城市PM2.5污染级别天数对比（国内监测点）", fontsize=14)
+        ax.set_ylabel("天数", fontsize=12)
+        ax.set_xticks(x + bar_width*(len(city_level_stats)-1)/2)
+        ax.set_xticklabels(pm_labels, fontsize=12)
+        ax.legend(loc='upper right')
+        ax.grid(axis='y', alpha=0.3)
+    axes[-1].set_xlabel("污染级别", fontsize=12)
+
+    plt.tight_layout()
+    plt.subplots_adjust(hspace=0.3)
+    return fig
+
+def draw_station_monthly_grid(city_station_monthly, pm_bins, y_max=300):
+    """每个城市各观测点的月度均值折线图（添加污染级别横线并统一纵轴）"""
+    # 创建2行3列的子图（5个城市 + 1个空图）
+    fig, axes = plt.subplots(2, 3, figsize=(18, 10))
+    axes = axes.flatten()  # 转换为一维数组，便于索引
+
+    # 定义折线颜色（使用颜色名称）和标记，区分不同观测点
+    colors = ['red', 'blue', 'green', 'cyan', 'magenta']
+    markers = ['o', 's', '^', 'D', 'p']
+
+    # 定义污染级别横线的颜色（对应pm_bins的区间划分）
+    bin_line_colors = ['green', 'yellow', 'orange', 'red', 'purple', 'maroon']
+
+    for i, city in enumerate(city_station_monthly.keys()):
+        ax = axes[i]
+        station_data = city_station_monthly[city]
+        stations = list(station_data.keys())
+
+        # 为每个观测点绘制折线
+        for j, station in enumerate(stations):
+            monthly_data = station_data[station]
+            ax.plot(
+                monthly_data.index,
+                monthly_data.values,
+                label=station,
+                color=colors[j % len(colors)],
+                marker=markers[j % len(markers)],
+                markersize=4,
+                linewidth=1.5
+            )
+
+        # 添加污染级别横线（pm_bins）
+        for bin_val, color in zip(pm_bins[:-1], bin_line_colors):  # 排除最后一个inf
+            ax.axhline(
+                y=bin_val,
+                color=color,
+                linestyle='--',
+                alpha=0.6,  # 半透明避免遮挡折线
+                linewidth=1.2
+            )
+            # 在右侧标注横线对应的污染级别值
+            ax.text(
+                1.01, bin_val, f'{bin_val}',
+                transform=ax.get_yaxis_transform(),  # 按y轴比例定位
+                verticalalignment='center',
+                fontsize=8,
+                color=color
+            )
+
+        # 统一设置纵轴尺度（根据pm_bins和数据分布设置为300）
+        ax.set_ylim(0, y_max)
+
+        # 设置子图标题和标签
+        ax.set_title(f'{city}各观测点PM2.5月度均值', fontsize=12)
+        ax.set_xlabel('日期', fontsize=10)
+        ax.set_ylabel('PM2.5浓度（μg/m$^{3}$）', fontsize=10)
+        ax.legend(fontsize=8)
+        ax.grid(alpha=0.3)
+        # 旋转x轴标签，避免重叠
+        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right', fontsize=8)
+
+    # 隐藏多余的空图
+    for ax in axes[len(city_station_monthly):]:
+        ax.axis('off')
+
+    # 调整布局
+    plt.tight_layout()
+    return fig
+
+
+# ----------------------
+# 4. 污染玫瑰（python -m pm25 rose）
+# ----------------------
+def draw_pollution_rose(city, station, directions, angles, speed_labels, share, calm_share):
+    """
+    单个观测点的污染玫瑰：各风向的污染负荷占比（%），按风速等级堆叠
+    share：(风向, 风速等级)的负荷占比（不含静风），calm_share：静风（cv）的负荷占比，标注在中心
+    """
+    fig = plt.figure(figsize=(8, 8))
+    ax = fig.add_subplot(projection="polar")
+    ax.set_theta_zero_location("N")
+    ax.set_theta_direction(-1)
+    theta = np.deg2rad(angles)
+    width = np.deg2rad(60)
+    bottom = np.zeros(len(directions))
+    colors = plt.cm.YlOrRd(np.linspace(0.2, 0.9, len(speed_labels)))
+    for j, label in enumerate(speed_labels):
+        ax.bar(theta, share[:, j], width=width, bottom=bottom, color=colors[j], edgecolor="white", label=f"Iws {label}")
+        bottom += share[:, j]
+    ax.set_xticks(theta)
+    ax.set_xticklabels(directions)
+    ax.set_title(f"{city} {station}污染玫瑰（负荷占比%）", fontsize=14, pad=20)
+    ax.text(0, 0, f"静风\n{calm_share:.1f}%", ha="center", va="center", fontsize=10)
+    ax.legend(title="风速等级（m/s）", loc="upper left", bbox_to_anchor=(1.05, 1.0))
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,174 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from .aggregate import MultiResolutionAggregate
+from .archive import ARCHIVE_DIR, archive_state, load_partitions
+from .cache import file_sha1, read_city_frame, source_state
+from .profiling import stage
+
+# ----------------------
+# 逐小时内存映射存储：每个观测点一条float32数组，下标为1970-01-01 00时起的小时数
+# ----------------------
+# 目录结构：<CSV所在目录>/.hourly/<CSV文件名(无后缀)>/（已导入分区归档的城市为<归档目录>/.hourly/<城市>/）
+#   meta.json     源文件指纹、首个小时下标与小时数、观测点列表
+#   <序号>.npy    观测点逐小时浓度（float32，缺测为NaN），按内存映射打开
+#   <序号>.nan.npy 缺测位图（np.packbits，1表示缺测）
+# 网格从首日0时到末日23时，按整天对齐，可直接reshape为(天数, 24)
+HOURLY_VERSION = 1
+HOURLY_DIRNAME = ".hourly"
+
+
+def _hourly_dir(csv_path):
+    folder, name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(folder, HOURLY_DIRNAME, os.path.splitext(name)[0])
+
+
+def _read_meta(store_dir):
+    """读取存储的meta.json，缺失或版本不一致时返回None"""
+    meta_path = os.path.join(store_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    return meta if meta.get("version") == HOURLY_VERSION else None
+
+
+def day_number(value):
+    """日期 → 1970-01-01起的天数"""
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype("int64"))
+
+
+class HourlyStore:
+    """
+    单个城市的逐小时观测点存储（只读，按内存映射打开，多个进程共享同一份页缓存）
+    - series / window：零拷贝切片（日期范围按整天，含两端）
+    - day_grid：reshape为(天数, 24)的视图
+    - aggregate：直接由(观测点, 天数, 24)网格构建多粒度聚合，供每日/月度平均使用
+    """
+
+    def __init__(self, store_dir, meta):
+        self.store_dir = store_dir
+        self.meta = meta
+        self.first_hour = meta["first_hour"]
+        self.n_hours = meta["n_hours"]
+        self.stations = [desc["name"] for desc in meta["stations"]]
+        self._files = {desc["name"]: desc for desc in meta["stations"]}
+        self._arrays = {}
+
+    @classmethod
+    def open(cls, csv_path, store_dir=None):
+        """打开存储；源文件内容变化或存储缺失时由列式缓存重建"""
+        store_dir = store_dir or _hourly_dir(csv_path)
+        meta = _read_meta(store_dir)
+        state = source_state(csv_path)
+        if meta is not None:
+            source = meta.get("source", {})
+            if source.get("size") == state["size"]:
+                if source.get("mtime_ns") == state["mtime_ns"] or source.get("sha1") == file_sha1(csv_path):
+                    return cls(store_dir, meta)
+        return cls.build(csv_path, store_dir)
+
+    @classmethod
+    def build(cls, csv_path, store_dir=None):
+        """由城市小时数据构建稠密网格（没有记录的小时为NaN，同一小时重复时以后一行为准）"""
+        store_dir = store_dir or _hourly_dir(csv_path)
+        state = source_state(csv_path)
+        df = read_city_frame(csv_path)
+        state["sha1"] = file_sha1(csv_path)
+        return cls.from_frame(df, store_dir, state)
+
+    @classmethod
+    def open_archive(cls, city, archive_dir=ARCHIVE_DIR, store_dir=None):
+        """
+        由分区归档打开存储（已导入归档的城市以归档为准，append追加后自动重建）
+        归档指纹为各月分区的数据版本，任一分区被重写或新增时失效
+        """
+        store_dir = store_dir or os.path.join(archive_dir, HOURLY_DIRNAME, city)
+        meta = _read_meta(store_dir)
+        state = archive_state(city, archive_dir)
+        if meta is not None and meta.get("source") == state:
+            return cls(store_dir, meta)
+        return cls.from_frame(load_partitions(city, archive_dir=archive_dir), store_dir, state)
+
+    @classmethod
+    def from_frame(cls, df, store_dir, source):
+        """由小时数据（含date/hour与PM_*列）构建并保存稠密网格，source为写入meta的源数据指纹"""
+        stations = [col for col in df.columns if col.startswith("PM_")]
+        hours = df["date"].to_numpy().astype("datetime64[D]").astype("int64") * 24 + df["hour"].to_numpy().astype("int64")
+        first_hour = int(hours.min()) // 24 * 24
+        n_hours = (int(hours.max()) // 24 + 1) * 24 - first_hour
+        pos = hours - first_hour
+
+        os.makedirs(store_dir, exist_ok=True)
+        meta_path = os.path.join(store_dir, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)  # 先删除旧meta，避免数组写到一半时被当作有效存储
+        descs = []
+        for i, station in enumerate(stations):
+            values = np.full(n_hours, np.nan, dtype="float32")
+            values[pos] = df[station].to_numpy(dtype="float32")
+            np.save(os.path.join(store_dir, f"{i}.npy"), values, allow_pickle=False)
+            np.save(os.path.join(store_dir, f"{i}.nan.npy"), np.packbits(np.isnan(values)), allow_pickle=False)
+            descs.append({"name": station, "file": f"{i}.npy", "nan_file": f"{i}.nan.npy"})
+        meta = {"version": HOURLY_VERSION, "source": source, "first_hour": first_hour, "n_hours": n_hours, "stations": descs}
+        tmp_path = meta_path + f".tmp{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, meta_path)
+        return cls(store_dir, meta)
+
+    @property
+    def first_day(self):
+        return np.datetime64(self.first_hour // 24, "D")
+
+    @property
+    def n_days(self):
+        return self.n_hours // 24
+
+    def series(self, station):
+        """观测点完整逐小时数组（内存映射，只读）"""
+        if station not in self._arrays:
+            self._arrays[station] = np.load(os.path.join(self.store_dir, self._files[station]["file"]), mmap_mode="r")
+        return self._arrays[station]
+
+    def nan_mask(self, station, start=None, end=None):
+        """日期范围内的缺测掩码（由位图解包，True表示缺测）"""
+        lo, hi = self._hour_range(start, end)
+        bits = np.load(os.path.join(self.store_dir, self._files[station]["nan_file"]), mmap_mode="r")
+        # 整天对齐的起点是8的倍数（24小时 = 3字节），可直接按字节切片
+        return np.unpackbits(bits[lo // 8:(hi + 7) // 8])[lo % 8:lo % 8 + hi - lo].astype(bool)
+
+    def _hour_range(self, start=None, end=None):
+        """日期范围（含两端，按整天）→ 数组下标区间[lo, hi)，超出范围时截断"""
+        lo = 0 if start is None else (day_number(start) * 24 - self.first_hour)
+        hi = self.n_hours if end is None else ((day_number(end) + 1) * 24 - self.first_hour)
+        lo = min(max(lo, 0), self.n_hours)
+        hi = min(max(hi, lo), self.n_hours)
+        return lo, hi
+
+    def time_index(self, start=None, end=None):
+        """日期范围内逐小时的时间索引（与window/series的下标一一对应）"""
+        lo, hi = self._hour_range(start, end)
+        return pd.DatetimeIndex(np.arange(self.first_hour + lo, self.first_hour + hi).astype("datetime64[h]"), name="date")
+
+    def window(self, station, start=None, end=None):
+        """观测点在日期范围内的逐小时数据（零拷贝视图）"""
+        lo, hi = self._hour_range(start, end)
+        return self.series(station)[lo:hi]
+
+    def day_grid(self, station, start=None, end=None):
+        """观测点在日期范围内的(天数, 24)视图，返回(首日, 视图)"""
+        lo, hi = self._hour_range(start, end)
+        first_day = np.datetime64((self.first_hour + lo) // 24, "D")
+        return first_day, self.series(station)[lo:hi].reshape(-1, 24)
+
+    def aggregate(self, stations=None, start=None, end=None):
+        """日期范围内所选观测点的多粒度聚合（按天沿小时轴归约，无需排序与分组）"""
+        stations = self.stations if stations is None else list(stations)
+        lo, hi = self._hour_range(start, end)
+        first_day = np.datetime64((self.first_hour + lo) // 24, "D")
+        with stage("aggregate", detail="hourly_store", rows=hi - lo):
+            grid = np.stack([self.series(station)[lo:hi].reshape(-1, 24) for station in stations])
+            return MultiResolutionAggregate.from_hour_grid(stations, first_day, grid)
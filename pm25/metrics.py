@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+from .classify import CHINA_DAILY_5, level_codes
+
+# ----------------------
+# 中美监测对比指标引擎：所有城市 × 任意窗口（全时段/逐年/逐月/滚动N天）一次计算
+# ----------------------
+# 各城市日均值先对齐到同一连续日历（城市, 天数），再沿日期轴求一次前缀和；
+# 任意窗口[lo, hi)的各项和 = 前缀和[hi] - 前缀和[lo]，所有窗口同时相减即可，不再逐窗口重新计算
+# 只统计中美均有数据的日期；相关系数由中心化后的和计算（减去全时段均值，避免大数相减损失精度）
+# 平均相对误差与逐日|中国值-美国值|/美国值的pandas均值一致：美国值为0的日期相对误差为inf（整个窗口为inf），
+# 中美均为0时为0/0=NaN，不计入；inf不能进入前缀和（inf-inf=NaN），单独累计天数rel_inf
+SUM_FIELDS = ["n", "x", "y", "xx", "yy", "xy", "diff", "abs_diff", "sq_diff", "rel_n", "rel_diff", "rel_inf", "level_agree"]
+METRIC_COLUMNS = [
+    "有效对比天数", "相关系数", "平均绝对误差(μg/m³)", "平均相对误差(%)",
+    "平均偏差(μg/m³)", "均方根误差(μg/m³)", "等级一致率(%)",
+]
+PERIOD_FREQS = {"all": None, "year": "Y", "month": "M"}
+
+
+class CompareSums:
+    """
+    各城市中美日均值对比的前缀和
+    - cities：城市列表；days：连续日历（datetime64[D]）
+    - csum：(城市数, 天数+1, len(SUM_FIELDS))，csum[:, t]为前t天的各项和
+    """
+
+    def __init__(self, cities, days, csum):
+        self.cities = list(cities)
+        self.days = days
+        self.csum = csum
+
+    @classmethod
+    def from_daily(cls, city_daily, table=CHINA_DAILY_5):
+        """city_daily：{城市: 每日平均DataFrame（日期索引，含China_Avg/US_Avg）}；等级一致按table分级"""
+        cities = list(city_daily)
+        indexes = [city_daily[city].index.values.astype("datetime64[D]") for city in cities]
+        non_empty = [index for index in indexes if len(index)]
+        if non_empty:
+            first = min(index.min() for index in non_empty)
+            days = np.arange(first, max(index.max() for index in non_empty) + 1)
+        else:
+            days = np.array([], dtype="datetime64[D]")
+        x = np.full((len(cities), len(days)), np.nan)
+        y = np.full((len(cities), len(days)), np.nan)
+        for i, (city, index) in enumerate(zip(cities, indexes)):
+            if not len(index):
+                continue
+            pos = (index - days[0]).astype("int64")
+            x[i, pos] = city_daily[city]["China_Avg"].to_numpy(dtype="float64")
+            y[i, pos] = city_daily[city]["US_Avg"].to_numpy(dtype="float64")
+
+        valid = ~(np.isnan(x) | np.isnan(y))
+        counts = valid.sum(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x_mean = np.where(valid, x, 0).sum(axis=1, keepdims=True) / counts
+            y_mean = np.where(valid, y, 0).sum(axis=1, keepdims=True) / counts
+        cx = np.where(valid, x - np.nan_to_num(x_mean), 0)  # 中心化，仅用于相关系数
+        cy = np.where(valid, y - np.nan_to_num(y_mean), 0)
+        diff = np.where(valid, x - y, 0)
+        us_zero = valid & (y == 0)
+        rel_valid = valid & ~(us_zero & (diff == 0))  # 0/0为NaN，不计入相对误差
+        rel_inf = us_zero & (diff != 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rel_diff = np.where(valid & ~us_zero, np.abs(diff) / y, 0)
+        agree = valid & (level_codes(x.ravel(), table) == level_codes(y.ravel(), table)).reshape(x.shape)
+
+        daily = np.stack([
+            valid, cx, cy, cx * cx, cy * cy, cx * cy, diff, np.abs(diff), diff * diff, rel_valid, rel_diff, rel_inf, agree,
+        ], axis=-1).astype("float64")
+        csum = np.zeros((len(cities), len(days) + 1, len(SUM_FIELDS)))
+        np.cumsum(daily, axis=1, out=csum[:, 1:])
+        return cls(cities, days, csum)
+
+    def window_sums(self, lo, hi):
+        """窗口下标区间[lo, hi)（等长数组）→ (城市数, 窗口数, len(SUM_FIELDS))的各项和"""
+        return self.csum[:, np.asarray(hi)] - self.csum[:, np.asarray(lo)]
+
+    def metrics(self, lo, hi, min_days=1):
+        """各城市各窗口的指标数组{列名: (城市数, 窗口数)}；有效天数不足min_days的窗口为NaN"""
+        s = dict(zip(SUM_FIELDS, np.moveaxis(self.window_sums(lo, hi), -1, 0)))
+        n = s["n"]
+        enough = n >= max(min_days, 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sxx = s["xx"] - s["x"] * s["x"] / n
+            syy = s["yy"] - s["y"] * s["y"] / n
+            sxy = s["xy"] - s["x"] * s["y"] / n
+            values = {
+                "相关系数": sxy / np.sqrt(np.clip(sxx, 0, None) * np.clip(syy, 0, None)),
+                "平均绝对误差(μg/m³)": s["abs_diff"] / n,
+                "平均相对误差(%)": np.where(s["rel_inf"] > 0, np.inf, s["rel_diff"] / s["rel_n"] * 100),
+                "平均偏差(μg/m³)": s["diff"] / n,
+                "均方根误差(μg/m³)": np.sqrt(s["sq_diff"] / n),
+                "等级一致率(%)": s["level_agree"] / n * 100,
+            }
+        values = {name: np.where(enough, value, np.nan) for name, value in values.items()}
+        values["有效对比天数"] = n.astype("int64")
+        return values
+
+    def _table(self, lo, hi, labels, min_days):
+        """窗口指标 → 长表（城市, 窗口, 起始日期, 结束日期, 各项指标）"""
+        lo, hi = np.asarray(lo, dtype="int64"), np.asarray(hi, dtype="int64")
+        values = self.metrics(lo, hi, min_days)
+        n_windows = len(lo)
+        table = pd.DataFrame({
+            "城市": np.repeat(self.cities, n_windows),
+            "窗口": np.tile(np.asarray(labels, dtype=object), len(self.cities)),
+            "起始日期": np.tile(pd.to_datetime(self.days[lo]), len(self.cities)) if n_windows else [],
+            "结束日期": np.tile(pd.to_datetime(self.days[hi - 1]), len(self.cities)) if n_windows else [],
+        })
+        for name in METRIC_COLUMNS:
+            table[name] = values[name].ravel()
+        return table
+
+    def by_period(self, freq="year", min_days=1):
+        """
+        全时段（all）/逐年（year）/逐月（month）窗口的指标长表
+        每个城市每个窗口一行；有效天数不足min_days的窗口指标为NaN
+        """
+        if freq not in PERIOD_FREQS:
+            raise ValueError(f"未知的窗口类型：{freq}（可选{'/'.join(PERIOD_FREQS)}）")
+        if len(self.days) == 0:
+            return self._table([], [], [], min_days)
+        if freq == "all":
+            return self._table([0], [len(self.days)], ["全部"], min_days)
+        periods = pd.PeriodIndex(pd.to_datetime(self.days), freq=PERIOD_FREQS[freq])
+        starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])  # 日历连续，各周期是相邻的一段
+        ends = np.r_[starts[1:], len(self.days)]
+        return self._table(starts, ends, periods[starts].astype(str), min_days)
+
+    def rolling(self, window=30, min_days=20):
+        """
+        滚动window天窗口的指标长表（窗口按结束日期标记，含当天共window个日历日）
+        用于逐月跟踪观测点校准漂移；有效天数不足min_days的窗口指标为NaN
+        """
+        hi = np.arange(1, len(self.days) + 1)
+        lo = np.maximum(hi - window, 0)
+        labels = pd.to_datetime(self.days).strftime("%Y-%m-%d") if len(self.days) else []
+        return self._table(lo, hi, labels, min_days)
+
+
+def us_china_compare_table(city_daily, min_days=30):
+    """
+    各城市全时段中美对比汇总：有效对比天数、相关系数、平均绝对误差与平均相对误差
+    有效对比天数不足min_days的城市标记为“数据不足”
+    """
+    table = CompareSums.from_daily(city_daily).by_period("all")
+    rows = []
+    for row in table.to_dict(orient="records"):
+        if row["有效对比天数"] < min_days:  # 有效数据不足，统计意义弱
+            rows.append({"城市": row["城市"], "相关系数": "数据不足", "平均绝对误差": "数据不足", "平均相对误差(%)": "数据不足"})
+            continue
+        rows.append({
+            "城市": row["城市"],
+            "有效对比天数": row["有效对比天数"],
+            "相关系数": round(row["相关系数"], 3),
+            "平均绝对误差(μg/m³)": round(row["平均绝对误差(μg/m³)"], 2),
+            "平均相对误差(%)": round(row["平均相对误差(%)"], 2),
+        })
+    return rows
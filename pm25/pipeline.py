@@ -0,0 +1,332 @@
+import os
+import pandas as pd
+
+from .aggregate import MultiResolutionAggregate
+from .artifacts import ArtifactManifest, write_csv
+from .cache import iter_city_chunks, read_city_frame
+from .classify import CHINA_DAILY_5, classify_levels
+from .figures import draw_city_daily_avg, draw_city_stack, draw_level_distribution, draw_station_monthly_diff
+from .hourly import HourlyStore
+from .profiling import stage
+from .render import figure_spec
+from .store import DEFAULT_CHUNKSIZE, AggregateStore
+
+levels_order = list(CHINA_DAILY_5.labels)  # 五级口径（150以上统称重度污染）
+
+
+# ----------------------
+# 1. 观测点月度差异
+# ----------------------
+def calc_station_monthly_avg(city_df, city_name, china_monitors):
+    """
+    计算单个城市每个观测点的月度平均PM2.5
+    返回：月度平均值DataFrame（行：年月，列：观测点）
+    """
+    stations = _valid_stations(city_df[china_monitors].notna().sum(), city_name, china_monitors)
+    if not stations:
+        return None
+
+    # 所有观测点一次按“年月”分组，直接得到“年月 × 观测点”矩阵（mean自动排除NaN）
+    # 观测值为float32，先升为float64再求均值，保证月均值精度
+    monthly_means = city_df[stations].astype("float64").groupby(city_df["year_month"]).mean()
+    return _finish_monthly_avg(monthly_means)
+
+def calc_station_monthly_avg_from_aggregate(agg, city_name, china_monitors):
+    """由多粒度聚合（如增量存储）的月粒度部分和计算观测点月度平均，结果与calc_station_monthly_avg一致"""
+    stations = _valid_stations(agg.stats("month", "count")[china_monitors].sum(), city_name, china_monitors)
+    if not stations:
+        return None
+    return _finish_monthly_avg(agg.mean("month", stations))
+
+def _valid_stations(valid_counts, city_name, china_monitors):
+    """剔除无任何有效数据的观测点"""
+    stations = []
+    for station in china_monitors:
+        if valid_counts[station] == 0:
+            print(f"⚠️ {city_name}-{station}无有效数据，跳过")
+            continue
+        stations.append(station)
+    return stations
+
+def _finish_monthly_avg(monthly_means):
+    # 仅保留至少一个观测点有数据的月份，与逐点计算后外连接的结果一致
+    monthly_avg = monthly_means.dropna(how="all").reset_index()
+    # 转换年月为字符串（便于绘图）
+    monthly_avg["year_month_str"] = monthly_avg["year_month"].astype(str)
+    return monthly_avg
+
+def station_monthly_diff_spec(city_name, monthly_avg, china_monitors, result_dir):
+    """观测点月度差异图的渲染描述"""
+    return figure_spec(
+        draw_station_monthly_diff,
+        os.path.join(result_dir, f"{city_name}_各观测点月度PM2.5对比.png"),
+        message=f"📊 {city_name}观测点月度差异图已保存",
+        city_name=city_name, monthly_avg=monthly_avg, china_monitors=china_monitors,
+    )
+
+
+# ----------------------
+# 2. 每日平均PM2.5（中美双口径）
+# ----------------------
+def calc_city_daily_avg(city_df, china_monitors, us_col):
+    """
+    计算单个城市的每日平均PM2.5
+    - 中国口径：所有本土观测点的日均平均值（消除单观测点误差）
+    - 美国口径：美国大使馆单观测点日均值
+    """
+    # 一次聚合得到所有观测点（含美国大使馆）的日均值
+    agg = MultiResolutionAggregate.from_hourly(city_df, china_monitors + [us_col])
+    return calc_city_daily_avg_from_aggregate(agg, china_monitors, us_col)
+
+def calc_city_daily_avg_from_aggregate(agg, china_monitors, us_col):
+    """由多粒度聚合（如增量存储）的日粒度部分和计算每日平均PM2.5"""
+    station_daily = agg.mean("day", china_monitors + [us_col])
+
+    # 1. 中国环保部口径：多观测点日均平均
+    china_daily = station_daily[china_monitors].copy()  # 每个观测点的日均值
+    china_daily["China_Avg"] = china_daily.mean(axis=1)  # 所有观测点的日均平均（最终中国口径）
+
+    # 2. 美国大使馆口径：单观测点日均值
+    us_daily = station_daily[us_col].rename("US_Avg")
+
+    # 3. 合并双口径数据，保留至少一个有效值的日期
+    daily_avg = pd.concat([china_daily["China_Avg"], us_daily], axis=1).dropna(how="all")
+    # 添加年份列（用于后续按年分组绘图）
+    daily_avg["year"] = daily_avg.index.year
+    return daily_avg
+
+def calc_city_avg_cn(city_df, china_monitors):
+    """
+    逐小时国控点均值（PM2.5.3口径）：只保留全部国控观测点均有观测的小时，
+    添加city_avg_cn列（各观测点均值，保留两位小数）
+    """
+    city_df = city_df.dropna(subset=china_monitors)
+    return city_df.assign(city_avg_cn=city_df[china_monitors].mean(axis=1).round(2))
+
+def calc_city_daily_avg_cn(city_df):
+    """由calc_city_avg_cn的结果计算每日均值（保留两位小数），只含至少有一个完整小时的日期"""
+    agg = MultiResolutionAggregate.from_hourly(city_df, ["city_avg_cn"])
+    return agg.mean("day")["city_avg_cn"].round(2)
+
+def city_daily_avg_spec(city_name, daily_avg, result_dir):
+    """每日PM2.5折线图的渲染描述"""
+    return figure_spec(
+        draw_city_daily_avg,
+        os.path.join(result_dir, f"{city_name}_每日PM2.5折线图.png"),
+        message=f"📊 {city_name}每日PM2.5折线图已保存",
+        city_name=city_name, daily_avg=daily_avg[["China_Avg", "US_Avg", "year"]],
+    )
+
+
+# ----------------------
+# 3. 中美污染等级一致性与等级分布
+# ----------------------
+def calc_level_consistency(city_name, daily_avg):
+    """统计单个城市中美等级一致性，返回汇总行（无有效对比天数时返回None）"""
+    # 计算污染等级
+    daily_avg["China_Level"] = classify_levels(daily_avg["China_Avg"], CHINA_DAILY_5)
+    daily_avg["US_Level"] = classify_levels(daily_avg["US_Avg"], CHINA_DAILY_5)
+    # 筛选有效对比天数
+    valid_days = daily_avg.dropna(subset=["China_Level", "US_Level"])
+    if len(valid_days) == 0:
+        return None
+    # 计算一致性指标
+    consistent_days = (valid_days["China_Level"] == valid_days["US_Level"]).sum()
+    consistency_rate = (consistent_days / len(valid_days)) * 100
+    return {
+        "城市": city_name,
+        "有效对比天数": len(valid_days),
+        "等级一致天数": consistent_days,
+        "等级不一致天数": len(valid_days) - consistent_days,
+        "一致率(%)": round(consistency_rate, 2),
+        "中国优天数": (valid_days["China_Level"] == "优").sum(),
+        "美国优天数": (valid_days["US_Level"] == "优").sum()
+    }
+
+def calc_level_distribution(city_name, daily_avg, result_dir, manifest=None):
+    """统计单个城市中/美两种口径的等级分布，导出CSV，返回(中国汇总行, 美国汇总行)"""
+    # 确保存在等级列（若前面一致性统计步骤未执行到此处，也在此补齐）
+    if "China_Level" not in daily_avg.columns:
+        daily_avg["China_Level"] = classify_levels(daily_avg["China_Avg"], CHINA_DAILY_5)
+    if "US_Level" not in daily_avg.columns:
+        daily_avg["US_Level"] = classify_levels(daily_avg["US_Avg"], CHINA_DAILY_5)
+
+    # 中国口径分布
+    china_valid = daily_avg.dropna(subset=["China_Level"])  # 仅统计有等级的天
+    china_counts = china_valid["China_Level"].value_counts().reindex(levels_order, fill_value=0)
+    china_total = china_counts.sum()
+    china_perc = (china_counts / china_total * 100).round(2) if china_total > 0 else pd.Series([0]*5, index=levels_order)
+
+    # 美国口径分布
+    us_valid = daily_avg.dropna(subset=["US_Level"])  # 仅统计有等级的天
+    us_counts = us_valid["US_Level"].value_counts().reindex(levels_order, fill_value=0)
+    us_total = us_counts.sum()
+    us_perc = (us_counts / us_total * 100).round(2) if us_total > 0 else pd.Series([0]*5, index=levels_order)
+
+    # 导出当前城市等级分布CSV
+    city_dist_df = pd.DataFrame({
+        "等级": levels_order,
+        "中国_天数": china_counts.values,
+        "中国_占比(%)": china_perc.values,
+        "美国_天数": us_counts.values,
+        "美国_占比(%)": us_perc.values
+    })
+    city_dist_path = os.path.join(result_dir, f"{city_name}_污染等级分布_中美对比.csv")
+    if write_csv(city_dist_df, city_dist_path, manifest, index=False):
+        print(f"📄 {city_name}污染等级分布表已保存：{city_dist_path}")
+
+    # 汇总到五城分布汇总（分别汇总中国与美国口径，便于跨城比较）
+    china_row = {"城市": city_name}
+    us_row = {"城市": city_name}
+    for lvl in levels_order:
+        china_row[f"{lvl}_占比(%)"] = float(china_perc[lvl]) if china_total > 0 else 0.0
+        us_row[f"{lvl}_占比(%)"] = float(us_perc[lvl]) if us_total > 0 else 0.0
+
+    return china_row, us_row
+
+def level_distribution_spec(city_name, china_row, us_row, result_dir):
+    """单个城市中美等级分布对比柱状图的渲染描述"""
+    return figure_spec(
+        draw_level_distribution,
+        os.path.join(result_dir, f"{city_name}_污染等级分布_中美对比.png"),
+        message=f"📊 {city_name}污染等级分布图已保存",
+        city_name=city_name,
+        levels_order=levels_order,
+        china_perc=[china_row[f"{lvl}_占比(%)"] for lvl in levels_order],
+        us_perc=[us_row[f"{lvl}_占比(%)"] for lvl in levels_order],
+    )
+
+def city_stack_spec(summary_df, title, save_name, result_dir):
+    """五城堆叠柱状图的渲染描述（按城市行，列为各等级占比）"""
+    return figure_spec(
+        draw_city_stack,
+        os.path.join(result_dir, save_name),
+        message="📈 五城市堆叠图已保存",
+        summary_df=summary_df, levels_order=levels_order, title=title,
+    )
+
+def calc_level_crosstab(daily_avg):
+    """中美等级交叉表（行：中国等级，列：美国等级，按等级顺序排列，缺失等级补0）"""
+    valid_level = daily_avg.dropna(subset=["China_Level", "US_Level"])
+    crosstab = pd.crosstab(valid_level["China_Level"], valid_level["US_Level"])
+    return crosstab.reindex(index=levels_order, columns=levels_order).fillna(0)
+
+
+# ----------------------
+# 4. 中美监测结果对比（日均、超标率、相关性与误差）
+# ----------------------
+def calc_city_stats(city_name, daily_avg):
+    """单个城市中美口径的有效天数、日均与超标率（超标：日均>75μg/m³）"""
+    # 有效数据量（排除NaN）
+    china_valid = daily_avg["China_Avg"].notna().sum()
+    us_valid = daily_avg["US_Avg"].notna().sum()
+    # 中国口径统计
+    china_mean = daily_avg["China_Avg"].mean()
+    china_over_75 = (daily_avg["China_Avg"] > 75).sum()  # 超标天数（中国标准）
+    china_over_rate = (china_over_75 / china_valid) * 100 if china_valid > 0 else 0
+    # 美国口径统计（参考同一标准，便于对比）
+    us_mean = daily_avg["US_Avg"].mean()
+    us_over_75 = (daily_avg["US_Avg"] > 75).sum()
+    us_over_rate = (us_over_75 / us_valid) * 100 if us_valid > 0 else 0
+    return {
+        "城市": city_name,
+        "中国口径有效天数": china_valid,
+        "中国口径日均PM2.5(μg/m³)": round(china_mean, 2),
+        "中国口径超标率(%)": round(china_over_rate, 2),
+        "美国口径有效天数": us_valid,
+        "美国口径日均PM2.5(μg/m³)": round(us_mean, 2),
+        "美国口径超标率(%)": round(us_over_rate, 2)
+    }
+
+
+# ----------------------
+# 5. 单城市完整流程：加载 → 聚合 → 导出（在子进程中执行），图表只排队不绘制
+# ----------------------
+def _load_city(city, path, stations, mode, chunksize):
+    """按运行模式加载单个城市：返回(小时数据, 多粒度聚合)，其中之一为None"""
+    if mode == "hourly":
+        hourly_store = HourlyStore.open(path)
+        agg = hourly_store.aggregate(stations)
+        print(f"✅ {city}逐小时存储读取完成：{hourly_store.first_day}起{hourly_store.n_days}天")
+        return None, agg
+    if mode == "incremental":
+        store = AggregateStore(path, stations, chunksize=chunksize or DEFAULT_CHUNKSIZE)
+        agg, new_rows = store.refresh()
+        print(f"✅ {city}增量聚合完成：新增行数{new_rows}")
+        return None, agg
+    if mode == "chunks":
+        agg = MultiResolutionAggregate.from_chunks(iter_city_chunks(path, chunksize, usecols=stations), stations)
+        print(f"✅ {city}流式聚合完成：每块{chunksize}行，有效天数{len(agg.parts['day'][0])}")
+        return None, agg
+    city_df = read_city_frame(path)
+    print(f"✅ {city}数据加载完成：时间范围{city_df['date'].min().date()}~{city_df['date'].max().date()}，有效行数{len(city_df)}")
+    return city_df, None
+
+
+def run_city_pipeline(city, path, china_monitors, us_col, result_dir, incremental=False, chunksize=None, manifest=None, hourly=False):
+    """
+    执行单个城市的完整分析流程，返回供五城汇总使用的结果
+    - incremental=True：不加载全量小时数据，从增量聚合存储读取（只解析新追加的行）
+    - chunksize：流式模式，按块读取CSV并直接累加到日/月部分和，峰值内存与文件大小无关
+    返回：dict（monthly_avg/daily_avg/consistency/china_row/us_row/figures），数据文件缺失时返回None
+    figures为图表渲染描述列表，由调用方统一交给pm25.render.render_figures批量绘制
+    manifest：产物清单（None时读取result_dir下的清单），输入未变化的CSV不再重写；
+    本次登记的产物在返回值的artifacts中，由调用方合并后保存
+    hourly=True：从逐小时内存映射存储读取（各进程共享同一份页缓存），按(天数, 24)reshape直接归约
+    """
+    if manifest is None:
+        manifest = ArtifactManifest(result_dir)
+    stations = china_monitors + [us_col]
+    use_aggregate = incremental or bool(chunksize) or hourly
+    mode = "hourly" if hourly else "incremental" if incremental else "chunks" if chunksize else "frame"
+    try:
+        with stage("load_city", city=city, detail=mode):
+            city_df, agg = _load_city(city, path, stations, mode, chunksize)
+    except FileNotFoundError:
+        print(f"❌ 未找到{city}数据文件，路径：{path}")
+        return None
+
+    figures = []
+    # 观测点月度差异：计算、导出（实验报告可引用）
+    with stage("monthly_avg", city=city):
+        if use_aggregate:
+            monthly_avg = calc_station_monthly_avg_from_aggregate(agg, city_name=city, china_monitors=china_monitors)
+        else:
+            monthly_avg = calc_station_monthly_avg(city_df=city_df, city_name=city, china_monitors=china_monitors)
+    figures.append(station_monthly_diff_spec(city, monthly_avg, china_monitors, result_dir))
+    if monthly_avg is not None:
+        write_csv(
+            monthly_avg, os.path.join(result_dir, f"{city}_各观测点月度PM2.5数据.csv"), manifest,
+            index=False
+        )
+
+    # 每日平均：计算、导出（实验报告可直接引用）
+    with stage("daily_avg", city=city) as rec:
+        if use_aggregate:
+            daily_avg = calc_city_daily_avg_from_aggregate(agg, china_monitors=china_monitors, us_col=us_col)
+        else:
+            daily_avg = calc_city_daily_avg(city_df=city_df, china_monitors=china_monitors, us_col=us_col)
+        rec["rows"] = len(daily_avg)
+    print(f"📈 {city}每日平均计算完成：有效天数{len(daily_avg)}，中国口径均值{daily_avg['China_Avg'].mean():.2f}μg/m³")
+    figures.append(city_daily_avg_spec(city, daily_avg, result_dir))
+    daily_avg_export = daily_avg.reset_index()
+    daily_avg_export["date"] = daily_avg_export["date"].dt.date  # 简化日期格式（仅保留年月日）
+    write_csv(
+        daily_avg_export, os.path.join(result_dir, f"{city}_每日PM2.5平均值.csv"), manifest,
+        index=False,
+        columns=["date", "China_Avg", "US_Avg", "year"]  # 仅保留核心列
+    )
+
+    # 中美等级一致性与等级分布
+    consistency = calc_level_consistency(city, daily_avg)
+    china_row, us_row = calc_level_distribution(city, daily_avg, result_dir, manifest)
+    figures.append(level_distribution_spec(city, china_row, us_row, result_dir))
+    return {
+        "monthly_avg": monthly_avg,
+        "daily_avg": daily_avg,
+        "consistency": consistency,
+        "china_row": china_row,
+        "us_row": us_row,
+        "figures": figures,
+        "artifacts": manifest.entries,
+    }
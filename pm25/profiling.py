@@ -0,0 +1,121 @@
+import os
+import sys
+import glob
+import json
+import time
+import cProfile
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource  # 仅类Unix系统提供，Windows下不记录峰值内存
+except ImportError:
+    resource = None
+
+# ----------------------
+# 运行剖析：记录各阶段的耗时、CPU时间、峰值内存与处理行数（默认关闭）
+# ----------------------
+# 环境变量PM25_PROFILE=<目录>开启（命令行为--profile 目录），PM25_PROFILE_CPROFILE=1时另存主进程的cProfile结果
+# 每个进程把阶段记录逐行追加到 <目录>/<运行编号>.<pid>.jsonl（子进程的记录不会丢失），
+# 运行结束时由主进程合并为 <运行编号>.json / .csv，并打印各阶段汇总
+# 阶段可以嵌套（如daily_avg内部的aggregate），汇总时外层阶段的耗时包含内层
+PROFILE_ENV = "PM25_PROFILE"
+CPROFILE_ENV = "PM25_PROFILE_CPROFILE"
+RUN_ENV = "PM25_PROFILE_RUN"  # 当前运行编号，由主进程设置，子进程继承
+FIELDS = ["run", "pid", "stage", "city", "detail", "rows", "wall_s", "cpu_s", "peak_rss_mb", "start"]
+
+_cprofile = None
+
+
+def enabled():
+    return bool(os.environ.get(PROFILE_ENV))
+
+
+def _peak_rss_mb():
+    """进程自启动以来的峰值常驻内存（MB）；Linux下ru_maxrss单位为KB，macOS为字节"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 ** 2 if sys.platform == "darwin" else 1024), 1)
+
+
+def _part_path():
+    run = os.environ.get(RUN_ENV) or "run"
+    return os.path.join(os.environ[PROFILE_ENV], f"{run}.{os.getpid()}.jsonl")
+
+
+@contextmanager
+def stage(name, city=None, detail=None, rows=None):
+    """
+    记录一个阶段；未开启时不做任何事
+    with stage("load", city="Beijing") as rec:
+        df = ...
+        rec["rows"] = len(df)
+    """
+    if not enabled():
+        yield {}
+        return
+    rec = {"stage": name, "city": city, "detail": detail, "rows": rows}
+    start, wall, cpu = time.time(), time.perf_counter(), time.process_time()
+    try:
+        yield rec
+    finally:
+        rec.update(
+            run=os.environ.get(RUN_ENV), pid=os.getpid(),
+            wall_s=round(time.perf_counter() - wall, 6), cpu_s=round(time.process_time() - cpu, 6),
+            peak_rss_mb=_peak_rss_mb(), start=round(start, 3),
+        )
+        os.makedirs(os.environ[PROFILE_ENV], exist_ok=True)
+        with open(_part_path(), "a", encoding="utf-8") as f:
+            f.write(json.dumps({key: rec.get(key) for key in FIELDS}, ensure_ascii=False) + "\n")
+
+
+def start_run(name):
+    """主进程在运行开始时调用：分配运行编号（子进程通过环境变量继承），按需启动cProfile"""
+    global _cprofile
+    if not enabled():
+        return None
+    run = f"{name}_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+    os.environ[RUN_ENV] = run
+    if os.environ.get(CPROFILE_ENV) == "1":
+        _cprofile = cProfile.Profile()
+        _cprofile.enable()
+    return run
+
+
+def finish_run():
+    """
+    主进程在运行结束时调用：合并各进程的记录，保存JSON/CSV（与cProfile结果），打印各阶段汇总
+    返回：全部阶段记录的DataFrame（未开启时为None）
+    """
+    global _cprofile
+    if not enabled() or not os.environ.get(RUN_ENV):
+        return None
+    profile_dir, run = os.environ[PROFILE_ENV], os.environ[RUN_ENV]
+    base = os.path.join(profile_dir, run)
+    if _cprofile is not None:
+        _cprofile.disable()
+        _cprofile.dump_stats(base + ".prof")  # 可用snakeviz/flameprof等工具查看或生成火焰图
+        _cprofile = None
+
+    records = []
+    for part in sorted(glob.glob(glob.escape(base) + ".*.jsonl")):
+        with open(part, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+        os.remove(part)
+    df = pd.DataFrame(records, columns=FIELDS).sort_values("start", kind="stable").reset_index(drop=True)
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        stages = df.astype(object).where(df.notna(), None).to_dict(orient="records")  # NaN写为null
+        json.dump({"run": run, "stages": stages}, f, ensure_ascii=False, indent=1)
+    df.to_csv(base + ".csv", index=False)
+
+    summary = df.groupby("stage", sort=False).agg(
+        次数=("stage", "size"), 耗时s=("wall_s", "sum"), CPUs=("cpu_s", "sum"),
+        行数=("rows", lambda rows: rows.sum(min_count=1)), 峰值内存MB=("peak_rss_mb", "max"),
+    ).sort_values("耗时s", ascending=False)
+    print("\n⏱️ 各阶段耗时汇总（嵌套阶段的耗时计入外层）：")
+    print(summary.to_string(float_format=lambda x: f"{x:.3f}"))
+    print(f"📝 运行剖析已保存：{base}.json / .csv" + ("（含.prof）" if os.path.exists(base + ".prof") else ""))
+    del os.environ[RUN_ENV]
+    return df
@@ -0,0 +1,107 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+from .artifacts import fingerprint
+from .profiling import stage
+
+# 无界面批量渲染：强制使用Agg后端（必须在导入pyplot之前，也覆盖已设置的交互后端）
+matplotlib.use("Agg", force=True)
+import matplotlib.pyplot as plt  # noqa: E402
+
+# ----------------------
+# 图表渲染：先排队图表描述，再在进程池中批量绘制与保存
+# ----------------------
+# 渲染预设：preview用于快速预览，publication为论文/报告用的300dpi
+RENDER_PRESETS = {
+    "preview": {"dpi": 100, "format": "png"},
+    "publication": {"dpi": 300, "format": "png"},
+}
+PRESET_ENV = "PM25_RENDER_PRESET"  # 环境变量：选择渲染预设（默认publication）
+
+# draw：模块级绘图函数（可被子进程导入），以kwargs调用，返回Figure；无需出图时返回None
+# save_path：保存路径（后缀按预设的format替换）
+# savefig_kwargs：额外的savefig参数（如bbox_inches）
+# message：保存后打印的提示语
+FigureSpec = namedtuple("FigureSpec", ["draw", "kwargs", "save_path", "savefig_kwargs", "message"])
+
+
+def figure_spec(draw, save_path, message=None, savefig_kwargs=None, **kwargs):
+    """构造一个图表描述（参数需可pickle，以便发送到子进程）"""
+    return FigureSpec(draw, kwargs, save_path, savefig_kwargs or {}, message)
+
+
+def get_preset(name=None):
+    """取渲染预设：参数优先，其次环境变量PM25_RENDER_PRESET，默认publication"""
+    name = name or os.environ.get(PRESET_ENV) or "publication"
+    try:
+        return RENDER_PRESETS[name]
+    except KeyError:
+        raise ValueError(f"未知的渲染预设：{name}（可选：{'/'.join(RENDER_PRESETS)}）") from None
+
+
+def output_path(spec, preset):
+    """图表实际保存路径（后缀按预设的format替换）"""
+    return os.path.splitext(spec.save_path)[0] + "." + preset["format"]
+
+
+def spec_fingerprint(spec, preset):
+    """图表指纹：绘图函数（含源码）+ 输入数据与参数 + savefig参数 + 渲染预设"""
+    return fingerprint(spec.draw, spec.kwargs, spec.savefig_kwargs, preset)
+
+
+def render_figure(spec, preset):
+    """绘制并保存单个图表，返回实际保存路径（draw返回None时不保存）"""
+    save_path = output_path(spec, preset)
+    with stage("draw", detail=os.path.basename(save_path)):
+        fig = spec.draw(**spec.kwargs)
+    if fig is None:
+        return None
+    with stage("savefig", detail=os.path.basename(save_path)):
+        fig.savefig(save_path, dpi=preset["dpi"], format=preset["format"], **spec.savefig_kwargs)
+        plt.close(fig)
+    if spec.message:
+        print(f"{spec.message}：{save_path}")
+    return save_path
+
+
+def render_figures(specs, preset=None, max_workers=None, manifest=None):
+    """
+    批量渲染图表队列
+    - preset：预设名或预设dict，None时按环境变量/默认值
+    - max_workers为1时在当前进程顺序渲染
+    - manifest：pm25.artifacts.ArtifactManifest，指纹未变化且文件存在的图表直接复用，不再绘制
+    返回：保存路径列表（与specs顺序一致）
+    """
+    if not isinstance(preset, dict):
+        preset = get_preset(preset)
+    specs = list(specs)
+    paths = [None] * len(specs)
+    pending = []  # (序号, 图表描述, 指纹)
+    for i, spec in enumerate(specs):
+        fp = spec_fingerprint(spec, preset) if manifest is not None else None
+        if manifest is not None and manifest.is_fresh(output_path(spec, preset), fp):
+            paths[i] = output_path(spec, preset)
+            manifest.record(paths[i], fp, reused=True)
+        else:
+            pending.append((i, spec, fp))
+    if manifest is not None and len(pending) < len(specs):
+        print(f"♻️ {len(specs) - len(pending)}张图表输入未变化，直接复用")
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(pending))
+    if max_workers <= 1:
+        rendered = [render_figure(spec, preset) for _, spec, _ in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(render_figure, spec, preset) for _, spec, _ in pending]
+            rendered = [future.result() for future in futures]
+
+    for (i, _, fp), path in zip(pending, rendered):
+        paths[i] = path
+        if manifest is not None and path is not None:
+            manifest.record(path, fp, reused=False)
+    return paths
@@ -0,0 +1,163 @@
+from collections import deque, namedtuple
+import numpy as np
+import pandas as pd
+
+# ----------------------
+# 滚动窗口统计：均值、最大值、超标次数（>75μg/m³）
+# ----------------------
+# 窗口按时间计：逐小时序列为24小时/7天/30天，每日序列为1天/7天/30天，缺测小时（天）为NaN，
+# 与pandas的s.rolling("30D")相同（窗口含当前时刻，序列开头不足一个窗口时按已有数据统计）
+# - 批量：前缀和求均值与超标次数，分块前缀/后缀最大值（van Herk/Gil-Werman）求滑动最大值，均为O(n)向量化
+# - 流式：RollingWindow每来一个新值O(1)更新（运行和 + 单调递减双端队列），用于实时预警
+EXCEED_THRESHOLD = 75  # 超标阈值（μg/m³，GB3095-2012二级24小时浓度限值）
+HOURLY_WINDOWS = {"24h": 24, "7d": 24 * 7, "30d": 24 * 30}  # 窗口名 → 小时数
+DAILY_WINDOWS = {"24h": 1, "7d": 7, "30d": 30}  # 窗口名 → 天数
+STATS = ("mean", "max", "exceed")
+
+RollingStat = namedtuple("RollingStat", ["mean", "max", "exceed", "count"])
+
+
+def sliding_max(values, size):
+    """每个位置向前size个值（含当前）的最大值，忽略NaN，窗口内全为NaN时为NaN"""
+    values = np.asarray(values, dtype="float64")
+    n = len(values)
+    if n == 0:
+        return values.copy()
+    # 开头补size-1个-inf使每个位置都有完整窗口，末尾补齐为size的整数倍后按块reshape
+    n_blocks = -(-(n + size - 1) // size)
+    padded = np.full(n_blocks * size, -np.inf)
+    padded[size - 1:size - 1 + n] = np.where(np.isnan(values), -np.inf, values)
+    blocks = padded.reshape(n_blocks, size)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()  # 块内从左到右的最大值
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()  # 块内从右到左的最大值
+    result = np.maximum(suffix[:n], prefix[size - 1:size - 1 + n])  # 窗口跨越相邻两块：前块后缀 + 后块前缀
+    result[result == -np.inf] = np.nan
+    return result
+
+
+def _window_sum(csum, size):
+    """前缀和（首元素为0）→ 每个位置向前size个值的和"""
+    hi = np.arange(1, len(csum))
+    return csum[hi] - csum[np.maximum(hi - size, 0)]
+
+
+def rolling_stats(values, size, threshold=EXCEED_THRESHOLD, min_periods=1):
+    """
+    一条等间隔序列（缺测为NaN）的滚动统计
+    返回：{"mean", "max", "exceed", "count"} → 与输入等长的数组；有效值少于min_periods的窗口均值/最大值为NaN
+    """
+    values = np.asarray(values, dtype="float64")
+    valid = ~np.isnan(values)
+    csums = np.zeros((3, len(values) + 1))
+    np.cumsum(np.stack([valid, np.where(valid, values, 0), valid & (values > threshold)]), axis=1, out=csums[:, 1:])
+    count, total, exceed = (_window_sum(csum, size) for csum in csums)
+    enough = count >= max(min_periods, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(enough, total / count, np.nan)
+    return {
+        "mean": mean,
+        "max": np.where(enough, sliding_max(values, size), np.nan),
+        "exceed": exceed.astype("int64"),
+        "count": count.astype("int64"),
+    }
+
+
+def rolling_frame(series, windows, threshold=EXCEED_THRESHOLD, prefix=None):
+    """
+    等间隔Series（索引为时间）→ 各窗口的滚动统计DataFrame，列名为 <前缀>_<窗口>_<mean/max/exceed>
+    windows：{窗口名: 点数}
+    """
+    prefix = series.name if prefix is None else prefix
+    columns = {}
+    for name, size in windows.items():
+        stats = rolling_stats(series.to_numpy(dtype="float64"), size, threshold)
+        for stat in STATS:
+            columns[f"{prefix}_{name}_{stat}"] = stats[stat]
+    return pd.DataFrame(columns, index=series.index)
+
+
+def city_daily_rolling(daily_avg, windows=DAILY_WINDOWS, threshold=EXCEED_THRESHOLD):
+    """
+    每日平均（calc_city_daily_avg的结果）的China_Avg/US_Avg滚动统计
+    先补齐为连续日历（缺测日为NaN），使窗口按日历天数而不是按行数计
+    """
+    if len(daily_avg) == 0:
+        return pd.DataFrame(index=daily_avg.index)
+    days = pd.date_range(daily_avg.index.min(), daily_avg.index.max(), freq="D", name=daily_avg.index.name)
+    dense = daily_avg[["China_Avg", "US_Avg"]].reindex(days)
+    return pd.concat([rolling_frame(dense[col], windows, threshold) for col in dense.columns], axis=1)
+
+
+def station_rolling(store, stations=None, start=None, end=None, windows=HOURLY_WINDOWS, threshold=EXCEED_THRESHOLD):
+    """
+    逐小时存储（pm25.hourly.HourlyStore）中各观测点的滚动统计
+    返回：{观测点: DataFrame（逐小时时间索引）}；存储是稠密网格，缺测小时已为NaN
+    """
+    stations = store.stations if stations is None else list(stations)
+    index = store.time_index(start, end)
+    return {
+        station: rolling_frame(pd.Series(store.window(station, start, end), index=index, name=station), windows, threshold)
+        for station in stations
+    }
+
+
+class RollingWindow:
+    """
+    流式滚动窗口：push(新值)后O(1)得到窗口内的均值、最大值与超标次数
+    - 最大值：单调递减双端队列（队首为窗口最大值，新值入队时弹出队尾所有更小的值，每个值最多进出一次）
+    - 均值/超标次数：运行和，值离开窗口时减去
+    缺测时刻也要push(NaN)，窗口才按时间而不是按有效值个数滑动
+    """
+
+    def __init__(self, size, threshold=EXCEED_THRESHOLD):
+        self.size = size
+        self.threshold = threshold
+        self._values = deque()
+        self._maxima = deque()  # (序号, 值)，值单调递减
+        self._seq = 0
+        self._count = 0
+        self._total = 0.0
+        self._exceed = 0
+
+    @classmethod
+    def from_history(cls, values, size, threshold=EXCEED_THRESHOLD):
+        """用历史数据的最后size个值初始化（更早的值不影响窗口）"""
+        window = cls(size, threshold)
+        window.extend(np.asarray(values, dtype="float64")[-size:])
+        return window
+
+    def push(self, value):
+        value = float(value)
+        if len(self._values) == self.size:
+            self._evict(self._values.popleft())
+        self._values.append(value)
+        if value == value:  # 非NaN
+            self._count += 1
+            self._total += value
+            self._exceed += value > self.threshold
+            while self._maxima and self._maxima[-1][1] <= value:
+                self._maxima.pop()
+            self._maxima.append((self._seq, value))
+        self._seq += 1
+        return self.stat
+
+    def _evict(self, old):
+        if old == old:
+            self._count -= 1
+            self._total -= old
+            self._exceed -= old > self.threshold
+            if self._count == 0:
+                self._total = 0.0  # 窗口内已无有效值时清零，避免浮点误差长期累积
+        if self._maxima and self._maxima[0][0] <= self._seq - self.size:
+            self._maxima.popleft()
+
+    def extend(self, values):
+        for value in values:
+            self.push(value)
+        return self.stat
+
+    @property
+    def stat(self):
+        if self._count == 0:
+            return RollingStat(np.nan, np.nan, 0, 0)
+        return RollingStat(self._total / self._count, self._maxima[0][1], self._exceed, self._count)
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+from .classify import SEASON_NAMES, season_codes
+from .rolling import EXCEED_THRESHOLD
+
+# ----------------------
+# 污染玫瑰：按风向(cbwd) × 风速等级(Iws) × 季节统计各观测点的PM2.5
+# ----------------------
+# 风向用分类编码映射到统一的WIND_DIRECTIONS下标（各城市的风向类别不完全相同），
+# 风速按WIND_SPEED_EDGES分级（右闭区间，与浓度分级一致），
+# 每个观测值编码为一个整数key（观测点, 风向, 风速等级, 季节），np.bincount一次得到计数、和、平方和与超标次数；
+# 结果只有计数与和，可跨数据块直接相加（merge）
+WIND_DIRECTIONS = ("NE", "SE", "SW", "NW", "cv")  # cv：静风或风向不定
+DIRECTION_ANGLES = {"NE": 45, "SE": 135, "SW": 225, "NW": 315}  # 绘图方位角（度，正北为0，顺时针）
+WIND_SPEED_EDGES = (2, 5, 10, 20)  # 累计风速Iws（m/s）分级上限
+WIND_SPEED_LABELS = ("≤2", "2-5", "5-10", "10-20", ">20")
+ROSE_DIMS = ("direction", "speed", "season")
+DIM_LABELS = {"direction": list(WIND_DIRECTIONS), "speed": list(WIND_SPEED_LABELS), "season": list(SEASON_NAMES)}
+DIM_COLUMNS = {"direction": "风向", "speed": "风速等级", "season": "季节"}
+N_DIRECTIONS, N_SPEEDS, N_SEASONS = len(WIND_DIRECTIONS), len(WIND_SPEED_LABELS), len(SEASON_NAMES)
+N_CELLS = N_DIRECTIONS * N_SPEEDS * N_SEASONS
+
+
+def direction_codes(cbwd):
+    """风向（分类Series或字符串数组）→ WIND_DIRECTIONS下标，缺失或未知风向为-1"""
+    cbwd = pd.Series(cbwd)
+    if not isinstance(cbwd.dtype, pd.CategoricalDtype):
+        cbwd = cbwd.astype("category")
+    lookup = np.array([WIND_DIRECTIONS.index(c) if c in WIND_DIRECTIONS else -1 for c in cbwd.cat.categories] + [-1])
+    return lookup[cbwd.cat.codes.to_numpy()]  # 缺失值的编码为-1，正好取到末尾补的-1
+
+
+def speed_codes(iws):
+    """累计风速 → 风速等级下标，缺失为-1"""
+    iws = np.asarray(iws, dtype="float64")
+    codes = np.searchsorted(np.asarray(WIND_SPEED_EDGES, dtype="float64"), iws, side="left")
+    codes[np.isnan(iws)] = -1
+    return codes
+
+
+class PollutionRose:
+    """
+    各观测点的污染玫瑰部分结果：count / sum / sumsq / exceed 形状均为(观测点数, 风向, 风速等级, 季节)
+    - from_hourly / from_chunks 构建，merge 合并，save / load 持久化（.npz）
+    - table(by)：按所选维度汇总的小时数、频率、均值、标准差、超标率与污染负荷占比
+    - load_share(station)：(风向, 风速等级)的污染负荷占比矩阵，供draw_pollution_rose绘图
+    """
+
+    def __init__(self, columns, count, total, sumsq, exceed, threshold=EXCEED_THRESHOLD):
+        self.columns = list(columns)
+        self.count = count
+        self.sum = total
+        self.sumsq = sumsq
+        self.exceed = exceed
+        self.threshold = threshold
+
+    @classmethod
+    def from_hourly(cls, df, columns, threshold=EXCEED_THRESHOLD):
+        """由小时数据（含month、cbwd、Iws与观测点列）构建，风向、风速或浓度缺失的小时不计入"""
+        shape = (len(columns), N_DIRECTIONS, N_SPEEDS, N_SEASONS)
+        directions, speeds = direction_codes(df["cbwd"]), speed_codes(df["Iws"])
+        wind_valid = (directions >= 0) & (speeds >= 0)
+        cells = (directions * N_SPEEDS + speeds) * N_SEASONS + season_codes(df["month"])  # 风向或风速缺失的行稍后剔除
+        values = df[columns].to_numpy(dtype="float64")
+        valid = ~np.isnan(values) & wind_valid[:, None]
+        keys = (cells[:, None] + np.arange(len(columns)) * N_CELLS)[valid]  # (行, 观测点)展平
+        v = values[valid]
+        size = len(columns) * N_CELLS
+        return cls(
+            columns,
+            np.bincount(keys, minlength=size).reshape(shape),
+            np.bincount(keys, weights=v, minlength=size).reshape(shape),
+            np.bincount(keys, weights=v * v, minlength=size).reshape(shape),
+            np.bincount(keys[v > threshold], minlength=size).reshape(shape),
+            threshold,
+        )
+
+    @classmethod
+    def from_chunks(cls, chunks, columns, threshold=EXCEED_THRESHOLD):
+        """流式构建：逐块计数后合并"""
+        rose = None
+        for chunk in chunks:
+            part = cls.from_hourly(chunk, columns, threshold)
+            rose = part if rose is None else rose.merge(part)
+        if rose is None:
+            empty = pd.DataFrame({"month": [], "cbwd": pd.Categorical([]), "Iws": [], **{col: [] for col in columns}})
+            return cls.from_hourly(empty, columns, threshold)
+        return rose
+
+    def merge(self, other):
+        if other.columns != self.columns or other.threshold != self.threshold:
+            raise ValueError(f"观测点或超标阈值不一致，无法合并：{self.columns} vs {other.columns}")
+        return PollutionRose(
+            self.columns, self.count + other.count, self.sum + other.sum, self.sumsq + other.sumsq,
+            self.exceed + other.exceed, self.threshold,
+        )
+
+    def save(self, path):
+        """保存为.npz（仅数组，不依赖pickle）"""
+        np.savez(
+            path, columns=np.array(self.columns), count=self.count, sum=self.sum, sumsq=self.sumsq,
+            exceed=self.exceed, threshold=self.threshold,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["columns"].tolist(), data["count"], data["sum"], data["sumsq"], data["exceed"], float(data["threshold"])
+            )
+
+    def _reduce(self, by, season=None):
+        """按by保留维度（其余求和），season可只取某一季节；返回(count, sum, sumsq, exceed)，第一维为观测点"""
+        by = (by,) if isinstance(by, str) else tuple(by)
+        if set(by) - set(ROSE_DIMS):
+            raise ValueError(f"未知的维度：{sorted(set(by) - set(ROSE_DIMS))}（可选：{list(ROSE_DIMS)}）")
+        keep = [ROSE_DIMS.index(dim) for dim in by]
+        drop = tuple(1 + i for i in range(len(ROSE_DIMS)) if i not in keep)
+        order = [0] + [1 + sorted(keep).index(i) for i in keep]
+        arrays = (self.count, self.sum, self.sumsq, self.exceed)
+        if season is not None:
+            s = SEASON_NAMES.index(season)
+            arrays = tuple(arr[..., s:s + 1] for arr in arrays)
+        return by, tuple(arr.sum(axis=drop).transpose(order) for arr in arrays)
+
+    def table(self, by=ROSE_DIMS, season=None):
+        """
+        按所选维度汇总的统计表（每个观测点 × 所选维度组合一行）
+        频率(%)：该组合占观测点有效小时数的比例；负荷占比(%)：该组合的浓度和占观测点浓度总和的比例
+        """
+        by, (count, total, sumsq, exceed) = self._reduce(by, season)
+        station_count = count.reshape(len(self.columns), -1).sum(axis=1)
+        station_total = total.reshape(len(self.columns), -1).sum(axis=1)
+        expand = (slice(None),) + (None,) * len(by)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, total / count, np.nan)
+            frame = pd.DataFrame({
+                "有效小时数": count.ravel(),
+                "频率(%)": (count / station_count[expand] * 100).ravel(),
+                "均值": mean.ravel(),
+                "标准差": np.sqrt(np.clip(np.where(count > 0, sumsq / count, np.nan) - mean ** 2, 0, None)).ravel(),
+                "超标率(%)": np.where(count > 0, exceed / count * 100, np.nan).ravel(),
+                "负荷占比(%)": (total / station_total[expand] * 100).ravel(),
+            }, index=pd.MultiIndex.from_product(
+                [self.columns] + [DIM_LABELS[dim] for dim in by], names=["观测点"] + [DIM_COLUMNS[dim] for dim in by]
+            ))
+        return frame.reset_index()
+
+    def load_share(self, station, season=None):
+        """观测点(风向, 风速等级)的污染负荷占比(%)矩阵（各格子之和为100）"""
+        _, (count, total, sumsq, exceed) = self._reduce(("direction", "speed"), season)
+        share = total[self.columns.index(station)]
+        return share / share.sum() * 100 if share.sum() > 0 else np.zeros_like(share)
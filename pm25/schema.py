@@ -0,0 +1,68 @@
+import pandas as pd
+
+# ----------------------
+# 紧凑数据类型：读取PM2.5data时直接按声明的类型解析
+# ----------------------
+# 只压缩取值能无损表示的列，导出结果（如PM2.5.3的test<城市>.csv）与默认类型逐字节一致：
+# - 年月日时用uint8/uint16；No为逐小时序号，十年以上数据会超过uint16上限，用uint32
+# - 观测点PM_*列（按前缀匹配）为整数μg/m³，用float32（缺测为NaN）
+# - 气象列的小数（如14.66666667、1005.200012）float32无法精确表示，保持float64；
+#   season在部分城市末行缺失（如广州），保持默认推断（有缺失时为float64），导出格式不变
+INT_DTYPES = {
+    "No": "uint32",
+    "year": "uint16",
+    "month": "uint8",
+    "day": "uint8",
+    "hour": "uint8",
+}
+WEATHER_COLUMNS = ["DEWP", "HUMI", "PRES", "TEMP", "Iws", "precipitation", "Iprec"]
+FLOAT_DTYPE = "float32"  # 仅用于PM_*列
+CATEGORY_COLUMNS = ["cbwd"]  # 风向（NE/NW/SE/cv）
+# 未声明紧凑类型时pandas的默认类型，用于估算节省的内存
+_DEFAULT_DTYPES = {"uint8": "int64", "uint16": "int64", "uint32": "int64", "float32": "float64", "category": "object"}
+
+
+def schema_for(columns):
+    """按列名生成read_csv的dtype参数（未知列保持pandas默认推断）"""
+    dtypes = {}
+    for col in columns:
+        if col in INT_DTYPES:
+            dtypes[col] = INT_DTYPES[col]
+        elif col.startswith("PM_"):
+            dtypes[col] = FLOAT_DTYPE
+        elif col in CATEGORY_COLUMNS:
+            dtypes[col] = "category"
+    return dtypes
+
+
+def csv_dtypes(csv_path):
+    """读取CSV表头，返回该文件对应的dtype参数"""
+    return schema_for(pd.read_csv(csv_path, nrows=0).columns)
+
+
+def memory_usage_mb(df):
+    """返回(当前占用MB, 默认类型下的估算占用MB)，逐列估算，不会整表复制"""
+    compact = df.memory_usage(index=False, deep=True).sum()
+    default = 0
+    for col in df.columns:
+        default_dtype = _DEFAULT_DTYPES.get(str(df[col].dtype))
+        if default_dtype is None:
+            default += df[col].memory_usage(index=False, deep=True)
+        else:
+            default += df[col].astype(default_dtype).memory_usage(index=False, deep=True)
+    return compact / 1024 ** 2, default / 1024 ** 2
+
+
+def memory_report(city_dfs):
+    """各城市内存占用报告（紧凑类型 vs 默认类型）"""
+    rows = []
+    for city, df in city_dfs.items():
+        compact_mb, default_mb = memory_usage_mb(df)
+        rows.append({
+            "城市": city,
+            "行数": len(df),
+            "紧凑类型占用(MB)": round(compact_mb, 2),
+            "默认类型占用(MB)": round(default_mb, 2),
+            "节省(%)": round((1 - compact_mb / default_mb) * 100, 1) if default_mb > 0 else 0.0,
+        })
+    return pd.DataFrame(rows)
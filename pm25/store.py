@@ -0,0 +1,174 @@
+import io
+import os
+import json
+import hashlib
+import pandas as pd
+
+from .aggregate import MultiResolutionAggregate
+from .cache import DATE_PART_COLUMNS, add_date_columns
+from .schema import schema_for
+
+# ----------------------
+# 增量聚合存储：只读取CSV中新追加的小时行，更新日/月/季/年部分和
+# ----------------------
+# 存储目录结构：<CSV所在目录>/.store/<CSV文件名(无后缀)>/
+#   state.json               已读取的字节位置、表头与最后一行的指纹
+#   aggregate-<位置>.npz      读到该字节位置为止的MultiResolutionAggregate各粒度部分和
+STORE_VERSION = 1
+STORE_DIRNAME = ".store"
+DEFAULT_CHUNKSIZE = 200_000  # 每次解析的行数（约几十MB），控制峰值内存
+
+
+def _sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _last_newline_end(f, size, block_size=1 << 16):
+    """从文件末尾向前找最后一个换行符，返回其后一个字节的位置（没有换行符时为0）"""
+    pos = size
+    while pos > 0:
+        start = max(0, pos - block_size)
+        f.seek(start)
+        idx = f.read(pos - start).rfind(b"\n")
+        if idx >= 0:
+            return start + idx + 1
+        pos = start
+    return 0
+
+
+class _RangeReader(io.RawIOBase):
+    """只暴露文件[start, end)区间的只读流，供pandas分块解析"""
+
+    def __init__(self, f, start, end):
+        self._f = f
+        self._f.seek(start)
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self._remaining)
+        if n <= 0:
+            return 0
+        data = self._f.read(n)
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+class AggregateStore:
+    """
+    单个城市CSV的增量聚合存储
+    源文件只在末尾追加时走增量路径；表头、已读部分的最后一行被改动或文件变短时全量重建
+    新数据按chunksize分块解析，即使全量重建也不会一次性读入整个文件
+    """
+
+    def __init__(self, csv_path, columns, store_dir=None, chunksize=DEFAULT_CHUNKSIZE):
+        self.csv_path = csv_path
+        self.columns = list(columns)
+        self.chunksize = chunksize
+        if store_dir is None:
+            folder, name = os.path.split(os.path.abspath(csv_path))
+            store_dir = os.path.join(folder, STORE_DIRNAME, os.path.splitext(name)[0])
+        self.store_dir = store_dir
+        self.state_path = os.path.join(store_dir, "state.json")
+
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return None
+        with open(self.state_path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != STORE_VERSION or state.get("columns") != self.columns:
+            return None
+        if not os.path.exists(os.path.join(self.store_dir, state["aggregate"])):
+            return None
+        return state
+
+    def _is_append_only(self, f, state, size):
+        """校验已读取部分未被改写：文件未变短、表头与最后一行字节一致"""
+        if size < state["offset"]:
+            return False
+        f.seek(0)
+        if _sha1(f.readline()) != state["header_sha1"]:
+            return False
+        f.seek(state["offset"] - state["last_line_len"])
+        return _sha1(f.read(state["last_line_len"])) == state["last_line_sha1"]
+
+    def _empty(self):
+        """没有任何数据行时的空聚合（各粒度均为0行），下游的每日/月度平均计算得到空表"""
+        return MultiResolutionAggregate.from_chunks([], self.columns)
+
+    def _iter_chunks(self, f, start, end, header):
+        """分块解析[start, end)区间内的完整行，只保留聚合所需的列"""
+        usecols = [col for col in DATE_PART_COLUMNS + self.columns if col in header]
+        reader = io.BufferedReader(_RangeReader(f, start, end))
+        for chunk in pd.read_csv(reader, header=None, names=header, usecols=usecols,
+                                 dtype=schema_for(usecols), chunksize=self.chunksize):
+            yield add_date_columns(chunk)
+
+    def refresh(self):
+        """
+        读取自上次以来新追加的行并合并进部分和，返回(聚合结果, 本次新增行数)
+        末尾不完整的一行（尚未写完换行符）留到下次读取；文件只有表头（或为空）且没有已保存的结果时返回空聚合
+        """
+        state = self._load_state()
+        size = os.path.getsize(self.csv_path)
+        with open(self.csv_path, "rb") as f:
+            if state is not None and self._is_append_only(f, state, size):
+                base = MultiResolutionAggregate.load(os.path.join(self.store_dir, state["aggregate"]))
+                start, header, header_sha1 = state["offset"], state["header"], state["header_sha1"]
+            else:
+                base = None
+                f.seek(0)
+                header_line = f.readline()
+                if not header_line.endswith(b"\n"):
+                    return self._empty(), 0
+                start = len(header_line)  # 数据从表头之后开始
+                header = list(pd.read_csv(io.BytesIO(header_line), nrows=0).columns)
+                header_sha1 = _sha1(header_line)
+
+            # 只消费到最后一个换行符为止
+            end = _last_newline_end(f, size)
+            if end <= start:
+                return (self._empty() if base is None else base), 0
+
+            # 逐块解析并计数
+            n_rows = 0
+
+            def counted(chunks):
+                nonlocal n_rows
+                for chunk in chunks:
+                    n_rows += len(chunk)
+                    yield chunk
+
+            new_agg = MultiResolutionAggregate.from_chunks(counted(self._iter_chunks(f, start, end, header)), self.columns)
+            last_line_start = _last_newline_end(f, end - 1)
+            f.seek(last_line_start)
+            last_line = f.read(end - last_line_start)
+
+        if n_rows == 0:
+            return (self._empty() if base is None else base), 0
+        agg = new_agg if base is None else base.merge(new_agg)
+        new_state = {
+            "version": STORE_VERSION,
+            "columns": self.columns,
+            "aggregate": f"aggregate-{end}.npz",
+            "header": header,
+            "header_sha1": header_sha1,
+            "offset": end,
+            "last_line_len": len(last_line),
+            "last_line_sha1": _sha1(last_line),
+        }
+        os.makedirs(self.store_dir, exist_ok=True)
+        # 聚合结果按字节位置命名，写完后再原子替换state.json：
+        # 中途失败时state仍指向旧文件，下次会重新读取这批行而不会重复累加
+        agg.save(os.path.join(self.store_dir, new_state["aggregate"]))
+        tmp_path = self.state_path + f".tmp{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(new_state, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.state_path)
+        for name in os.listdir(self.store_dir):
+            if name.startswith("aggregate-") and name != new_state["aggregate"]:
+                os.remove(os.path.join(self.store_dir, name))
+        return agg, n_rows
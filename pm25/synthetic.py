@@ -0,0 +1,445 @@
+import os
+import sys
+import json
+import argparse
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+
+from . import config
+from .archive import ARCHIVE_DIR, append_rows
+from .cache import read_city_frame
+from .classify import season_codes
+from .schema import schema_for
+
+# ----------------------
+# 合成观测数据：按真实数据拟合的季节/日变化规律，生成任意规模、与PM2.5data相同格式的小时数据
+# ----------------------
+# 模型（PM取对数，气象量为原值）：
+#   值 = 月均值[月] + 日变化[时] + 残差分位数映射(日尺度AR(1)扰动 + 小时尺度AR(1)扰动)
+#   高斯扰动经拟合的残差分位数映射，保留真实数据的偏态与尾部
+#   各观测点的日尺度扰动按拟合的相关系数共享一个区域分量，另有固定偏移；缺测为几何分布长度的随机缺口
+#   风向为"粘滞"马尔可夫链（按月份频率重抽），Iws为同一风向持续期内的累计风速；降水同理，Iprec为连续降水累计量
+# 生成按年分块、对观测点整体向量化，AR(1)递推按块用闭式解计算，内存只与块大小有关
+WEATHER_VARS = ["DEWP", "HUMI", "PRES", "TEMP"]
+WEATHER_DECIMALS = 1
+PRECIP_SENTINEL = 1000  # 北京降水列含999990等异常值，拟合时排除
+DEFAULT_STATION_RHO = 0.9
+RESID_PROBS = np.linspace(0.0005, 0.9995, 201)  # 残差分位数映射的概率网格
+NORMAL_GRID = np.array([NormalDist().inv_cdf(p) for p in RESID_PROBS])
+LOOKUP_Z, LOOKUP_SIZE = 5.0, 4096  # 分位数映射预先插值到[-5, 5]的均匀网格上，生成时直接按下标查表
+# CSV各列的小数位数（其余数值列为整数），与原始数据的写法一致
+CSV_DECIMALS = {**{var: 1 for var in WEATHER_VARS}, "Iws": 2, "precipitation": 1, "Iprec": 1}
+
+
+# ----------------------
+# 1. 由真实数据拟合
+# ----------------------
+def _bin_mean(values, bins, n_bins):
+    valid = ~np.isnan(values)
+    sums = np.bincount(bins[valid], values[valid], minlength=n_bins)
+    counts = np.bincount(bins[valid], minlength=n_bins)
+    return sums / np.maximum(counts, 1)
+
+
+def _lag1_corr(x):
+    """相邻两项的相关系数（忽略含NaN的项对）"""
+    a, b = x[1:], x[:-1]
+    valid = ~(np.isnan(a) | np.isnan(b))
+    if valid.sum() < 3:
+        return 0.0
+    return float(np.corrcoef(a[valid], b[valid])[0, 1])
+
+
+def _fit_series(values, month, hour, day):
+    """
+    拟合单条序列：月均值、日变化、日尺度与小时尺度AR(1)参数、残差分位数
+    小时尺度的phi按总残差的一阶自相关反推（直接拟合减去日均后的残差会明显偏低）
+    返回：(参数dict, 各天的日尺度残差)
+    """
+    month_mean = _bin_mean(values, month - 1, 12)
+    resid = values - month_mean[month - 1]
+    hour_offset = _bin_mean(resid, hour, 24)
+    resid = resid - hour_offset[hour]
+    daily = _bin_mean(resid, day, day.max() + 1)
+    daily[np.bincount(day[~np.isnan(resid)], minlength=day.max() + 1) == 0] = np.nan
+    day_phi, day_var = _lag1_corr(daily), float(np.nanvar(daily))
+    hour_var = float(np.nanvar(resid - daily[day]))
+    # 总残差相邻两小时协方差 = 日方差 * (23 + day_phi) / 24 + 小时方差 * hour_phi
+    hour_phi = (_lag1_corr(resid) * (day_var + hour_var) - day_var * (23 + day_phi) / 24) / max(hour_var, 1e-12)
+    params = {
+        "month_mean": month_mean.tolist(),
+        "hour_offset": hour_offset.tolist(),
+        "day_phi": day_phi,
+        "day_sigma": np.sqrt(day_var),
+        "hour_phi": float(np.clip(hour_phi, 0, 0.999)),
+        "hour_sigma": np.sqrt(hour_var),
+        "resid_quantiles": np.nanquantile(resid, RESID_PROBS).tolist() if np.isfinite(resid).any() else [0.0] * len(RESID_PROBS),
+    }
+    return params, daily
+
+
+def _pool(param_list):
+    """多个观测点的参数取平均"""
+    return {key: np.mean([p[key] for p in param_list], axis=0).tolist() for key in param_list[0]}
+
+
+def _sticky_stay(p_same, probs):
+    """
+    粘滞链参数：每小时以stay概率保持，否则按probs重抽（可能抽到同一类）
+    由观测到的"与上一小时相同"的比例反推stay
+    """
+    q = float(np.sum(np.square(probs)))
+    return float(np.clip((p_same - q) / max(1 - q, 1e-9), 0, 0.999))
+
+
+def _gap_hours(values, max_gap=24 * 30):
+    """缺测缺口的平均长度（小时），排除超过max_gap的长期停测"""
+    isnan = np.concatenate(([False], np.isnan(values), [False]))
+    edges = np.flatnonzero(np.diff(isnan.astype("int8")))
+    lengths = edges[1::2] - edges[::2]
+    lengths = lengths[lengths <= max_gap]
+    return float(lengths.mean()) if len(lengths) else 1.0
+
+
+def fit_profile(csv_path, name=None):
+    """
+    由一个城市的小时数据拟合生成参数，返回可JSON序列化的dict
+    PM参数由该城市全部观测点（含美国大使馆）合并拟合，观测点间相关系数取日尺度残差的平均相关
+    """
+    df = read_city_frame(csv_path)
+    month = df["month"].to_numpy().astype("int64")
+    hour = df["hour"].to_numpy().astype("int64")
+    day_keys = df["date"].to_numpy().astype("datetime64[D]").astype("int64")
+    day = day_keys - day_keys.min()
+
+    pm_cols = [col for col in df.columns if col.startswith("PM_")]
+    pm_params, pm_daily, gaps = [], [], []
+    for col in pm_cols:
+        values = df[col].to_numpy(dtype="float64")
+        params, daily = _fit_series(np.log(np.maximum(values, 1)), month, hour, day)
+        pm_params.append(params)
+        pm_daily.append(daily)
+        gaps.append(_gap_hours(values))
+    pm = _pool(pm_params)
+    corrs = []
+    for i in range(len(pm_daily)):
+        for j in range(i + 1, len(pm_daily)):
+            valid = ~(np.isnan(pm_daily[i]) | np.isnan(pm_daily[j]))
+            if valid.sum() > 30:
+                corrs.append(np.corrcoef(pm_daily[i][valid], pm_daily[j][valid])[0, 1])
+    pm["station_rho"] = float(np.mean(corrs)) if corrs else DEFAULT_STATION_RHO
+    pm["station_sigma"] = float(np.std([np.mean(p["month_mean"]) for p in pm_params])) if len(pm_params) > 1 else 0.1
+    pm["gap_hours"] = float(np.mean(gaps))
+
+    weather = {var: _fit_series(df[var].to_numpy(dtype="float64"), month, hour, day)[0] for var in WEATHER_VARS}
+
+    # 风向：各月频率、粘滞概率，以及各风向每小时的平均累计风速增量
+    cbwd = df["cbwd"]
+    categories = [str(c) for c in cbwd.cat.categories]
+    codes = cbwd.cat.codes.to_numpy().astype("int64")
+    valid = codes >= 0
+    month_probs = np.zeros((12, len(categories)))
+    np.add.at(month_probs, (month[valid] - 1, codes[valid]), 1)
+    month_probs /= np.maximum(month_probs.sum(axis=1, keepdims=True), 1)
+    same = np.concatenate(([False], codes[1:] == codes[:-1])) & valid
+    pairs = valid[1:] & valid[:-1]
+    iws = df["Iws"].to_numpy(dtype="float64")
+    increments = np.where(same, iws - np.roll(iws, 1), iws)
+    iws_mean = _bin_mean(np.where(valid & (increments > 0), increments, np.nan), np.maximum(codes, 0), len(categories))
+
+    # 降水：各月降水小时比例、粘滞概率与单小时平均降水量
+    precip = df["precipitation"].to_numpy(dtype="float64")
+    precip = np.where(precip < PRECIP_SENTINEL, precip, np.nan)
+    wet = (precip > 0).astype("float64")
+    wet[np.isnan(precip)] = np.nan
+    wet_prob = _bin_mean(wet, month - 1, 12)
+    wet_same = np.nanmean(np.where(np.isnan(wet[1:]) | np.isnan(wet[:-1]), np.nan, wet[1:] == wet[:-1]))
+    mean_wet = float(np.nanmean(wet))
+
+    return {
+        "name": name or os.path.splitext(os.path.basename(csv_path))[0],
+        "pm": pm,
+        "weather": weather,
+        "cbwd": {
+            "categories": categories,
+            "month_probs": month_probs.tolist(),
+            "stay": _sticky_stay(np.mean(same[1:][pairs]), month_probs.mean(axis=0)),
+            "iws_mean": iws_mean.tolist(),
+        },
+        "precip": {
+            "wet_prob": wet_prob.tolist(),
+            "stay": _sticky_stay(wet_same, [mean_wet, 1 - mean_wet]),
+            "wet_mean": float(np.nanmean(precip[precip > 0])),
+        },
+    }
+
+
+def save_profile(profile, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=1)
+
+
+def load_profile(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ----------------------
+# 2. 向量化生成
+# ----------------------
+def _ar1(shocks, phi, state):
+    """
+    AR(1)递推 x_t = phi * x_{t-1} + e_t，沿第0维、对其余维度整体计算
+    按块使用闭式解 x_k = phi^k * (x_0 + Σ phi^-j * e_j)，块长保证phi^-k不溢出
+    返回：(序列, 最后一行作为下一块的初值)
+    """
+    phi = float(np.clip(phi, 1e-3, 0.999))
+    block = int(max(1, min(256, np.log(1e6) / -np.log(phi))))
+    k = np.arange(1, block + 1, dtype="float64").reshape((-1,) + (1,) * (shocks.ndim - 1))
+    up, down = phi ** -k, phi ** k
+    out = np.empty_like(shocks)
+    for lo in range(0, len(shocks), block):
+        e = shocks[lo:lo + block]
+        n = len(e)
+        out[lo:lo + n] = down[:n] * (state + np.cumsum(e * up[:n], axis=0))
+        state = out[lo + n - 1]
+    return out, state
+
+
+def _ar1_shocks(rng, shape, phi, sigma):
+    """使AR(1)平稳方差为sigma²的白噪声"""
+    return rng.normal(0, sigma * np.sqrt(max(1 - phi ** 2, 1e-6)), size=shape)
+
+
+def _map_residual(params, gaussian):
+    """把平稳方差为day_sigma² + hour_sigma²的高斯扰动按拟合的残差分位数映射（保留偏态与尾部）"""
+    scale = np.sqrt(params["day_sigma"] ** 2 + params["hour_sigma"] ** 2)
+    table = np.interp(np.linspace(-LOOKUP_Z, LOOKUP_Z, LOOKUP_SIZE), NORMAL_GRID, params["resid_quantiles"])
+    pos = (gaussian / max(scale, 1e-12) + LOOKUP_Z) * ((LOOKUP_SIZE - 1) / (2 * LOOKUP_Z))
+    return table[np.clip(np.rint(pos), 0, LOOKUP_SIZE - 1).astype("int64")]
+
+
+def _sticky_chain(rng, probs_by_hour, stay, prev):
+    """
+    粘滞类别链：每小时以stay概率保持上一类别，否则按当月频率重抽
+    probs_by_hour：(小时数, 类别数)；prev为上一块末尾的类别（-1表示无）
+    """
+    n = len(probs_by_hour)
+    switch = rng.random(n) >= stay
+    if prev < 0:
+        switch[0] = True
+    draws = (rng.random(n)[:, None] > np.cumsum(probs_by_hour, axis=1)).sum(axis=1)
+    draws = np.minimum(draws, probs_by_hour.shape[1] - 1)
+    last = np.maximum.accumulate(np.where(switch, np.arange(n), -1))
+    return np.where(last >= 0, draws[np.maximum(last, 0)], prev)
+
+
+def _run_cumsum(increments, codes, prev_code, prev_total):
+    """类别不变的连续小时内累计求和（类别变化时重新计数），可接续上一块"""
+    n = len(codes)
+    change = codes != np.concatenate(([prev_code], codes[:-1]))
+    start = np.maximum.accumulate(np.where(change, np.arange(n), -1))
+    total = np.cumsum(increments)
+    base = np.where(start > 0, total[np.maximum(start, 1) - 1], 0.0)
+    return np.where(start >= 0, total - base, prev_total + total)
+
+
+def _gap_mask(rng, n_hours, n_cols, rate, gap_hours, carry):
+    """
+    缺测掩码：缺口起点按rate/gap_hours随机出现，长度服从均值为gap_hours的几何分布（总缺测比例约为rate）
+    carry：各列从上一块延续过来的剩余缺口长度；返回(掩码, 新的carry)
+    """
+    delta = np.zeros((n_hours + 1, n_cols), dtype="int32")
+    active = (carry > 0).astype("int32")
+    delta[0] += active
+    np.add.at(delta, (np.minimum(carry, n_hours), np.arange(n_cols)), -active)
+    rows, gap_cols = np.nonzero(rng.random((n_hours, n_cols)) < rate / max(gap_hours, 1))
+    ends = rows + rng.geometric(1 / max(gap_hours, 1), size=len(rows))
+    np.add.at(delta, (rows, gap_cols), 1)
+    np.add.at(delta, (np.minimum(ends, n_hours), gap_cols), -1)
+    new_carry = np.maximum(carry - n_hours, 0)
+    np.maximum.at(new_carry, gap_cols, np.maximum(ends - n_hours, 0))
+    return np.cumsum(delta[:-1], axis=0) > 0, new_carry
+
+
+def station_names(n_stations):
+    width = max(4, len(str(n_stations - 1)))
+    return [f"PM_S{i:0{width}d}" for i in range(n_stations)]
+
+
+def iter_synthetic_chunks(profile, n_stations, n_years, start_year=2010, missing_rate=0.05, seed=0):
+    """
+    逐年生成合成小时数据（DataFrame，列顺序与PM2.5data相同：No, year, month, day, hour, season,
+    PM_S0000..., PM_US Post, DEWP, HUMI, PRES, TEMP, cbwd, Iws, precipitation, Iprec）
+    - n_stations：中国观测点数（另加美国大使馆一列）
+    - missing_rate：PM列缺测比例（以随机缺口形式出现）
+    各块之间的AR状态、风向/降水状态与缺口延续，拼接后与一次生成整段数据等价
+    """
+    rng = np.random.default_rng(seed)
+    pm, weather, wind, rain = profile["pm"], profile["weather"], profile["cbwd"], profile["precip"]
+    pm_cols = station_names(n_stations) + [config.us_col]
+    columns = ["No", "year", "month", "day", "hour", "season"] + pm_cols + WEATHER_VARS + ["cbwd", "Iws", "precipitation", "Iprec"]
+    dtypes = schema_for(columns)
+    n_pm = len(pm_cols)
+    categories = wind["categories"]
+
+    station_offset = rng.normal(0, pm["station_sigma"], size=n_pm)
+    rho = float(np.clip(pm["station_rho"], 0, 1))
+    pm_day_state = np.zeros(n_pm + 1)  # 最后一列为区域共享分量
+    pm_hour_state = np.zeros(n_pm)
+    weather_state = {var: (0.0, 0.0) for var in WEATHER_VARS}
+    gap_carry = np.zeros(n_pm, dtype="int64")
+    wind_code, iws_total, wet_code, iprec_total = -1, 0.0, 0, 0.0
+    row_no = 1
+
+    for year in range(start_year, start_year + n_years):
+        days = np.arange(np.datetime64(f"{year}-01-01"), np.datetime64(f"{year + 1}-01-01"))
+        n_days, n_hours = len(days), len(days) * 24
+        months_of_day = days.astype("datetime64[M]")
+        month = np.repeat(months_of_day.astype("int64") % 12 + 1, 24)
+        day_of_month = np.repeat((days - months_of_day).astype("int64") + 1, 24)
+        hour = np.tile(np.arange(24), n_days)
+        day_index = np.repeat(np.arange(n_days), 24)
+
+        # PM：区域共享 + 各观测点独立的日尺度扰动，叠加小时尺度扰动，取指数还原浓度
+        daily, pm_day_state = _ar1(_ar1_shocks(rng, (n_days, n_pm + 1), pm["day_phi"], pm["day_sigma"]), pm["day_phi"], pm_day_state)
+        daily = np.sqrt(rho) * daily[:, -1:] + np.sqrt(1 - rho) * daily[:, :-1]
+        hourly, pm_hour_state = _ar1(_ar1_shocks(rng, (n_hours, n_pm), pm["hour_phi"], pm["hour_sigma"]), pm["hour_phi"], pm_hour_state)
+        log_pm = (np.asarray(pm["month_mean"])[month - 1] + np.asarray(pm["hour_offset"])[hour])[:, None]
+        values = np.maximum(np.round(np.exp(log_pm + station_offset + _map_residual(pm, daily[day_index] + hourly))), 1)
+        mask, gap_carry = _gap_mask(rng, n_hours, n_pm, missing_rate, pm["gap_hours"], gap_carry)
+        values[mask] = np.nan
+
+        data = {
+            "No": np.arange(row_no, row_no + n_hours),
+            "year": np.full(n_hours, year), "month": month, "day": day_of_month, "hour": hour,
+            "season": season_codes(month) + 1,
+        }
+        data.update(zip(pm_cols, values.T))
+
+        # 气象：与PM相同的月均值 + 日变化 + 两级AR(1)扰动结构
+        for var in WEATHER_VARS:
+            params = weather[var]
+            day_state, hour_state = weather_state[var]
+            var_daily, day_state = _ar1(_ar1_shocks(rng, n_days, params["day_phi"], params["day_sigma"]), params["day_phi"], day_state)
+            var_hourly, hour_state = _ar1(_ar1_shocks(rng, n_hours, params["hour_phi"], params["hour_sigma"]), params["hour_phi"], hour_state)
+            weather_state[var] = (day_state, hour_state)
+            data[var] = np.round(
+                np.asarray(params["month_mean"])[month - 1] + np.asarray(params["hour_offset"])[hour]
+                + _map_residual(params, var_daily[day_index] + var_hourly),
+                WEATHER_DECIMALS,
+            )
+        data["HUMI"] = np.clip(data["HUMI"], 1, 100)
+        data["DEWP"] = np.minimum(data["DEWP"], data["TEMP"])
+
+        # 风向与累计风速
+        codes = _sticky_chain(rng, np.asarray(wind["month_probs"])[month - 1], wind["stay"], wind_code)
+        increments = np.round(rng.exponential(np.asarray(wind["iws_mean"])[codes]), 2)
+        iws = _run_cumsum(increments, codes, wind_code, iws_total)
+        wind_code, iws_total = int(codes[-1]), float(iws[-1])
+        data["cbwd"] = pd.Categorical.from_codes(codes, categories=categories)
+        data["Iws"] = np.round(iws, 2)
+
+        # 降水与累计降水（无降水时为0）
+        wet_prob = np.asarray(rain["wet_prob"])[month - 1]
+        wet = _sticky_chain(rng, np.column_stack([1 - wet_prob, wet_prob]), rain["stay"], wet_code)
+        precip = np.where(wet == 1, np.maximum(np.round(rng.exponential(rain["wet_mean"], size=n_hours), 1), 0.1), 0.0)
+        iprec = np.where(wet == 1, _run_cumsum(precip, wet, wet_code, iprec_total), 0.0)
+        wet_code, iprec_total = int(wet[-1]), float(iprec[-1])
+        data["precipitation"] = precip
+        data["Iprec"] = np.round(iprec, 1)
+
+        row_no += n_hours
+        yield pd.DataFrame(data, columns=columns).astype(dtypes)
+
+
+# ----------------------
+# 3. 输出：原始CSV格式或分区归档
+# ----------------------
+def _format_column(values, decimals):
+    """
+    定点数列 → 字符串数组：按取值范围建一张查找表后整体取下标，代替逐个格式化浮点数
+    写法与原始数据一致（整数不带小数点，小数去掉末尾的0，缺测为NA）
+    """
+    values = np.asarray(values, dtype="float64")
+    isnan = np.isnan(values)
+    scaled = np.round(np.where(isnan, 0, values) * 10 ** decimals).astype("int64")
+    lo, hi = int(scaled.min()), int(scaled.max())
+    if decimals:
+        table = [f"{k / 10 ** decimals:.{decimals}f}".rstrip("0").rstrip(".") for k in range(lo, hi + 1)]
+    else:
+        table = [str(k) for k in range(lo, hi + 1)]
+    out = np.array(table, dtype=object)[scaled - lo]
+    out[isnan] = "NA"
+    return out
+
+
+def format_csv_rows(chunk):
+    """把一块数据格式化为CSV文本行（不含表头）"""
+    texts = []
+    for col in chunk.columns:
+        if isinstance(chunk[col].dtype, pd.CategoricalDtype):
+            texts.append(np.asarray(chunk[col].astype(str), dtype=object))
+        else:
+            texts.append(_format_column(chunk[col].to_numpy(dtype="float64", na_value=np.nan), CSV_DECIMALS.get(col, 0)))
+    return "\n".join(map(",".join, zip(*texts))) + "\n"
+
+
+def write_csv(path, chunks):
+    """逐块追加写入CSV（与原始数据相同的表头、数字写法与"NA"缺测标记），返回总行数"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + f".tmp{os.getpid()}"
+    n_rows = 0
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        for chunk in chunks:
+            if n_rows == 0:
+                f.write(",".join(chunk.columns) + "\n")
+            f.write(format_csv_rows(chunk))
+            n_rows += len(chunk)
+    os.replace(tmp_path, path)
+    return n_rows
+
+
+def write_archive(city, chunks, archive_dir=ARCHIVE_DIR):
+    """逐块写入分区归档（city=/year=/month=），返回总行数"""
+    n_rows = 0
+    for chunk in chunks:
+        append_rows(city, chunk, archive_dir)
+        n_rows += len(chunk)
+    return n_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pm25.synthetic", description="生成与PM2.5data格式相同的合成小时数据")
+    parser.add_argument("output", nargs="?", help="输出CSV路径（使用--archive时可省略）")
+    parser.add_argument("--stations", type=int, default=50, help="中国观测点数（另加美国大使馆一列）")
+    parser.add_argument("--years", type=int, default=10, help="年数")
+    parser.add_argument("--start-year", type=int, default=2010, help="起始年份")
+    parser.add_argument("--missing", type=float, default=0.05, help="PM列缺测比例")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--like", choices=config.CITIES, default="Beijing", help="按哪个城市的数据拟合季节/日变化规律")
+    parser.add_argument("--profile", help="使用已保存的拟合参数JSON（不再读取原始数据）")
+    parser.add_argument("--save-profile", help="把拟合参数保存为JSON")
+    parser.add_argument("--archive", metavar="CITY", help="写入分区归档（城市名），而不是CSV")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR, help="归档目录")
+    args = parser.parse_args(argv)
+    if not args.output and not args.archive:
+        parser.error("需要指定输出CSV路径或--archive")
+
+    profile = load_profile(args.profile) if args.profile else fit_profile(config.file_path_dic[args.like], args.like)
+    if args.save_profile:
+        save_profile(profile, args.save_profile)
+        print(f"💾 拟合参数已保存：{args.save_profile}")
+    chunks = iter_synthetic_chunks(profile, args.stations, args.years, args.start_year, args.missing, args.seed)
+    if args.archive:
+        n_rows = write_archive(args.archive, chunks, args.archive_dir)
+        print(f"🧪 合成数据已写入分区归档：{args.archive}（{args.stations}个观测点，{args.years}年，{n_rows}行）")
+    else:
+        n_rows = write_csv(args.output, chunks)
+        print(f"🧪 合成数据已生成：{args.output}（{args.stations}个观测点，{args.years}年，{n_rows}行）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
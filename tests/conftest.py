@@ -0,0 +1,32 @@
+import os
+
+import pandas as pd
+import pytest
+
+from pm25 import config
+
+SOURCE_CSV = config.file_path_dic["Beijing"]
+
+
+def head_csv(path, n_rows, skip_rows=0):
+    """把北京原始CSV的一段行（保留表头与原始文本格式）写成一个小CSV，返回路径"""
+    with open(SOURCE_CSV, encoding="utf-8") as f:
+        lines = f.readlines()
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines([lines[0]] + lines[1 + skip_rows:1 + skip_rows + n_rows])
+    return str(path)
+
+
+@pytest.fixture
+def small_csv(tmp_path):
+    """2010年1-2月（59天 × 24小时）的北京数据"""
+    return head_csv(tmp_path / "BeijingPM_small.csv", 59 * 24)
+
+
+@pytest.fixture
+def raw_frame(small_csv):
+    return pd.read_csv(small_csv)
+
+
+def pytest_configure(config):
+    os.environ.setdefault("MPLBACKEND", "Agg")
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pm25.aggregate import MultiResolutionAggregate
+from pm25.cache import iter_city_chunks, read_city_frame
+
+COLUMNS = ["PM_A", "PM_B"]
+
+
+def _hourly_grid(n_days=40, seed=0):
+    """完整逐小时网格（每天24行、日期连续），含缺测与整天缺测"""
+    rng = np.random.default_rng(seed)
+    n = n_days * 24
+    df = pd.DataFrame({
+        "date": np.repeat(pd.date_range("2015-01-20", periods=n_days, freq="D"), 24),
+        "hour": np.tile(np.arange(24), n_days),
+    })
+    for col in COLUMNS:
+        values = rng.integers(1, 500, n).astype("float64")
+        values[rng.random(n) < 0.15] = np.nan
+        df[col] = values
+    df.loc[24 * 3:24 * 4 - 1, "PM_B"] = np.nan  # 某一天全部缺测
+    return df
+
+
+def _shuffle_hours_within_days(df, seed=1):
+    rng = np.random.default_rng(seed)
+    order = rng.permuted(np.arange(len(df)).reshape(-1, 24), axis=1).ravel()
+    return df.iloc[order].reset_index(drop=True)
+
+
+def _shuffle_days(df, seed=2):
+    rng = np.random.default_rng(seed)
+    days = rng.permutation(len(df) // 24)
+    return df.iloc[(days[:, None] * 24 + np.arange(24)).ravel()].reset_index(drop=True)
+
+
+def _drop_rows(df, seed=3):
+    rng = np.random.default_rng(seed)
+    return df.drop(index=rng.choice(len(df), 30, replace=False)).reset_index(drop=True)
+
+
+CASES = {
+    # 名称: (构造函数, 是否走逐小时网格的快速路径)
+    "full_grid": (lambda df: df, True),
+    "hours_shuffled_within_day": (_shuffle_hours_within_days, True),
+    "day_aligned_slice": (lambda df: df.iloc[24 * 5:24 * 17].reset_index(drop=True), True),
+    "dropped_rows": (_drop_rows, False),
+    "shuffled_days": (_shuffle_days, False),
+    "unaligned_slice": (lambda df: df.iloc[5:24 * 10 + 5].reset_index(drop=True), False),
+}
+
+
+@pytest.mark.parametrize("case", list(CASES))
+def test_daily_stats_match_groupby(case, monkeypatch):
+    make, fast = CASES[case]
+    df = make(_hourly_grid())
+
+    calls = []
+    from_hour_grid = MultiResolutionAggregate.from_hour_grid.__func__
+    monkeypatch.setattr(
+        MultiResolutionAggregate, "from_hour_grid",
+        classmethod(lambda cls, *args, **kwargs: calls.append(1) or from_hour_grid(cls, *args, **kwargs)),
+    )
+    agg = MultiResolutionAggregate.from_hourly(df, COLUMNS)
+    assert bool(calls) == fast
+
+    grouped = df.groupby("date")[COLUMNS]
+    for stat, expected in [("sum", grouped.sum()), ("count", grouped.count()), ("min", grouped.min()), ("max", grouped.max())]:
+        _assert_daily_equal(agg.stats("day", stat), expected)
+    _assert_daily_equal(agg.mean("day"), grouped.mean())
+
+
+def _assert_daily_equal(actual, expected):
+    expected = expected.set_axis(expected.index.astype(actual.index.dtype))
+    pd.testing.assert_frame_equal(actual, expected, check_names=False, check_freq=False, check_dtype=False)
+
+
+def _season(months):
+    return np.array(["春季", "夏季", "秋季", "冬季"])[(months - 3) % 12 // 3]
+
+
+@pytest.mark.parametrize("level", ["month", "season", "year"])
+def test_coarser_levels_match_groupby(level):
+    df = _drop_rows(_hourly_grid(n_days=500))  # 跨两年、四季
+    keys = {
+        "month": df["date"].dt.to_period("M"),
+        "season": pd.Series(_season(df["date"].dt.month), index=df.index),
+        "year": df["date"].dt.year,
+    }[level]
+    grouped = df.groupby(keys)[COLUMNS]
+    agg = MultiResolutionAggregate.from_hourly(df, COLUMNS)
+    for stat in ("sum", "count", "min", "max"):
+        expected = getattr(grouped, stat)()
+        pd.testing.assert_frame_equal(
+            agg.stats(level, stat).sort_index(), expected.sort_index(),
+            check_names=False, check_dtype=False, check_index_type=False,
+        )
+    expected_mean = grouped.mean()
+    if level == "season":
+        expected_mean = expected_mean.reindex(["春季", "夏季", "秋季", "冬季"])
+    pd.testing.assert_frame_equal(agg.mean(level), expected_mean, check_names=False, check_dtype=False, check_index_type=False)
+
+
+def test_merge_and_save_roundtrip(tmp_path):
+    df = _hourly_grid(n_days=90)
+    whole = MultiResolutionAggregate.from_hourly(df, COLUMNS)
+    split = 24 * 40 + 7  # 切在一天中间：同一天的部分和须在merge时合并
+    merged = MultiResolutionAggregate.from_hourly(df.iloc[:split], COLUMNS).merge(
+        MultiResolutionAggregate.from_hourly(df.iloc[split:], COLUMNS)
+    )
+    whole.save(tmp_path / "agg.npz")
+    loaded = MultiResolutionAggregate.load(tmp_path / "agg.npz")
+    for other in (merged, loaded):
+        for level in ("day", "month", "season", "year"):
+            pd.testing.assert_frame_equal(other.levels[level], whole.levels[level])
+    with pytest.raises(ValueError):
+        whole.merge(MultiResolutionAggregate.from_hourly(df, COLUMNS[:1]))
+
+
+@pytest.mark.parametrize("chunksize", [100, 24 * 7, 10**6])
+def test_from_chunks_matches_from_hourly(small_csv, chunksize):
+    stations = ["PM_US Post"]
+    whole = MultiResolutionAggregate.from_hourly(read_city_frame(small_csv, use_cache=False), stations)
+    streamed = MultiResolutionAggregate.from_chunks(iter_city_chunks(small_csv, chunksize, usecols=stations), stations)
+    for level in ("day", "month", "season", "year"):
+        pd.testing.assert_frame_equal(streamed.levels[level], whole.levels[level])
+
+
+def test_from_chunks_without_rows_is_empty():
+    agg = MultiResolutionAggregate.from_chunks(iter([]), COLUMNS)
+    assert agg.mean("day").empty and agg.stats("year", "count").empty
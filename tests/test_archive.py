@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from pm25.archive import _partition_dir, append_rows, ingest_city, list_partitions, load_partitions
+
+
+def _expected(*frames):
+    """pandas参照：按(date, hour)去重保留最后一行"""
+    df = pd.concat(frames, ignore_index=True)
+    df["date"] = pd.to_datetime(df[["year", "month", "day"]])
+    return df.drop_duplicates(subset=["date", "hour"], keep="last").sort_values(["date", "hour"]).reset_index(drop=True)
+
+
+def test_ingest_roundtrip(tmp_path, small_csv, raw_frame):
+    archive = str(tmp_path / "archive")
+    assert ingest_city("Test", small_csv, archive) == 2
+    df = load_partitions("Test", archive_dir=archive)
+    expected = _expected(raw_frame)
+    assert len(df) == len(expected)
+    np.testing.assert_allclose(df["PM_US Post"], expected["PM_US Post"])
+    part = load_partitions("Test", "2010-02-10", "2010-02-11", ["PM_US Post"], archive_dir=archive)
+    assert list(part.columns) == ["date", "PM_US Post"] and len(part) == 48
+
+
+def test_append_dedups_on_date_hour_and_keeps_new_values(tmp_path, small_csv, raw_frame):
+    archive = str(tmp_path / "archive")
+    ingest_city("Test", small_csv, archive)
+    # 2月最后一天（与已有数据重复，值改为新值）+ 3月1日（新分区）
+    new = raw_frame.tail(24).copy()
+    new["PM_US Post"] = 999.0
+    march = raw_frame.tail(24).copy()
+    march["month"], march["day"], march["PM_US Post"] = 3, 1, 123.0
+    assert append_rows("Test", pd.concat([new, march], ignore_index=True), archive) == 2
+
+    df = load_partitions("Test", archive_dir=archive)
+    expected = _expected(raw_frame, new, march)
+    assert len(df) == len(expected) == len(raw_frame) + 24
+    np.testing.assert_allclose(df["PM_US Post"], expected["PM_US Post"])
+    assert [(y, m) for y, m, _ in list_partitions("Test", archive_dir=archive)] == [(2010, 1), (2010, 2), (2010, 3)]
+
+
+def test_rewrite_swaps_meta_atomically_and_removes_old_data(tmp_path, small_csv, raw_frame):
+    archive = str(tmp_path / "archive")
+    ingest_city("Test", small_csv, archive)
+    path = _partition_dir(archive, "Test", 2010, 2)
+    before = set(os.listdir(path))
+    append_rows("Test", raw_frame.tail(24), archive)
+    after = set(os.listdir(path))
+    # 分区目录本身从未被移走：只有meta.json与当前数据子目录，旧数据子目录已删除
+    assert len(before) == len(after) == 2 and "meta.json" in after
+    assert before & after == {"meta.json"}
+    assert len(load_partitions("Test", "2010-02-01", "2010-02-28", archive_dir=archive)) == 28 * 24
@@ -0,0 +1,48 @@
+import json
+import os
+
+import pandas as pd
+
+from pm25.artifacts import MANIFEST_NAME, ArtifactManifest, write_csv
+from pm25.cli import main
+
+CLI_ARGS = ["--cities", "Beijing", "--start", "2015-12-01", "--end", "2015-12-31", "--preset", "preview", "--workers", "1"]
+
+
+def _artifacts(result_dir):
+    with open(os.path.join(result_dir, MANIFEST_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_save_keeps_entries_from_other_runs(tmp_path):
+    df = pd.DataFrame({"a": [1, 2]})
+    first = ArtifactManifest(str(tmp_path))
+    write_csv(df, str(tmp_path / "a.csv"), first, index=False)
+    first.save()
+
+    second = ArtifactManifest(str(tmp_path))
+    write_csv(df, str(tmp_path / "b.csv"), second, index=False)
+    second.save()
+    assert second.counts() == (0, 1)
+    assert set(_artifacts(tmp_path)["artifacts"]) == {"a.csv", "b.csv"}
+
+    third = ArtifactManifest(str(tmp_path))
+    assert not write_csv(df, str(tmp_path / "a.csv"), third, index=False)
+    assert third.counts() == (1, 0)
+
+
+def test_different_entry_points_reuse_each_others_artifacts(tmp_path):
+    """两个子命令交替运行：后运行的不应清掉先运行的产物记录，重新运行时全部复用"""
+    result_dir = str(tmp_path)
+    assert main(["daily", "--result-dir", result_dir] + CLI_ARGS) == 0
+    daily = _artifacts(result_dir)
+    assert daily["rebuilt"] > 0
+
+    assert main(["levels", "--result-dir", result_dir] + CLI_ARGS) == 0
+    levels = _artifacts(result_dir)
+    assert set(daily["artifacts"]) < set(levels["artifacts"])
+
+    assert main(["daily", "--result-dir", result_dir] + CLI_ARGS) == 0
+    again = _artifacts(result_dir)
+    assert (again["reused"], again["rebuilt"]) == (daily["rebuilt"] + daily["reused"], 0)
+    assert set(again["artifacts"]) == set(levels["artifacts"])
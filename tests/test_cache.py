@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import head_csv
+from pm25.cache import CACHE_DIRNAME, read_city_frame, read_city_range
+
+
+def test_cache_roundtrip_matches_parsed_csv(small_csv, raw_frame):
+    parsed = read_city_frame(small_csv, use_cache=False)
+    built = read_city_frame(small_csv)  # 首次：解析并写缓存
+    assert os.path.exists(os.path.join(os.path.dirname(small_csv), CACHE_DIRNAME, "BeijingPM_small", "meta.json"))
+    cached = read_city_frame(small_csv)  # 再次：直接读缓存
+    pd.testing.assert_frame_equal(built, parsed)
+    pd.testing.assert_frame_equal(cached, parsed)
+    # 与pandas默认解析的原始值一致（PM_*为float32，气象列保持float64）
+    np.testing.assert_array_equal(cached["PM_US Post"].to_numpy("float64"), raw_frame["PM_US Post"].to_numpy("float64"))
+    np.testing.assert_array_equal(cached["TEMP"], raw_frame["TEMP"])
+    assert isinstance(cached["cbwd"].dtype, pd.CategoricalDtype)
+
+
+def test_content_change_rebuilds_and_touch_does_not(small_csv):
+    before = read_city_frame(small_csv)
+    st = os.stat(small_csv)
+    os.utime(small_csv, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))  # 只改mtime：内容（sha1）未变，沿用缓存
+    pd.testing.assert_frame_equal(read_city_frame(small_csv), before)
+
+    with open(small_csv, encoding="utf-8") as f:
+        lines = f.readlines()
+    header = lines[0].rstrip("\n").split(",")
+    row = lines[1].rstrip("\n").split(",")
+    row[header.index("PM_US Post")] = "777"
+    lines[1] = ",".join(row) + "\n"
+    with open(small_csv, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    after = read_city_frame(small_csv)
+    assert after.loc[0, "PM_US Post"] == 777
+    pd.testing.assert_frame_equal(after.iloc[1:], before.iloc[1:])
+
+
+@pytest.fixture(params=["sorted", "shuffled"])
+def year_boundary_csv(request, tmp_path):
+    """2010-12-01 ~ 2011-02-28（跨年）；shuffled为行顺序打乱（日期无序，走行组内逐行比较）"""
+    path = head_csv(tmp_path / "BeijingPM_range.csv", 90 * 24, skip_rows=334 * 24)
+    if request.param == "shuffled":
+        with open(path, encoding="utf-8") as f:
+            header, *rows = f.readlines()
+        order = np.random.default_rng(0).permutation(len(rows))
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines([header] + [rows[i] for i in order])
+    return path
+
+
+@pytest.mark.parametrize("start, end", [
+    (None, None), ("2010-12-30", "2011-01-02"), ("2011-02-28", None), (None, "2010-12-01"),
+    ("2011-01-15 13:00", "2011-01-16"), ("2012-01-01", None), ("2011-01-10", "2011-01-05"),
+])
+def test_read_city_range_matches_filtered_frame(year_boundary_csv, start, end):
+    columns = ["PM_US Post", "TEMP"]
+    full = read_city_frame(year_boundary_csv, use_cache=False)
+    mask = pd.Series(True, index=full.index)
+    if start is not None:
+        mask &= full["date"] >= pd.Timestamp(start).normalize()
+    if end is not None:
+        mask &= full["date"] <= pd.Timestamp(end).normalize()
+    expected = full.loc[mask, ["date"] + columns].reset_index(drop=True)
+    actual = read_city_range(year_boundary_csv, start, end, columns)
+    assert list(actual.columns) == ["date"] + columns
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected)
+
+
+def test_read_city_range_unknown_column(small_csv):
+    with pytest.raises(KeyError):
+        read_city_range(small_csv, columns=["PM_Nowhere"])
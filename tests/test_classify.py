@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pm25.classify import CHINA_DAILY, CHINA_DAILY_5, US_EPA_DAILY, classify_levels, classify_seasons, get_breakpoints, level_codes
+
+
+def get_pollution_level(pm_value):
+    """原PM2.5.2.py的逐行分级（五级口径），作为参照"""
+    if pd.isna(pm_value):
+        return None
+    elif pm_value <= 35:
+        return "优"
+    elif pm_value <= 75:
+        return "良"
+    elif pm_value <= 115:
+        return "轻度污染"
+    elif pm_value <= 150:
+        return "中度污染"
+    else:
+        return "重度污染"
+
+
+def get_season(month):
+    """原PM2.5.py的季节映射，作为参照"""
+    if month in [12, 1, 2]:
+        return "冬季"
+    elif month in [3, 4, 5]:
+        return "春季"
+    elif month in [6, 7, 8]:
+        return "夏季"
+    else:
+        return "秋季"
+
+
+BOUNDARY_VALUES = [0, 35, 35.0001, 34.9999, 75, 75.5, 115, 115.01, 150, 150.01, 250, 999, np.nan]
+
+
+def test_levels_match_rowwise_apply_at_boundaries():
+    rng = np.random.default_rng(0)
+    values = pd.Series(np.r_[BOUNDARY_VALUES, rng.uniform(0, 400, 500)])
+    values[rng.random(len(values)) < 0.05] = np.nan
+    expected = values.apply(get_pollution_level)
+    actual = classify_levels(values, CHINA_DAILY_5)
+    assert actual.isna().equals(expected.isna())
+    assert (actual.dropna().astype(str) == expected.dropna()).all()
+    assert list(actual.cat.categories) == list(CHINA_DAILY_5.labels) and actual.cat.ordered
+
+
+@pytest.mark.parametrize("table", [CHINA_DAILY, US_EPA_DAILY])
+def test_edges_are_right_closed(table):
+    edges = np.asarray(table.edges, dtype="float64")
+    np.testing.assert_array_equal(level_codes(edges, table), np.arange(len(edges)))
+    np.testing.assert_array_equal(level_codes(edges + 1e-6, table), np.arange(1, len(edges) + 1))
+    assert level_codes([np.nan], table)[0] == -1
+
+
+def test_ndarray_input_returns_categorical():
+    levels = classify_levels(np.array([10.0, np.nan, 300.0]), CHINA_DAILY)
+    assert isinstance(levels, pd.Categorical)
+    assert list(levels.astype(object)) == ["优", np.nan, "严重污染"]
+
+
+def test_seasons_match_rowwise_mapping():
+    months = pd.Series(np.arange(1, 13).repeat(3), index=np.arange(100, 136))
+    seasons = classify_seasons(months)
+    assert seasons.index.equals(months.index)
+    assert (seasons.astype(str) == months.apply(get_season)).all()
+
+
+def test_unknown_breakpoints_raise():
+    assert get_breakpoints("us", "daily") is US_EPA_DAILY
+    with pytest.raises(ValueError):
+        get_breakpoints("eu", "daily")
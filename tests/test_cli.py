@@ -0,0 +1,43 @@
+import os
+
+import pandas as pd
+
+from pm25.archive import ingest_city
+from pm25.artifacts import ArtifactManifest
+from pm25.cli import cmd_diurnal, cmd_episodes, cmd_rolling, main
+from pm25.dataset import Dataset
+
+
+def _latest(result_dir):
+    return pd.read_csv(os.path.join(result_dir, "各观测点最新滚动统计.csv")).set_index("观测点")
+
+
+def _run_hourly_commands(ds, result_dir):
+    manifest = ArtifactManifest(result_dir)
+    for cmd in (cmd_rolling, cmd_episodes, cmd_diurnal):
+        cmd(ds, ["Beijing"], None, None, result_dir, manifest)
+
+
+def test_rolling_sees_rows_appended_to_the_archive(tmp_path, small_csv, raw_frame):
+    archive = str(tmp_path / "archive")
+    result_dir = str(tmp_path / "result")
+    os.makedirs(result_dir)
+    ingest_city("Beijing", small_csv, archive)
+    # 归档之外不留原始CSV：只存在于归档中的城市也要能计算
+    missing_csv = str(tmp_path / "missing.csv")
+
+    _run_hourly_commands(Dataset({"Beijing": missing_csv}, archive_dir=archive), result_dir)
+    assert _latest(result_dir).loc["PM_US Post", "时间"] == "2010-02-28 23:00:00"
+
+    march = raw_frame.tail(24).copy()
+    march["month"], march["day"], march["PM_US Post"] = 3, 1, 500.0
+    new_csv = str(tmp_path / "march.csv")
+    march.to_csv(new_csv, index=False)
+    assert main(["append", "Beijing", new_csv, "--archive-dir", archive]) == 0
+
+    _run_hourly_commands(Dataset({"Beijing": missing_csv}, archive_dir=archive), result_dir)
+    latest = _latest(result_dir).loc["PM_US Post"]
+    assert latest["时间"] == "2010-03-01 23:00:00"
+    assert latest["24h_mean"] == 500.0 and latest["24h_max"] == 500.0 and latest["24h_exceed"] == 24
+    episodes = pd.read_csv(os.path.join(result_dir, "Beijing_污染过程_逐小时.csv"))
+    assert ((episodes["series"] == "PM_US Post") & (episodes["end"] == "2010-03-01 23:00:00")).any()
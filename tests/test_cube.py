@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from conftest import head_csv
+from pm25.archive import append_rows, ingest_city
+from pm25.classify import CHINA_DAILY
+from pm25.cube import HOURLY_SERIES, open_level_cube
+from pm25.dataset import Dataset
+
+MONITORS = ["PM_Dongsi", "PM_Dongsihuan", "PM_Nongzhanguan"]
+US_COL = "PM_US Post"
+BINS = [-np.inf] + list(CHINA_DAILY.edges) + [np.inf]
+
+
+def _dataset(tmp_path):
+    # 2014年1-2月：北京国控点2013年起才有数据
+    csv_path = head_csv(tmp_path / "BeijingPM_2014.csv", 59 * 24, skip_rows=1461 * 24)
+    return Dataset({"Test": csv_path}, {"Test": MONITORS}, US_COL, archive_dir=str(tmp_path / "archive"))
+
+
+def _expected_counts(daily):
+    """pandas参照：pd.cut右闭区间分级后按(年, 级别)计数"""
+    levels = pd.cut(daily.dropna(), BINS, right=True, labels=list(CHINA_DAILY.labels))
+    return pd.crosstab(levels.index.year, levels).reindex(columns=list(CHINA_DAILY.labels), fill_value=0)
+
+
+def _assert_counts(cube, series, daily):
+    expected = _expected_counts(daily)
+    actual = cube.query(by=("year", "level"), city="Test", series=series, year=list(expected.index))
+    np.testing.assert_array_equal(actual.to_numpy(), expected.to_numpy())
+
+
+def _reference_daily(df):
+    df = df.assign(date=pd.to_datetime(df[["year", "month", "day"]]))
+    daily = df.groupby("date")[MONITORS + [US_COL]].mean()
+    complete = df.dropna(subset=MONITORS)
+    hourly = complete.assign(city_avg_cn=complete[MONITORS].mean(axis=1).astype("float32").round(2))
+    return daily, hourly.groupby("date")["city_avg_cn"].mean().round(2)
+
+
+def test_cube_matches_pandas_crosstab(tmp_path):
+    ds = _dataset(tmp_path)
+    cube = open_level_cube(ds, path=str(tmp_path / "cube.npz"))
+    daily, hourly_avg = _reference_daily(pd.read_csv(ds.file_path_dic["Test"]))
+    _assert_counts(cube, "US_Avg", daily[US_COL])
+    _assert_counts(cube, "China_Avg", daily[MONITORS].mean(axis=1))
+    _assert_counts(cube, HOURLY_SERIES, hourly_avg)
+    for station in MONITORS:
+        _assert_counts(cube, station, daily[station])
+    assert cube.query(city="Test", series="US_Avg", month=2) == daily[US_COL].loc["2014-02"].notna().sum()
+
+
+def test_cube_reused_until_archive_changes(tmp_path):
+    ds = _dataset(tmp_path)
+    path = str(tmp_path / "cube.npz")
+    ingest_city("Test", ds.file_path_dic["Test"], ds.archive_dir)
+    first = open_level_cube(ds, path=path)
+    assert open_level_cube(Dataset(ds.file_path_dic, ds.china_monitors, US_COL, ds.archive_dir), path=path).sources == first.sources
+
+    # 追加3月1日：数据来自归档，立方体须按归档指纹重建并计入新的一天
+    raw = pd.read_csv(ds.file_path_dic["Test"])
+    march = raw.tail(24).copy()
+    march["month"], march["day"], march[US_COL] = 3, 1, 500.0
+    append_rows("Test", march, ds.archive_dir)
+    rebuilt = open_level_cube(Dataset(ds.file_path_dic, ds.china_monitors, US_COL, ds.archive_dir), path=path)
+    assert rebuilt.sources != first.sources
+    assert rebuilt.query(city="Test", series="US_Avg", month=3, level="严重污染") == 1
+    assert rebuilt.query(city="Test", series="US_Avg") == first.query(city="Test", series="US_Avg") + 1
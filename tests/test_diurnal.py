@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import head_csv
+from pm25.cache import read_city_frame
+from pm25.classify import SEASON_NAMES
+from pm25.diurnal import PERCENTILES, WEEKDAY_NAMES, DiurnalProfile
+from pm25.rolling import EXCEED_THRESHOLD
+
+COLUMNS = ["PM_Dongsi", "PM_US Post"]
+
+
+@pytest.fixture
+def frame(tmp_path):
+    # 2014年1-4月（跨冬春两季），国控点与美国大使馆均有数据
+    return read_city_frame(head_csv(tmp_path / "BeijingPM_2014.csv", 120 * 24, skip_rows=1461 * 24), use_cache=False)
+
+
+def _reference(df, by):
+    """pandas参照：按维度分组后的均值、inverted_cdf百分位数与超标率"""
+    long = df.assign(
+        季节=[SEASON_NAMES[(m - 3) % 12 // 3] for m in df["month"]],
+        星期=[WEEKDAY_NAMES[d] for d in df["date"].dt.dayofweek],
+        小时=df["hour"].astype("int64"),
+    ).melt(id_vars=list(by), value_vars=COLUMNS, var_name="观测点").dropna(subset=["value"])
+    long["value"] = long["value"].astype("float64")
+    groups = long.groupby(["观测点"] + list(by))["value"]
+    return pd.DataFrame({
+        "有效小时数": groups.size(),
+        "均值": groups.mean(),
+        **{f"P{q}": groups.agg(lambda s, q=q: np.percentile(s, q, method="inverted_cdf")) for q in PERCENTILES},
+        "超标率(%)": groups.agg(lambda s: (s > EXCEED_THRESHOLD).mean() * 100),
+    })
+
+
+@pytest.mark.parametrize("by", [("季节", "星期", "小时"), ("小时",)])
+def test_table_matches_pandas_groupby(frame, by):
+    dims = {"季节": "season", "星期": "weekday", "小时": "hour"}
+    table = DiurnalProfile.from_hourly(frame, COLUMNS).table(tuple(dims[d] for d in by))
+    table = table[table["有效小时数"] > 0].set_index(["观测点"] + list(by))
+    expected = _reference(frame, by).reindex(table.index)
+    assert len(table) == len(_reference(frame, by))
+    np.testing.assert_array_equal(table["有效小时数"], expected["有效小时数"])
+    for name in ["均值", "超标率(%)"] + [f"P{q}" for q in PERCENTILES]:
+        np.testing.assert_allclose(table[name], expected[name], rtol=1e-9, err_msg=name)
+
+
+def test_chunks_merge_and_save_roundtrip(tmp_path, frame):
+    whole = DiurnalProfile.from_hourly(frame, COLUMNS)
+    chunked = DiurnalProfile.from_chunks((frame.iloc[i:i + 500] for i in range(0, len(frame), 500)), COLUMNS)
+    DiurnalProfile.from_hourly(frame, COLUMNS).save(tmp_path / "profile.npz")
+    loaded = DiurnalProfile.load(tmp_path / "profile.npz")
+    for profile in (chunked, loaded):
+        np.testing.assert_array_equal(profile.counts, whole.counts)
+        np.testing.assert_array_equal(profile.hist, whole.hist)
+        np.testing.assert_allclose(profile.sums, whole.sums)
+    assert whole.hist.dtype == np.int32
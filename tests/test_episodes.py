@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pm25.episodes import EPISODE_THRESHOLDS, city_daily_episodes, detect_episodes
+
+
+def _scan(matrix, names, index, thresholds, min_duration, step_hours):
+    """参照：逐序列逐时间点的纯Python扫描"""
+    rows = []
+    for threshold in thresholds:
+        for name, series in zip(names, matrix):
+            run = []
+            for t, value in enumerate(list(series) + [np.nan]):  # 末尾补NaN收尾
+                if value == value and value > threshold:
+                    run.append(t)
+                    continue
+                if run and len(run) >= min_duration:
+                    values = [float(series[i]) for i in run]
+                    rows.append((name, threshold, index[run[0]], index[run[-1]], len(run),
+                                 max(values), sum(values) / len(run), sum(values) * step_hours))
+                run = []
+    return rows
+
+
+def _matrix(n_rows=4, n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    matrix = rng.gamma(2.0, 50.0, (n_rows, n)).astype("float32")
+    matrix[rng.random((n_rows, n)) < 0.05] = np.nan
+    matrix[0, -5:] = 300  # 第一行末尾与第二行开头都超标：不能连成一个过程
+    matrix[1, :5] = 300
+    matrix[2, :] = np.nan  # 全部缺测的序列
+    return matrix
+
+
+@pytest.mark.parametrize("thresholds, min_duration", [(EPISODE_THRESHOLDS, 1), ((150, 75), 3), ((500,), 1)])
+def test_detect_episodes_matches_python_scan(thresholds, min_duration):
+    matrix = _matrix()
+    names = ["A", "B", "C", "D"]
+    index = pd.date_range("2014-01-01", periods=matrix.shape[1], freq="h")
+    result = detect_episodes(matrix, names, index, thresholds, min_duration)
+    expected = _scan(matrix, names, index, thresholds, min_duration, 1)
+    assert len(result) == len(expected)
+    for row, exp in zip(result.itertuples(index=False), expected):
+        assert (row.series, row.threshold, row.start, row.end, row.duration) == exp[:5]
+        np.testing.assert_allclose([row.peak, row.mean, row.exposure], exp[5:], rtol=1e-9)
+
+
+def test_city_daily_episodes_break_on_missing_days():
+    days = pd.date_range("2014-01-01", periods=12, freq="D")
+    us = [80, 90, 100, 20, 200, 260, 30, 120, 130, 140, 40, 90]
+    daily = pd.DataFrame({"China_Avg": np.nan, "US_Avg": us}, index=days).drop(days[[8]])  # 缺一天：中断过程
+    result = city_daily_episodes(daily, thresholds=(75,))
+    us_episodes = result[result["series"] == "US_Avg"]
+    assert list(us_episodes["duration"]) == [3, 2, 1, 1, 1]
+    assert us_episodes["start"].iloc[2] == pd.Timestamp("2014-01-08") and us_episodes["end"].iloc[3] == pd.Timestamp("2014-01-10")
+    np.testing.assert_allclose(us_episodes["exposure"].iloc[0], (80 + 90 + 100) * 24)
+    assert (result["series"] == "China_Avg").sum() == 0
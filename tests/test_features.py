@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import head_csv
+from pm25.cache import read_city_frame
+from pm25.features import HORIZONS, LAGS, ROLLING_WINDOWS, build_feature_matrix, lag_matrix, rolling_mean_matrix
+from pm25.schema import WEATHER_COLUMNS
+
+STATIONS = ["PM_Dongsi", "PM_US Post"]
+
+
+def _values(n=400, n_cols=3, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.gamma(2.0, 40.0, (n, n_cols))
+    values[rng.random((n, n_cols)) < 0.1] = np.nan
+    values[50:90, 1] = np.nan
+    return values
+
+
+def test_lag_matrix_matches_shift():
+    values = _values()
+    lagged = lag_matrix(values, LAGS)
+    frame = pd.DataFrame(values)
+    for k, lag in enumerate(LAGS):
+        np.testing.assert_array_equal(lagged[..., k], frame.shift(lag).to_numpy())
+
+
+@pytest.mark.parametrize("size", [1, 6, 72, 1000])
+def test_rolling_mean_matrix_matches_pandas(size):
+    values = _values()
+    expected = pd.DataFrame(values).rolling(size, min_periods=1).mean().to_numpy()
+    np.testing.assert_allclose(rolling_mean_matrix(values, size), expected, rtol=1e-9)
+
+
+@pytest.fixture
+def frame(tmp_path):
+    """2014年1-2月，删去部分小时的行（矩阵中为NaN）"""
+    df = read_city_frame(head_csv(tmp_path / "BeijingPM_2014.csv", 59 * 24, skip_rows=1461 * 24), use_cache=False)
+    return df.drop(index=np.random.default_rng(0).choice(len(df), 40, replace=False)).reset_index(drop=True)
+
+
+def _dense(df):
+    """pandas参照：按(日期, 小时)补齐为完整逐小时网格（float32，与特征矩阵一致）"""
+    index = df["date"] + pd.to_timedelta(df["hour"].astype("int64"), unit="h")
+    full = pd.date_range(index.min().normalize(), index.max().normalize() + pd.Timedelta(hours=23), freq="h")
+    return df[WEATHER_COLUMNS + STATIONS].astype("float32").set_axis(index).reindex(full)
+
+
+def test_feature_columns_match_shift_and_rolling(frame):
+    _, names, targets, matrix = build_feature_matrix(frame, STATIONS)
+    result = pd.DataFrame(matrix, columns=names + targets)
+    dense = _dense(frame)
+    assert len(result) == len(dense)
+    expected = {}
+    for col in WEATHER_COLUMNS + STATIONS:
+        for lag in LAGS:
+            expected[f"{col}_lag{lag}h"] = dense[col].shift(lag)
+        # 气象滚动均值含当前小时；PM2.5截至上一小时
+        source = dense[col] if col in WEATHER_COLUMNS else dense[col].shift(1)
+        for size in ROLLING_WINDOWS:
+            expected[f"{col}_mean{size}h"] = source.astype("float64").rolling(size, min_periods=1).mean()
+    for col in WEATHER_COLUMNS:
+        expected[col] = dense[col]
+    for station in STATIONS:
+        for h in HORIZONS:
+            expected[f"target_{station}_+{h}h"] = dense[station].shift(-h)
+    for name, series in expected.items():
+        np.testing.assert_allclose(result[name], series.to_numpy("float32"), rtol=1e-6, err_msg=name)
+
+
+def test_pm_features_never_use_the_current_hour(frame):
+    _, names, targets, before = build_feature_matrix(frame, STATIONS)
+    t = 500
+    changed = frame.copy()
+    changed.loc[t, STATIONS] = 5000.0  # 只改第t行（当前小时）的PM2.5
+    _, _, _, after = build_feature_matrix(changed, STATIONS)
+    row = (frame.loc[t, "date"] - frame["date"].min()).days * 24 + int(frame.loc[t, "hour"])
+    pm_features = [i for i, name in enumerate(names) if name.startswith("PM_")]
+    np.testing.assert_array_equal(after[row, pm_features], before[row, pm_features])  # 当前行的特征不受影响
+    assert not np.array_equal(after[row + 1, pm_features], before[row + 1, pm_features])  # 下一小时起才可见
+    current_target = len(names) + targets.index("target_PM_US Post_+0h")
+    assert after[row, current_target] == 5000.0
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import head_csv
+from pm25.aggregate import MultiResolutionAggregate
+from pm25.cache import read_city_frame
+from pm25.hourly import HourlyStore
+
+STATIONS = ["PM_Dongsi", "PM_US Post"]
+
+
+@pytest.fixture
+def gappy_csv(tmp_path):
+    """2014年1-2月，删去部分小时的行（网格中应为NaN）"""
+    path = head_csv(tmp_path / "BeijingPM_gappy.csv", 59 * 24, skip_rows=1461 * 24)
+    with open(path, encoding="utf-8") as f:
+        header, *rows = f.readlines()
+    drop = set(np.random.default_rng(0).choice(len(rows), 50, replace=False)) | set(range(24 * 10, 24 * 11))
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines([header] + [row for i, row in enumerate(rows) if i not in drop])
+    return path
+
+
+def _reference(frame, station):
+    """pandas参照：按(日期, 小时)补齐为完整逐小时序列"""
+    index = frame["date"] + pd.to_timedelta(frame["hour"].astype("int64"), unit="h")
+    full = pd.date_range(index.min().normalize(), index.max().normalize() + pd.Timedelta(hours=23), freq="h")
+    return pd.Series(frame[station].to_numpy("float32"), index=index).reindex(full)
+
+
+@pytest.mark.parametrize("start, end", [(None, None), ("2014-01-05", "2014-01-20"), ("2014-02-27", "2014-03-10"), ("2013-12-01", "2014-01-01")])
+def test_window_and_mask_match_reindexed_frame(tmp_path, gappy_csv, start, end):
+    frame = read_city_frame(gappy_csv)
+    store = HourlyStore.open(gappy_csv, str(tmp_path / "store"))
+    for station in STATIONS:
+        expected = _reference(frame, station)
+        if start is not None:
+            expected = expected[pd.Timestamp(start):pd.Timestamp(end) + pd.Timedelta(hours=23)]
+        window = store.window(station, start, end)
+        np.testing.assert_array_equal(window, expected.to_numpy())
+        np.testing.assert_array_equal(store.nan_mask(station, start, end), np.isnan(expected.to_numpy()))
+        np.testing.assert_array_equal(
+            store.time_index(start, end).to_numpy().astype("datetime64[h]"), expected.index.to_numpy().astype("datetime64[h]")
+        )
+
+
+def test_aggregate_matches_from_hourly(tmp_path, gappy_csv):
+    frame = read_city_frame(gappy_csv)
+    store = HourlyStore.open(gappy_csv, str(tmp_path / "store"))
+    expected = MultiResolutionAggregate.from_hourly(frame, STATIONS)
+    actual = store.aggregate(STATIONS)
+    for level in ("month", "season", "year"):
+        pd.testing.assert_frame_equal(actual.levels[level], expected.levels[level])
+    # 日粒度：网格中整天缺测的日期也会出现（count为0、均值NaN），其余日期一致
+    daily = actual.mean("day").dropna(how="all")
+    pd.testing.assert_frame_equal(daily, expected.mean("day").dropna(how="all"), check_index_type=False)
+    sub = store.aggregate(STATIONS, "2014-01-15", "2014-01-31").mean("month")
+    pd.testing.assert_frame_equal(sub, MultiResolutionAggregate.from_hourly(
+        frame[(frame["date"] >= "2014-01-15") & (frame["date"] <= "2014-01-31")], STATIONS
+    ).mean("month"))
+
+
+def test_reopen_reuses_store_until_source_changes(tmp_path, gappy_csv, monkeypatch):
+    store_dir = str(tmp_path / "store")
+    HourlyStore.open(gappy_csv, store_dir)
+    built = []
+    from_frame = HourlyStore.from_frame.__func__
+    monkeypatch.setattr(HourlyStore, "from_frame", classmethod(lambda cls, *a: built.append(1) or from_frame(cls, *a)))
+    HourlyStore.open(gappy_csv, store_dir)
+    assert not built
+    with open(head_csv(tmp_path / "next.csv", 1, skip_rows=1461 * 24 + 59 * 24), encoding="utf-8") as f:
+        next_row = f.readlines()[1]  # 2014-03-01 0时
+    with open(gappy_csv, "a", encoding="utf-8") as f:
+        f.write(next_row)
+    store = HourlyStore.open(gappy_csv, store_dir)
+    assert built and store.n_days == 60
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pm25.classify import CHINA_DAILY_5, classify_levels
+from pm25.metrics import CompareSums, us_china_compare_table
+
+
+def _city_daily(seed, start, n_days):
+    """合成日均值：含缺测值与整行缺失的日期"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=n_days, freq="D")
+    us = rng.gamma(2.0, 40.0, n_days)
+    china = us * rng.normal(0.9, 0.15, n_days) + rng.normal(0, 5, n_days)
+    china[rng.random(n_days) < 0.1] = np.nan
+    us[rng.random(n_days) < 0.1] = np.nan
+    daily = pd.DataFrame({"China_Avg": china, "US_Avg": us}, index=index)
+    return daily.drop(index[rng.random(n_days) < 0.05])  # 部分日期整行缺失
+
+
+def _reference(df):
+    """pandas参照：与原PM2.5.py逐城市的计算方式相同"""
+    valid = df.dropna(subset=["China_Avg", "US_Avg"])
+    diff = valid["China_Avg"] - valid["US_Avg"]
+    levels_agree = classify_levels(valid["China_Avg"], CHINA_DAILY_5) == classify_levels(valid["US_Avg"], CHINA_DAILY_5)
+    return {
+        "有效对比天数": len(valid),
+        "相关系数": valid["China_Avg"].corr(valid["US_Avg"]),
+        "平均绝对误差(μg/m³)": np.abs(diff).mean(),
+        "平均相对误差(%)": (np.abs(diff) / valid["US_Avg"]).mean() * 100,
+        "平均偏差(μg/m³)": diff.mean(),
+        "均方根误差(μg/m³)": np.sqrt((diff ** 2).mean()),
+        "等级一致率(%)": levels_agree.mean() * 100,
+    }
+
+
+def _assert_row(row, expected):
+    assert row["有效对比天数"] == expected["有效对比天数"]
+    for name, value in expected.items():
+        np.testing.assert_allclose(row[name], value, rtol=1e-9, atol=1e-9, err_msg=name)
+
+
+@pytest.fixture
+def city_daily():
+    b = _city_daily(1, "2014-03-15", 300)
+    # 美国值为0：中国值非0的一天相对误差为inf，中美均为0的一天为0/0（不计入）
+    b.loc[pd.Timestamp("2014-04-24")] = [0.0, 0.0]
+    b.loc[pd.Timestamp("2014-11-20")] = [12.0, 0.0]
+    return {"A": _city_daily(0, "2014-01-01", 400), "B": b.sort_index()}
+
+
+@pytest.mark.parametrize("freq", ["all", "year", "month"])
+def test_by_period_matches_pandas(city_daily, freq):
+    table = CompareSums.from_daily(city_daily).by_period(freq)
+    for row in table.to_dict(orient="records"):
+        df = city_daily[row["城市"]]
+        df = df[(df.index >= row["起始日期"]) & (df.index <= row["结束日期"])]
+        if len(df.dropna(subset=["China_Avg", "US_Avg"])) == 0:
+            assert row["有效对比天数"] == 0
+            continue
+        _assert_row(row, _reference(df))
+
+
+def test_us_zero_days_follow_pandas_mre(city_daily):
+    table = CompareSums.from_daily(city_daily).by_period("month")
+    mre = table.set_index(["城市", "窗口"])["平均相对误差(%)"]
+    assert np.isinf(mre[("B", "2014-11")])  # 中国12、美国0
+    assert np.isfinite(mre[("B", "2014-04")])  # 中美均为0：不计入，其余日期照常
+
+
+def test_rolling_matches_pandas(city_daily):
+    window, min_days = 30, 20
+    table = CompareSums.from_daily(city_daily).rolling(window, min_days)
+    for row in table.iloc[::7].to_dict(orient="records"):
+        end = pd.Timestamp(row["窗口"])
+        df = city_daily[row["城市"]]
+        df = df[(df.index > end - pd.Timedelta(days=window)) & (df.index <= end)]
+        expected = _reference(df)
+        if expected["有效对比天数"] < min_days:
+            assert row["有效对比天数"] == expected["有效对比天数"] and np.isnan(row["平均绝对误差(μg/m³)"])
+            continue
+        _assert_row(row, expected)
+
+
+def test_compare_table_matches_pandas(city_daily):
+    city_daily["C"] = _city_daily(2, "2014-01-01", 20)  # 有效天数不足30
+    rows = {row["城市"]: row for row in us_china_compare_table(city_daily)}
+    assert rows["C"]["相关系数"] == "数据不足"
+    for city in ("A", "B"):
+        expected = _reference(city_daily[city])
+        assert rows[city]["有效对比天数"] == expected["有效对比天数"]
+        assert rows[city]["相关系数"] == round(expected["相关系数"], 3)
+        assert rows[city]["平均绝对误差(μg/m³)"] == round(expected["平均绝对误差(μg/m³)"], 2)
+        assert rows[city]["平均相对误差(%)"] == round(expected["平均相对误差(%)"], 2)
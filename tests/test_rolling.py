@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pm25.rolling import EXCEED_THRESHOLD, RollingWindow, city_daily_rolling, rolling_stats, sliding_max
+
+
+def _series(n=500, seed=0):
+    """随机浓度：含零散缺测与一段连续缺测（长于小窗口）"""
+    rng = np.random.default_rng(seed)
+    values = rng.gamma(2.0, 40.0, n)
+    values[rng.random(n) < 0.1] = np.nan
+    values[100:140] = np.nan
+    return values
+
+
+@pytest.mark.parametrize("size", [1, 3, 24, 168, 600])
+def test_sliding_max_matches_pandas(size):
+    values = _series()
+    expected = pd.Series(values).rolling(size, min_periods=1).max().to_numpy()
+    np.testing.assert_array_equal(sliding_max(values, size), expected)
+
+
+def test_sliding_max_empty():
+    assert len(sliding_max([], 24)) == 0
+
+
+@pytest.mark.parametrize("size, min_periods", [(1, 1), (24, 1), (24, 12), (720, 1)])
+def test_rolling_stats_match_pandas(size, min_periods):
+    values = _series()
+    s = pd.Series(values)
+    stats = rolling_stats(values, size, min_periods=min_periods)
+    np.testing.assert_allclose(stats["mean"], s.rolling(size, min_periods=min_periods).mean(), rtol=1e-12)
+    np.testing.assert_array_equal(stats["max"], s.rolling(size, min_periods=min_periods).max())
+    np.testing.assert_array_equal(stats["count"], s.rolling(size, min_periods=1).count())
+    np.testing.assert_array_equal(stats["exceed"], (s > EXCEED_THRESHOLD).rolling(size, min_periods=1).sum())
+
+
+def test_city_daily_rolling_uses_calendar_days():
+    # 日均值有缺行的日期：窗口按日历天数计，与pandas的rolling("7D")一致
+    days = pd.date_range("2014-01-01", periods=200, freq="D")
+    rng = np.random.default_rng(1)
+    daily = pd.DataFrame({"China_Avg": _series(200, 2), "US_Avg": _series(200, 3)}, index=days)
+    daily = daily.drop(days[rng.random(200) < 0.15])
+    result = city_daily_rolling(daily).reindex(daily.index)
+    for col in ("China_Avg", "US_Avg"):
+        for name, window in (("7d", "7D"), ("30d", "30D")):
+            rolled = daily[col].rolling(window, min_periods=1)
+            np.testing.assert_allclose(result[f"{col}_{name}_mean"], rolled.mean(), rtol=1e-12)
+            np.testing.assert_array_equal(result[f"{col}_{name}_max"], rolled.max())
+
+
+@pytest.mark.parametrize("size", [1, 24, 168])
+def test_streaming_window_matches_batch(size):
+    values = _series(400)
+    batch = rolling_stats(values, size)
+    window = RollingWindow(size)
+    for i, value in enumerate(values):
+        stat = window.push(value)
+        assert stat.count == batch["count"][i] and stat.exceed == batch["exceed"][i]
+        np.testing.assert_allclose(stat.mean, batch["mean"][i], rtol=1e-9)
+        np.testing.assert_array_equal(stat.max, batch["max"][i])
+
+    resumed = RollingWindow.from_history(values[:300], size)
+    for i in range(300, 400):
+        stat = resumed.push(values[i])
+        np.testing.assert_allclose([stat.mean, stat.max], [batch["mean"][i], batch["max"][i]], rtol=1e-9)
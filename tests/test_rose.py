@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import head_csv
+from pm25.cache import read_city_frame
+from pm25.classify import SEASON_NAMES
+from pm25.rolling import EXCEED_THRESHOLD
+from pm25.rose import WIND_DIRECTIONS, WIND_SPEED_EDGES, WIND_SPEED_LABELS, PollutionRose
+
+COLUMNS = ["PM_Dongsi", "PM_US Post"]
+DIM_KEYS = {"direction": "风向", "speed": "风速等级", "season": "季节"}
+
+
+@pytest.fixture
+def frame(tmp_path):
+    # 2014年1-6月（冬春夏三季）
+    return read_city_frame(head_csv(tmp_path / "BeijingPM_2014.csv", 181 * 24, skip_rows=1461 * 24), use_cache=False)
+
+
+def _reference(df, by):
+    """pandas参照：风向/风速等级/季节分组后的小时数、均值、总体标准差、超标率与负荷占比"""
+    long = df.assign(
+        风向=df["cbwd"].astype(object),
+        风速等级=pd.cut(df["Iws"], [-np.inf, *WIND_SPEED_EDGES, np.inf], right=True, labels=list(WIND_SPEED_LABELS)).astype(object),
+        季节=[SEASON_NAMES[(m - 3) % 12 // 3] for m in df["month"]],
+    ).melt(id_vars=["风向", "风速等级", "季节"], value_vars=COLUMNS, var_name="观测点")
+    long = long[long["风向"].isin(WIND_DIRECTIONS) & long["风速等级"].notna() & long["value"].notna()]
+    long["value"] = long["value"].astype("float64")
+    keys = ["观测点"] + [DIM_KEYS[dim] for dim in by]
+    groups = long.groupby(keys)["value"]
+    station_total = long.groupby("观测点")["value"].sum()
+    station_count = long.groupby("观测点")["value"].size()
+    result = pd.DataFrame({
+        "有效小时数": groups.size(),
+        "均值": groups.mean(),
+        "标准差": groups.std(ddof=0),
+        "超标率(%)": groups.agg(lambda s: (s > EXCEED_THRESHOLD).mean() * 100),
+        "总和": groups.sum(),
+    }).reset_index()
+    result["频率(%)"] = result["有效小时数"] / result["观测点"].map(station_count) * 100
+    result["负荷占比(%)"] = result["总和"] / result["观测点"].map(station_total) * 100
+    return result.set_index(keys)
+
+
+@pytest.mark.parametrize("by", [("direction", "speed", "season"), ("direction",), ("season", "speed")])
+def test_table_matches_pandas_groupby(frame, by):
+    table = PollutionRose.from_hourly(frame, COLUMNS).table(by)
+    expected = _reference(frame, by)
+    table = table[table["有效小时数"] > 0].set_index(["观测点"] + [DIM_KEYS[dim] for dim in by])
+    assert len(table) == len(expected)
+    expected = expected.reindex(table.index)
+    np.testing.assert_array_equal(table["有效小时数"], expected["有效小时数"])
+    for name in ("频率(%)", "均值", "标准差", "超标率(%)", "负荷占比(%)"):
+        np.testing.assert_allclose(table[name], expected[name], rtol=1e-7, atol=1e-7, err_msg=name)
+
+
+def test_chunks_merge_save_and_load_share(tmp_path, frame):
+    whole = PollutionRose.from_hourly(frame, COLUMNS)
+    chunked = PollutionRose.from_chunks((frame.iloc[i:i + 700] for i in range(0, len(frame), 700)), COLUMNS)
+    whole.save(tmp_path / "rose.npz")
+    for rose in (chunked, PollutionRose.load(tmp_path / "rose.npz")):
+        np.testing.assert_array_equal(rose.count, whole.count)
+        np.testing.assert_array_equal(rose.exceed, whole.exceed)
+        np.testing.assert_allclose(rose.sum, whole.sum)
+    share = whole.load_share("PM_US Post")
+    assert share.shape == (len(WIND_DIRECTIONS), len(WIND_SPEED_LABELS))
+    np.testing.assert_allclose(share.sum(), 100)
+    winter = whole.load_share("PM_US Post", season="冬季")
+    np.testing.assert_allclose(winter.sum(), 100)
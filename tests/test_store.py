@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+from pm25.aggregate import MultiResolutionAggregate
+from pm25.cache import add_date_columns
+from pm25.store import AggregateStore
+
+from conftest import SOURCE_CSV
+
+COLUMNS = ["PM_Dongsi", "PM_US Post"]
+
+
+def _lines(n_rows):
+    with open(SOURCE_CSV, encoding="utf-8") as f:
+        return [next(f) for _ in range(n_rows + 1)]
+
+
+def _expected(path):
+    df = add_date_columns(pd.read_csv(path))
+    return MultiResolutionAggregate.from_hourly(df, COLUMNS)
+
+
+def _assert_same(agg, expected):
+    for level in ("day", "month"):
+        pd.testing.assert_frame_equal(agg.mean(level), expected.mean(level), check_freq=False)
+        pd.testing.assert_frame_equal(agg.stats(level, "count"), expected.stats(level, "count"), check_dtype=False)
+
+
+def test_header_only_returns_empty_aggregate(tmp_path):
+    path = tmp_path / "city.csv"
+    path.write_text(_lines(0)[0], encoding="utf-8")
+    agg, n_rows = AggregateStore(str(path), COLUMNS, store_dir=str(tmp_path / "store")).refresh()
+    assert n_rows == 0 and isinstance(agg, MultiResolutionAggregate)
+    assert len(agg.mean("day")) == 0
+
+    path.write_text("", encoding="utf-8")
+    agg, n_rows = AggregateStore(str(path), COLUMNS, store_dir=str(tmp_path / "store")).refresh()
+    assert n_rows == 0 and len(agg.mean("month")) == 0
+
+
+def test_append_refresh_roundtrip(tmp_path):
+    lines = _lines(40 * 24)
+    path = tmp_path / "city.csv"
+    store_dir = str(tmp_path / "store")
+    path.write_text("".join(lines[:1 + 20 * 24]), encoding="utf-8")
+    agg, n_rows = AggregateStore(str(path), COLUMNS, store_dir=store_dir).refresh()
+    assert n_rows == 20 * 24
+    _assert_same(agg, _expected(path))
+
+    # 追加的最后一行尚未写完换行符：本次不读取，下次补全后再读
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(lines[1 + 20 * 24:-1]) + lines[-1][:10])
+    agg, n_rows = AggregateStore(str(path), COLUMNS, store_dir=store_dir).refresh()
+    assert n_rows == 20 * 24 - 1
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(lines[-1][10:])
+    agg, n_rows = AggregateStore(str(path), COLUMNS, store_dir=store_dir).refresh()
+    assert n_rows == 1
+    _assert_same(agg, _expected(path))
+
+    # 无新数据：直接返回已保存的结果
+    again, n_rows = AggregateStore(str(path), COLUMNS, store_dir=store_dir).refresh()
+    assert n_rows == 0
+    _assert_same(again, agg)
+
+
+def test_rewritten_history_triggers_full_rebuild(tmp_path):
+    lines = _lines(10 * 24)
+    path = tmp_path / "city.csv"
+    store_dir = str(tmp_path / "store")
+    path.write_text("".join(lines), encoding="utf-8")
+    AggregateStore(str(path), COLUMNS, store_dir=store_dir).refresh()
+
+    df = pd.read_csv(path)
+    df.loc[len(df) - 1, "PM_US Post"] = 999
+    df.to_csv(path, index=False)
+    agg, n_rows = AggregateStore(str(path), COLUMNS, store_dir=store_dir).refresh()
+    assert n_rows == 10 * 24
+    _assert_same(agg, _expected(path))
+    assert np.isclose(agg.stats("day", "max")["PM_US Post"].iloc[-1], 999)